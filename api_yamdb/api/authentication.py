@@ -0,0 +1,138 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils.functional import SimpleLazyObject
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import (IS_STAFF_CLAIM, IS_SUPERUSER_CLAIM, ROLE_CLAIM,
+                     TOKEN_VERSION_CLAIM)
+
+User = get_user_model()
+
+USER_CACHE_KEY = 'jwt-user:{}'
+TOKEN_STATE_CACHE_KEY = 'jwt-token-state:{}'
+
+
+def get_user_cache():
+    """Кеш, в котором хранятся пользователи аутентификации."""
+    return caches[settings.JWT_USER_CACHE_ALIAS]
+
+
+def get_user_cache_key(user_id):
+    return USER_CACHE_KEY.format(user_id)
+
+
+def invalidate_cached_user(user_id):
+    """Удаляет пользователя и состояние его токенов из кеша."""
+    get_user_cache().delete_many([
+        get_user_cache_key(user_id), TOKEN_STATE_CACHE_KEY.format(user_id)
+    ])
+
+
+def get_token_state(user_id):
+    """Возвращает версию токенов и активность пользователя.
+
+    Значение кешируется так же, как пользователь; None — пользователя нет.
+    """
+    cache = get_user_cache()
+    key = TOKEN_STATE_CACHE_KEY.format(user_id)
+    state = cache.get(key)
+    if state is None:
+        state = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: user_id}
+        ).values_list('token_version', 'is_active').first()
+        if state is None:
+            return None
+        cache.set(key, state, settings.JWT_USER_CACHE_TIMEOUT)
+    return state
+
+
+class TokenClaimsUser(SimpleLazyObject):
+    """Пользователь, права которого читаются из claims токена.
+
+    Запись пользователя загружается при первом обращении к любому
+    атрибуту, кроме перечисленных ниже, например при сохранении
+    пользователя автором отзыва.
+    """
+
+    def __init__(self, validated_token, load_user):
+        super().__init__(load_user)
+        self.__dict__['_token'] = validated_token
+
+    @property
+    def pk(self):
+        return self.__dict__['_token'][api_settings.USER_ID_CLAIM]
+
+    id = pk
+
+    @property
+    def role(self):
+        return self.__dict__['_token'][ROLE_CLAIM]
+
+    @property
+    def is_staff(self):
+        return self.__dict__['_token'][IS_STAFF_CLAIM]
+
+    @property
+    def is_superuser(self):
+        return self.__dict__['_token'][IS_SUPERUSER_CLAIM]
+
+    is_admin = User.is_admin
+    is_moderator = User.is_moderator
+    is_authenticated = True
+    is_anonymous = False
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация, берущая пользователя из кеша.
+
+    Пользователь кешируется на JWT_USER_CACHE_TIMEOUT секунд и удаляется
+    из кеша при сохранении или удалении записи пользователя.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+        cache = get_user_cache()
+        key = get_user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, settings.JWT_USER_CACHE_TIMEOUT)
+        return user
+
+
+class RoleClaimsJWTAuthentication(CachedJWTAuthentication):
+    """JWT-аутентификация с правами из claims токена.
+
+    Для токенов RoleAccessToken пользователь не загружается: проверяется
+    только версия токенов из кеша. Токены без claims прав
+    обрабатываются как в CachedJWTAuthentication.
+    """
+
+    def get_user(self, validated_token):
+        if ROLE_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+
+        state = get_token_state(validated_token[api_settings.USER_ID_CLAIM])
+        if state is None:
+            raise AuthenticationFailed(
+                'Пользователь не найден.', code='user_not_found'
+            )
+        token_version, is_active = state
+        if not is_active:
+            raise AuthenticationFailed(
+                'Пользователь неактивен.', code='user_inactive'
+            )
+        if validated_token.get(TOKEN_VERSION_CLAIM) != token_version:
+            raise AuthenticationFailed(
+                'Права пользователя изменились, получите новый токен.',
+                code='token_revoked'
+            )
+        return TokenClaimsUser(
+            validated_token,
+            lambda: CachedJWTAuthentication.get_user(self, validated_token)
+        )
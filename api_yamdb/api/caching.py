@@ -0,0 +1,73 @@
+"""Кеш ответов на анонимные GET-запросы к каталогу.
+
+Ключ — ETag ответа: он уже учитывает адрес, нормализованные параметры
+запроса, формат и версии данных из reviews.versions. После изменения
+данных версии растут, ключи меняются, а старые записи вытесняются
+по LRU бэкендом кеша RESPONSE_CACHE_ALIAS. Версии растут после фиксации
+транзакции, поэтому под новым ключом не оказывается ответ, прочитанный
+до неё.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from reviews.versions import get_version_cache
+
+RESPONSE_KEY = 'response:{}'
+STATS_KEY = 'response-cache-stats:{}'
+HIT = 'hits'
+MISS = 'misses'
+CACHE_HEADER = 'X-Cache'
+
+
+def get_response_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def get_cached_response(etag):
+    """Готовый ответ из кеша или None; учитывает попадание и промах."""
+    cached = get_response_cache().get(RESPONSE_KEY.format(etag))
+    record(HIT if cached is not None else MISS)
+    if cached is None:
+        return None
+    content, content_type = cached
+    response = HttpResponse(content, content_type=content_type)
+    response[CACHE_HEADER] = 'HIT'
+    return response
+
+
+def cache_response(etag, response):
+    """Сохраняет ответ в кеш после его отрисовки."""
+    def store(rendered):
+        get_response_cache().set(
+            RESPONSE_KEY.format(etag),
+            (rendered.content, rendered['Content-Type'])
+        )
+
+    response[CACHE_HEADER] = 'MISS'
+    response.add_post_render_callback(store)
+
+
+def record(counter):
+    """Счётчики лежат в кеше версий, общем для процессов приложения."""
+    cache = get_version_cache()
+    key = STATS_KEY.format(counter)
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, None)
+
+
+def get_stats():
+    cache = get_version_cache()
+    values = cache.get_many([STATS_KEY.format(HIT), STATS_KEY.format(MISS)])
+    hits = values.get(STATS_KEY.format(HIT), 0)
+    misses = values.get(STATS_KEY.format(MISS), 0)
+    total = hits + misses
+    return {
+        'alias': settings.RESPONSE_CACHE_ALIAS,
+        HIT: hits,
+        MISS: misses,
+        'hit_rate': round(hits / total, 4) if total else None,
+    }
@@ -0,0 +1,87 @@
+"""Настройка соединений с базой данных.
+
+Django 3.2 не проверяет постоянные соединения (CONN_HEALTH_CHECKS
+появился в 4.1), поэтому перед запросом соединение, которое больше
+не работает, закрывается и будет открыто заново при первом обращении.
+Для SQLite при открытии соединения выполняются PRAGMA из SQLITE_PRAGMAS.
+
+ReplicaRouter отправляет чтение на реплики REPLICA_DATABASES, если это
+разрешил ReplicaRoutingMiddleware для текущего запроса; запись и чтение
+вне запросов идут в основную базу.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_routing = ContextVar('replica_routing', default=None)
+
+
+class RoutingState:
+    """Состояние маршрутизации одного запроса."""
+
+    def __init__(self, use_replicas):
+        self.use_replicas = use_replicas
+        self.wrote = False
+
+
+def start_routing(use_replicas):
+    """Начинает маршрутизацию запроса; возвращает состояние и токен."""
+    state = RoutingState(use_replicas)
+    return state, _routing.set(state)
+
+
+def stop_routing(token):
+    _routing.reset(token)
+
+
+def reads_from_replicas():
+    """Читает ли текущий запрос с реплик."""
+    state = _routing.get()
+    return state is not None and state.use_replicas
+
+
+class ReplicaRouter:
+    """Роутер чтения с реплик."""
+
+    def db_for_read(self, model, **hints):
+        if not reads_from_replicas():
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.REPLICA_DATABASES)
+
+    def db_for_write(self, model, **hints):
+        """После записи запрос читает только из основной базы."""
+        state = _routing.get()
+        if state is not None:
+            state.use_replicas = False
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
+        return obj1._state.db in databases and obj2._state.db in databases
+
+    def allow_migrate(self, db, app_label, **hints):
+        """Реплики получают схему репликацией из основной базы."""
+        return db not in settings.REPLICA_DATABASES
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Выполняет PRAGMA для нового соединения с SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def close_unusable_connections(**kwargs):
+    """Закрывает неработающие постоянные соединения перед запросом."""
+    if not settings.DB_CONN_HEALTH_CHECKS:
+        return
+    for connection in connections.all():
+        if (connection.connection is not None
+                and not connection.in_atomic_block
+                and not connection.is_usable()):
+            connection.close()
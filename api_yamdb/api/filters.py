@@ -1,22 +1,64 @@
 import django_filters
 
-from reviews.models import Title
+from reviews.models import Category, Genre, GenreTitle, Title
+from reviews.search import search_titles
+
+
+class SlugInFilter(django_filters.BaseInFilter, django_filters.CharFilter):
+    """Фильтр по списку слагов через запятую."""
 
 
 class TitleFilter(django_filters.FilterSet):
+    """Фильтр произведений.
+
+    genre и category принимают точные слаги через запятую, например
+    ?genre=drama,comedy&category=movie. Поиск по части слага доступен
+    явно через genre__icontains и category__icontains.
+    """
+
     name = django_filters.CharFilter(
         field_name='name',
         lookup_expr='icontains'
     )
-    genre = django_filters.CharFilter(
+    genre = SlugInFilter(method='filter_genre')
+    category = SlugInFilter(method='filter_category')
+    genre__icontains = django_filters.CharFilter(
         field_name='genre__slug',
-        lookup_expr='icontains'
+        lookup_expr='icontains',
+        distinct=True
     )
-    category = django_filters.CharFilter(
+    category__icontains = django_filters.CharFilter(
         field_name='category__slug',
         lookup_expr='icontains'
     )
+    search = django_filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ['category', 'genre', 'name', 'year']
+        fields = ['category', 'genre', 'name', 'year', 'search']
+
+    def filter_genre(self, queryset, name, value):
+        """Произведения любого из жанров: слаги переводятся в id один раз."""
+        genre_ids = list(
+            Genre.objects.filter(slug__in=value).values_list('id', flat=True)
+        )
+        if not genre_ids:
+            return queryset.none()
+        return queryset.filter(pk__in=GenreTitle.objects.filter(
+            genre_id__in=genre_ids
+        ).values('title_id'))
+
+    def filter_category(self, queryset, name, value):
+        """Произведения любой из категорий по их id."""
+        category_ids = list(
+            Category.objects.filter(
+                slug__in=value
+            ).values_list('id', flat=True)
+        )
+        if not category_ids:
+            return queryset.none()
+        return queryset.filter(category_id__in=category_ids)
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск по названию и описанию с ранжированием."""
+        return search_titles(queryset, value)
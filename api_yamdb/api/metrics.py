@@ -0,0 +1,166 @@
+"""Метрики запросов: число и время SQL-запросов, сериализация, итог.
+
+RequestMetricsMiddleware собирает метрики текущего запроса в
+RequestMetrics, а histogram копит их по эндпоинтам в памяти процесса.
+Вне запросов с метриками measure() ничего не делает.
+"""
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from rest_framework import serializers
+
+# Верхние границы корзин гистограммы длительности запроса, мс.
+BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Метрики одного запроса.
+
+    Экземпляр служит обёрткой execute_wrapper для соединений с БД.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.timings = {}
+        self.total = 0.0
+        self._measuring = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_time += perf_counter() - started
+
+    def as_dict(self):
+        return {
+            'queries': self.queries,
+            'sql_ms': round(self.sql_time * 1000, 3),
+            **{
+                f'{name}_ms': round(duration * 1000, 3)
+                for name, duration in self.timings.items()
+            },
+            'total_ms': round(self.total * 1000, 3),
+        }
+
+
+def start(metrics):
+    return _current.set(metrics)
+
+
+def stop(token):
+    _current.reset(token)
+
+
+@contextmanager
+def measure(name):
+    """Добавляет время блока к метрике name текущего запроса.
+
+    Вложенные блоки с тем же именем не учитываются повторно.
+    """
+    metrics = _current.get()
+    if metrics is None or name in metrics._measuring:
+        yield
+        return
+    metrics._measuring.add(name)
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        metrics._measuring.discard(name)
+        metrics.timings[name] = (
+            metrics.timings.get(name, 0.0) + perf_counter() - started
+        )
+
+
+class MeasuredSerializerMixin:
+    """Время сериализации ответа — метрика serialize.
+
+    Замеряется только обращение к data, которое делает вьюсет, поэтому
+    вложенные объекты отдельных замеров не создают. Для списков
+    в Meta сериализатора указывается MeasuredListSerializer.
+    """
+
+    @property
+    def data(self):
+        if _current.get() is None:
+            return super().data
+        with measure('serialize'):
+            return super().data
+
+
+class MeasuredListSerializer(MeasuredSerializerMixin,
+                             serializers.ListSerializer):
+    """Список, сериализация которого замеряется целиком."""
+
+
+class Histogram:
+    """Гистограмма длительности и средние метрики по эндпоинтам."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint, metrics):
+        duration_ms = metrics.total * 1000
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, {
+                'count': 0, 'buckets': [0] * (len(BUCKETS) + 1),
+                'total_ms': 0.0, 'queries': 0, 'sql_ms': 0.0,
+                'serialize_ms': 0.0,
+            })
+            stats['count'] += 1
+            stats['buckets'][bisect_left(BUCKETS, duration_ms)] += 1
+            stats['total_ms'] += duration_ms
+            stats['queries'] += metrics.queries
+            stats['sql_ms'] += metrics.sql_time * 1000
+            stats['serialize_ms'] += (
+                metrics.timings.get('serialize', 0.0) * 1000
+            )
+
+    def snapshot(self):
+        """Гистограммы и средние значения по эндпоинтам."""
+        bounds = [str(bound) for bound in BUCKETS] + ['+Inf']
+        with self._lock:
+            return {
+                endpoint: {
+                    'count': stats['count'],
+                    'buckets_ms': dict(zip(bounds, stats['buckets'])),
+                    'mean_ms': round(stats['total_ms'] / stats['count'], 3),
+                    'mean_queries': round(
+                        stats['queries'] / stats['count'], 2
+                    ),
+                    'mean_sql_ms': round(stats['sql_ms'] / stats['count'], 3),
+                    'mean_serialize_ms': round(
+                        stats['serialize_ms'] / stats['count'], 3
+                    ),
+                }
+                for endpoint, stats in sorted(self._endpoints.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+histogram = Histogram()
+
+
+def get_endpoint(request):
+    """Имя эндпоинта: вьюсет и действие или имя маршрута."""
+    match = request.resolver_match
+    if match is None:
+        return 'unresolved'
+    view_class = getattr(match.func, 'cls', None)
+    if view_class is None:
+        return match.view_name
+    actions = getattr(match.func, 'actions', None) or {}
+    action = actions.get(request.method.lower(), request.method.lower())
+    return f'{view_class.__name__}.{action}'
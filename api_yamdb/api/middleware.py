@@ -0,0 +1,126 @@
+import hashlib
+import json
+import logging
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import metrics
+from .database import start_routing, stop_routing
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PRIMARY_KEY = 'db-primary:{}'
+
+logger = logging.getLogger('api.metrics')
+
+
+def get_pin_cache():
+    return caches[settings.DB_REPLICA_PIN_CACHE_ALIAS]
+
+
+class ReplicaRoutingMiddleware:
+    """Направляет чтение безопасных запросов на реплики.
+
+    После запроса с записью клиент DB_REPLICA_STICKINESS секунд читает
+    из основной базы, чтобы видеть свои изменения, пока реплики отстают.
+    Клиент определяется по заголовку Authorization или cookie сессии,
+    отметка о записи хранится в кеше DB_REPLICA_PIN_CACHE_ALIAS, общем
+    для процессов приложения. Без реплик в настройках middleware
+    отключается.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REPLICA_DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        client_key = self.get_client_key(request)
+        state, token = start_routing(
+            request.method in SAFE_METHODS
+            and not self.is_pinned(client_key)
+        )
+        try:
+            response = self.get_response(request)
+        finally:
+            stop_routing(token)
+        if client_key and (state.wrote or request.method not in SAFE_METHODS):
+            get_pin_cache().set(
+                PRIMARY_KEY.format(client_key), True,
+                settings.DB_REPLICA_STICKINESS
+            )
+        return response
+
+    @staticmethod
+    def get_client_key(request):
+        credentials = request.META.get('HTTP_AUTHORIZATION') or (
+            request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        )
+        if not credentials:
+            return None
+        return hashlib.sha256(credentials.encode()).hexdigest()
+
+    @staticmethod
+    def is_pinned(client_key):
+        return bool(client_key) and get_pin_cache().get(
+            PRIMARY_KEY.format(client_key), False
+        )
+
+
+class RequestMetricsMiddleware:
+    """Собирает метрики каждого запроса.
+
+    Число и время SQL-запросов, время сериализации и общее время
+    отдаются в заголовке Server-Timing, пишутся в лог api.metrics
+    строкой JSON и копятся в гистограмме api.metrics.histogram.
+    Без REQUEST_METRICS_ENABLED middleware отключается.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.start(request_metrics)
+        started = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(
+                        connections[alias].execute_wrapper(request_metrics)
+                    )
+                response = self.get_response(request)
+        finally:
+            request_metrics.total = perf_counter() - started
+            metrics.stop(token)
+
+        endpoint = metrics.get_endpoint(request)
+        response['Server-Timing'] = self.get_server_timing(request_metrics)
+        metrics.histogram.record(endpoint, request_metrics)
+        logger.info(json.dumps({
+            'endpoint': endpoint,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            **request_metrics.as_dict(),
+        }))
+        return response
+
+    @staticmethod
+    def get_server_timing(request_metrics):
+        entries = [
+            f'db;desc="{request_metrics.queries} queries";'
+            f'dur={request_metrics.sql_time * 1000:.3f}'
+        ]
+        entries += [
+            f'{name};dur={duration * 1000:.3f}'
+            for name, duration in request_metrics.timings.items()
+        ]
+        entries.append(f'total;dur={request_metrics.total * 1000:.3f}')
+        return ', '.join(entries)
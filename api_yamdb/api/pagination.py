@@ -0,0 +1,149 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Курсорная пагинация по паре (pub_date, id).
+
+    Направление сортировки берётся из первого поля Meta.ordering модели,
+    id служит уникальным дополнением ключа. Страница выбирается условием
+    WHERE по ключу, поэтому глубокие страницы не дороже первой,
+    а COUNT(*) не выполняется вовсе.
+    """
+
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор.'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        ordering = queryset.model._meta.ordering[0]
+        self.field = ordering.lstrip('-')
+        self.descending = ordering.startswith('-')
+
+        position, reverse = self.decode_cursor(request)
+        queryset = queryset.order_by(*self.get_ordering(reverse))
+        if position is not None:
+            queryset = queryset.filter(
+                self.get_position_filter(position, reverse)
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, reverse):
+        """Порядок выборки: ключ сортировки и id в одном направлении."""
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        return f'{prefix}{self.field}', f'{prefix}pk'
+
+    def get_position_filter(self, position, reverse):
+        """Условие «строго после позиции курсора» для пары (ключ, id)."""
+        value, pk = position
+        lookup = 'lt' if self.descending != reverse else 'gt'
+        return (
+            Q(**{f'{self.field}__{lookup}': value})
+            | Q(**{self.field: value, f'pk__{lookup}': pk})
+        )
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, instance, reverse):
+        """Собирает ссылку с курсором на позицию объекта."""
+        value = getattr(instance, self.field)
+        payload = json.dumps({
+            'v': value.isoformat(), 'id': instance.pk, 'r': int(reverse)
+        })
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, cursor
+        )
+
+    def decode_cursor(self, request):
+        """Возвращает позицию курсора и направление выборки.
+
+        Пустой курсор означает первую страницу.
+        """
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            value = parse_datetime(payload['v'])
+            position = (value, int(payload['id']))
+            reverse = bool(payload['r'])
+        except (binascii.Error, KeyError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+
+class PageNumberOrKeysetPagination(PageNumberPagination):
+    """Постраничная пагинация с включаемым курсорным режимом.
+
+    Курсорный режим включается параметром cursor: пустое значение
+    запрашивает первую страницу, дальше используются ссылки next/previous.
+    """
+
+    keyset_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        cursor_param = self.keyset_pagination_class.cursor_query_param
+        if cursor_param not in request.query_params:
+            self.keyset = None
+            return super().paginate_queryset(queryset, request, view)
+        self.keyset = self.keyset_pagination_class()
+        return self.keyset.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
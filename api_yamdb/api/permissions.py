@@ -25,7 +25,7 @@ class IsAuthorOrModerOrAdminOrReadOnly(permissions.IsAuthenticatedOrReadOnly):
             return True
 
         return (
-            obj.author == request.user
+            obj.author_id == request.user.pk
             or request.user.is_admin
             or request.user.is_moderator
         )
@@ -36,3 +36,12 @@ class IsAdmin(permissions.BasePermission):
 
     def has_permission(self, request, view):
         return request.user.is_authenticated and request.user.is_admin
+
+
+class IsModerOrAdmin(permissions.BasePermission):
+    """Проверяет, является ли пользователь модератором или администратором."""
+
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and (
+            request.user.is_moderator or request.user.is_admin
+        )
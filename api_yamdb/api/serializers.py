@@ -2,13 +2,19 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
 from django.core.exceptions import ObjectDoesNotExist
-from django.core.mail import send_mail
+from django.db import transaction
 from django.shortcuts import get_object_or_404
+from django.utils.encoding import smart_str
 from rest_framework import serializers, status
 from rest_framework.relations import SlugRelatedField
 
-from reviews.models import Category, Comment, Genre, Review, Title
+from .metrics import MeasuredListSerializer, MeasuredSerializerMixin
+from reviews.bulk import bulk_create_with_ids, titles_written
+from reviews.changes import batched_changes
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title)
 from users.constants import MAX_EMAIL_LEN, MAX_USERNAME_LEN
+from users.outbox import enqueue_email
 from users.validators import username_validator
 
 User = get_user_model()
@@ -69,13 +75,11 @@ class SignUpSerializer(serializers.Serializer):
         return user
 
     def send_email_token(self, text, confirmation_code, email):
-        """Отправка сообщения на почту с кодом подтверждения."""
-        send_mail(
+        """Постановка сообщения с кодом подтверждения в очередь отправки."""
+        enqueue_email(
             subject=text,
             message=f'Ваш код подтверждения: {confirmation_code}',
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[email],
-            fail_silently=True,
+            recipient=email,
         )
 
 
@@ -123,36 +127,61 @@ class UserMeSerializer(UserSerializer):
         read_only_fields = ('role',)
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(MeasuredSerializerMixin, serializers.ModelSerializer):
     """Сериализатор для жанров."""
 
     class Meta:
         model = Genre
         fields = ('name', 'slug')
+        list_serializer_class = MeasuredListSerializer
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(MeasuredSerializerMixin, serializers.ModelSerializer):
     """Сериализатор для категорий."""
 
     class Meta:
         model = Category
         fields = ('name', 'slug')
+        list_serializer_class = MeasuredListSerializer
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(MeasuredSerializerMixin,
+                          serializers.ModelSerializer):
+    """Сериализатор произведения для чтения.
+
+    Блок stats с распределением оценок добавляется по ?expand=stats.
+    Он строится из полей произведения и не требует запросов к отзывам.
+    """
+
     genre = GenreSerializer(many=True)
     category = CategorySerializer()
     rating = serializers.IntegerField(read_only=True)
+    stats = serializers.SerializerMethodField()
 
     class Meta:
         model = Title
         fields = (
             'id', 'name', 'year', 'rating', 'description', 'genre',
-            'category'
+            'category', 'stats'
         )
+        list_serializer_class = MeasuredListSerializer
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        expand = request.query_params.get('expand', '') if request else ''
+        if 'stats' not in expand.split(','):
+            self.fields.pop('stats')
+
+    def get_stats(self, title):
+        return {
+            'review_count': title.review_count,
+            'histogram': title.score_histogram,
+        }
 
 
-class TitleWriteSerializer(serializers.ModelSerializer):
+class TitleWriteSerializer(MeasuredSerializerMixin,
+                           serializers.ModelSerializer):
     genre = serializers.SlugRelatedField(
         allow_null=False, allow_empty=False,
         slug_field='slug', queryset=Genre.objects.all(), many=True
@@ -169,29 +198,198 @@ class TitleWriteSerializer(serializers.ModelSerializer):
         )
 
 
-class ReviewSerializer(serializers.ModelSerializer):
-    """Сериализатор отчёта."""
+class BatchSlugRelatedField(serializers.SlugRelatedField):
+    """Связь по слагу, объекты для которой загружены на всю пачку.
 
-    author = SlugRelatedField(read_only=True, slug_field='username')
+    Словарь {слаг: объект} лежит в контексте под ключом context_key,
+    поэтому проверка элемента пачки не обращается к базе.
+    """
+
+    def __init__(self, context_key, **kwargs):
+        self.context_key = context_key
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            return self.context[self.context_key][data]
+        except KeyError:
+            self.fail(
+                'does_not_exist', slug_name=self.slug_field,
+                value=smart_str(data)
+            )
+        except TypeError:
+            self.fail('invalid')
+
+
+class BatchPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Связь по id, объекты для которой загружены на всю пачку."""
+
+    def __init__(self, context_key, **kwargs):
+        self.context_key = context_key
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        pk = get_batch_pk(data)
+        if pk is None:
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return self.context[self.context_key][pk]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=pk)
+
+
+def get_batch_pk(value):
+    """Приводит id из тела запроса к int или возвращает None."""
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class TitleBulkListSerializer(serializers.ListSerializer):
+    """Пачка произведений для массовой записи.
+
+    Жанры и категории по слагам и изменяемые произведения по id
+    загружаются до проверки элементов, одним запросом на модель.
+    Пачка записывается одной транзакцией.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self._context.update(self.load_related(data))
+        return super().to_internal_value(data)
+
+    def load_related(self, data):
+        items = [item for item in data if isinstance(item, dict)]
+        genres = {
+            slug for item in items
+            if isinstance(item.get('genre'), list)
+            for slug in item['genre'] if isinstance(slug, str)
+        }
+        categories = {
+            item['category'] for item in items
+            if isinstance(item.get('category'), str)
+        }
+        related = {
+            'genres': Genre.objects.in_bulk(genres, field_name='slug'),
+            'categories': Category.objects.in_bulk(
+                categories, field_name='slug'
+            ),
+        }
+        if 'id' in self.child.fields:
+            ids = {get_batch_pk(item.get('id')) for item in items}
+            ids.discard(None)
+            related['titles'] = Title.objects.in_bulk(ids)
+        return related
+
+    def save(self):
+        with transaction.atomic(), batched_changes():
+            if self.partial:
+                self.instance = self.update(None, self.validated_data)
+            else:
+                self.instance = self.create(self.validated_data)
+        return self.instance
+
+    def create(self, validated_data):
+        titles = [
+            Title(**{
+                field: value for field, value in item.items()
+                if field != 'genre'
+            })
+            for item in validated_data
+        ]
+        bulk_create_with_ids(Title, titles)
+        self.set_genres(
+            zip(titles, (item['genre'] for item in validated_data))
+        )
+        titles_written(titles)
+        return titles
+
+    def update(self, instance, validated_data):
+        titles, genres, fields = {}, {}, set()
+        for item in validated_data:
+            item = dict(item)
+            title = item.pop('id')
+            if 'genre' in item:
+                genres[title] = item.pop('genre')
+            for field, value in item.items():
+                setattr(title, field, value)
+            fields.update(item)
+            titles[title.pk] = title
+        titles = list(titles.values())
+        if fields:
+            Title.objects.bulk_update(titles, fields)
+        if genres:
+            GenreTitle.objects.filter(title__in=list(genres)).delete()
+            self.set_genres(genres.items())
+        titles_written(titles)
+        return titles
+
+    @staticmethod
+    def set_genres(title_genres):
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title=title, genre=genre)
+            for title, genres in title_genres
+            for genre in dict.fromkeys(genres)
+        )
+
+
+class TitleBulkCreateSerializer(serializers.ModelSerializer):
+    """Элемент пачки новых произведений."""
+
+    genre = BatchSlugRelatedField(
+        'genres', slug_field='slug', queryset=Genre.objects.all(),
+        many=True, allow_empty=False
+    )
+    category = BatchSlugRelatedField(
+        'categories', slug_field='slug', queryset=Category.objects.all()
+    )
 
     class Meta:
-        fields = ('id', 'text', 'author', 'score', 'pub_date')
-        model = Review
+        model = Title
+        fields = ('name', 'year', 'description', 'genre', 'category')
+        list_serializer_class = TitleBulkListSerializer
+
+
+class TitleBulkUpdateSerializer(TitleBulkCreateSerializer):
+    """Элемент пачки изменений: id и изменяемые поля произведения."""
+
+    id = BatchPrimaryKeyRelatedField('titles', queryset=Title.objects.all())
+
+    class Meta(TitleBulkCreateSerializer.Meta):
+        fields = ('id',) + TitleBulkCreateSerializer.Meta.fields
 
     def validate(self, data):
-        if self.context.get('request').method == 'POST':
-            unique_review = Review.objects.filter(
-                author=self.context.get('request').user,
-                title_id=self.context.get('view').kwargs.get('title_id')
+        if 'id' not in data:
+            raise serializers.ValidationError(
+                {'id': [self.fields['id'].error_messages['required']]}
             )
-            if unique_review.exists():
-                raise serializers.ValidationError(
-                    'Нельзя оставлять более одного отзыва.'
-                )
         return data
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class TitleBulkDeleteSerializer(serializers.Serializer):
+    """Элемент пачки удаляемых произведений."""
+
+    id = BatchPrimaryKeyRelatedField('titles', queryset=Title.objects.all())
+
+    class Meta:
+        list_serializer_class = TitleBulkListSerializer
+
+
+class ReviewSerializer(MeasuredSerializerMixin, serializers.ModelSerializer):
+    """Сериализатор отчёта."""
+
+    author = SlugRelatedField(read_only=True, slug_field='username')
+
+    class Meta:
+        fields = ('id', 'text', 'author', 'score', 'pub_date')
+        model = Review
+        list_serializer_class = MeasuredListSerializer
+
+
+class CommentSerializer(MeasuredSerializerMixin, serializers.ModelSerializer):
     """Сериализатор комментария."""
 
     author = SlugRelatedField(read_only=True, slug_field='username')
@@ -199,3 +397,67 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ('id', 'text', 'author', 'pub_date')
+        list_serializer_class = MeasuredListSerializer
+
+
+class ReviewModerationSerializer(serializers.Serializer):
+    """Условия отбора отзывов для массового удаления.
+
+    Условия объединяются через И, нужно хотя бы одно. При dry_run
+    записи только подсчитываются.
+    """
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False,
+        max_length=settings.MODERATION_MAX_IDS
+    )
+    author = serializers.CharField(
+        required=False, max_length=MAX_USERNAME_LEN
+    )
+    text = serializers.CharField(required=False)
+    title = serializers.IntegerField(required=False)
+    dry_run = serializers.BooleanField(default=False)
+
+    lookups = {
+        'ids': 'pk__in',
+        'author': 'author__username',
+        'text': 'text__icontains',
+        'title': 'title_id',
+    }
+
+    def validate(self, data):
+        if not any(name in data for name in self.lookups):
+            raise serializers.ValidationError(
+                'Укажите id записей или хотя бы одно условие отбора: '
+                f'{", ".join(self.lookups)}.'
+            )
+        return data
+
+    def filter_queryset(self, queryset):
+        return queryset.filter(**{
+            lookup: self.validated_data[name]
+            for name, lookup in self.lookups.items()
+            if name in self.validated_data
+        })
+
+
+class CommentModerationSerializer(ReviewModerationSerializer):
+    """Условия отбора комментариев для массового удаления."""
+
+    review = serializers.IntegerField(required=False)
+
+    lookups = {
+        **ReviewModerationSerializer.lookups,
+        'title': 'review__title_id',
+        'review': 'review_id',
+    }
+
+
+class ChangeFeedSerializer(serializers.Serializer):
+    """Параметры запроса журнала изменений."""
+
+    since = serializers.IntegerField(min_value=0, required=False)
+    limit = serializers.IntegerField(
+        min_value=1, max_value=settings.CHANGE_FEED_MAX_PAGE_SIZE,
+        default=settings.CHANGE_FEED_PAGE_SIZE
+    )
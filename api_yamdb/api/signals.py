@@ -0,0 +1,21 @@
+from django.contrib.auth import get_user_model
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_cached_user
+from .database import close_unusable_connections, configure_sqlite
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    """Сбрасывает кеш аутентификации при изменении пользователя."""
+    invalidate_cached_user(instance.pk)
+
+
+connection_created.connect(configure_sqlite)
+request_started.connect(close_unusable_connections)
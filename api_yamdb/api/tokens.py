@@ -0,0 +1,23 @@
+from rest_framework_simplejwt.tokens import AccessToken
+
+ROLE_CLAIM = 'role'
+IS_STAFF_CLAIM = 'is_staff'
+IS_SUPERUSER_CLAIM = 'is_superuser'
+TOKEN_VERSION_CLAIM = 'token_version'
+
+
+class RoleAccessToken(AccessToken):
+    """Access-токен с правами пользователя в claims.
+
+    Права проверяются по токену без загрузки пользователя из БД,
+    а версия токенов пользователя отзывает токены с устаревшими правами.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[ROLE_CLAIM] = user.role
+        token[IS_STAFF_CLAIM] = user.is_staff
+        token[IS_SUPERUSER_CLAIM] = user.is_superuser
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        return token
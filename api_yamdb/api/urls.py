@@ -1,8 +1,10 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (AuthViewSet, CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, TitleViewSet, UserViewSet)
+from .views import (AuthViewSet, CacheStatsView, CategoryViewSet,
+                    ChangesView, CommentViewSet, ExportView, GenreViewSet,
+                    MetricsView, ModerationViewSet, ReviewViewSet,
+                    TitleViewSet, UserViewSet)
 
 app_name = 'api'
 
@@ -12,6 +14,7 @@ v1_router.register('users', UserViewSet, basename='users')
 v1_router.register('titles', TitleViewSet, basename='titles')
 v1_router.register('categories', CategoryViewSet, basename='categories')
 v1_router.register('genres', GenreViewSet, basename='genres')
+v1_router.register('moderation', ModerationViewSet, basename='moderation')
 v1_router.register(
     r'titles/(?P<title_id>\d+)/reviews', ReviewViewSet, basename='reviews'
 )
@@ -21,5 +24,9 @@ v1_router.register(
 )
 
 urlpatterns = [
+    path('v1/cache-stats/', CacheStatsView.as_view(), name='cache-stats'),
+    path('v1/metrics/', MetricsView.as_view(), name='metrics'),
+    path('v1/changes/', ChangesView.as_view(), name='changes'),
+    path('v1/export/<str:dataset>/', ExportView.as_view(), name='export'),
     path('v1/', include(v1_router.urls)),
 ]
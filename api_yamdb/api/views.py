@@ -1,22 +1,36 @@
-from django.db.models import Avg
-from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 
+from .caching import get_stats
 from .filters import TitleFilter
+from .metrics import histogram
+from .pagination import PageNumberOrKeysetPagination
 from .permissions import (IsAdmin, IsAdminOrReadOnly,
-                          IsAuthorOrModerOrAdminOrReadOnly)
-from .serializers import (CategorySerializer, CommentSerializer,
-                          GenreSerializer, ReviewSerializer, SignUpSerializer,
-                          TitleReadSerializer, TitleWriteSerializer,
-                          TokenObtainSerializer, UserMeSerializer,
-                          UserSerializer)
-from .viewsets import CreateListDeleteViewSet
-from reviews.models import Category, Genre, Review, Title, User
+                          IsAuthorOrModerOrAdminOrReadOnly, IsModerOrAdmin)
+from .serializers import (CategorySerializer, ChangeFeedSerializer,
+                          CommentModerationSerializer,
+                          CommentSerializer, GenreSerializer,
+                          ReviewModerationSerializer, ReviewSerializer,
+                          SignUpSerializer,
+                          TitleBulkCreateSerializer,
+                          TitleBulkDeleteSerializer,
+                          TitleBulkUpdateSerializer, TitleReadSerializer,
+                          TitleWriteSerializer, TokenObtainSerializer,
+                          UserMeSerializer, UserSerializer)
+from .tokens import RoleAccessToken
+from .viewsets import (ConditionalGetMixin, ConditionalListMixin,
+                       CreateListDeleteViewSet, NestedResourceMixin)
+from reviews import changes, export, versions
+from reviews.bulk import delete_in_chunks
+from reviews.models import Category, Comment, Genre, Review, Title, User
 
 
 class AuthViewSet(viewsets.ViewSet):
@@ -52,8 +66,8 @@ class AuthViewSet(viewsets.ViewSet):
 
         user = serializer.validated_data['user']
 
-        # Генерация JWT-токена
-        access_token = AccessToken.for_user(user)
+        # Генерация JWT-токена с правами пользователя в claims
+        access_token = RoleAccessToken.for_user(user)
         return Response({
             'token': str(access_token)
         }, status=status.HTTP_200_OK)
@@ -102,83 +116,291 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class CategoryViewSet(CreateListDeleteViewSet):
+class CacheStatsView(APIView):
+    """Статистика кеша ответов каталога (только для администраторов)."""
+
+    permission_classes = (IsAdmin, )
+
+    def get(self, request):
+        return Response(get_stats())
+
+
+class MetricsView(APIView):
+    """Гистограммы метрик запросов процесса (только для администраторов)."""
+
+    permission_classes = (IsAdmin, )
+
+    def get(self, request):
+        return Response({
+            'enabled': settings.REQUEST_METRICS_ENABLED,
+            'endpoints': histogram.snapshot(),
+        })
+
+
+class ExportView(APIView):
+    """Потоковая выгрузка таблицы (только для администраторов).
+
+    Формат задаётся параметром output: ndjson (по умолчанию) или csv.
+    Параметр format занят выбором рендерера DRF.
+    """
+
+    permission_classes = (IsAdmin, )
+
+    def get(self, request, dataset):
+        if dataset not in export.DATASETS:
+            raise NotFound(
+                f'Выгрузка {dataset} не найдена. Доступны: '
+                f'{", ".join(export.DATASETS)}.'
+            )
+        output = request.query_params.get('output', export.NDJSON)
+        if output not in export.OUTPUTS:
+            raise ValidationError({
+                'output': [f'Допустимые значения: '
+                           f'{", ".join(export.OUTPUTS)}.']
+            })
+        dataset = export.DATASETS[dataset]
+        response = StreamingHttpResponse(
+            dataset.stream(output, settings.EXPORT_CHUNK_SIZE),
+            content_type=export.OUTPUTS[output]
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{dataset.get_file_name(output)}"'
+        )
+        return response
+
+
+class ChangesView(APIView):
+    """Журнал изменений после курсора (только для администраторов).
+
+    Без since возвращает текущий курсор: потребитель делает полную
+    выгрузку и дальше запрашивает изменения после этого курсора. Курсор
+    меньше границы хранения журнала получает ответ 410.
+    """
+
+    permission_classes = (IsAdmin, )
+
+    def get(self, request):
+        serializer = ChangeFeedSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        since = serializer.validated_data.get('since')
+        if since is None:
+            return Response({
+                'next': changes.get_head(), 'has_more': False, 'results': [],
+            })
+        horizon = changes.get_horizon()
+        if since < horizon:
+            return Response(
+                {
+                    'detail': 'Курсор устарел, нужна полная выгрузка.',
+                    'horizon': horizon,
+                },
+                status=status.HTTP_410_GONE
+            )
+        limit = serializer.validated_data['limit']
+        entries = changes.get_changes(since, limit + 1)
+        return Response({
+            'next': entries[:limit][-1].pk if entries else since,
+            'has_more': len(entries) > limit,
+            'results': changes.describe_changes(entries[:limit]),
+        })
+
+
+class CategoryViewSet(ConditionalListMixin, CreateListDeleteViewSet):
     """Вьюсет для просмотра категорий."""
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    list_versions = (versions.CATEGORIES, versions.EPOCH)
 
 
-class GenreViewSet(CreateListDeleteViewSet):
+class GenreViewSet(ConditionalListMixin, CreateListDeleteViewSet):
     """Вьюсет для просмотра жанров."""
 
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    list_versions = (versions.GENRES, versions.EPOCH)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """Вьюсет для просмотра произведений."""
 
-    queryset = Title.objects.all().annotate(
-        rating=Avg('reviews__score')
+    queryset = Title.objects.select_related('category').prefetch_related(
+        'genre'
     )
     filterset_class = TitleFilter
     permission_classes = (IsAdminOrReadOnly, )
     http_method_names = ('get', 'post', 'patch', 'delete')
+    list_versions = versions.CATALOGUE
+
+    def get_retrieve_versions(self):
+        """Произведение, его отзывы и жанры, а также названия жанров
+        и категорий."""
+        return (
+            versions.title_version(self.kwargs[self.lookup_field]),
+            versions.GENRES, versions.CATEGORIES, versions.EPOCH,
+        )
 
     def get_serializer_class(self):
         if self.action in ['list', 'retrieve']:
             return TitleReadSerializer
         return TitleWriteSerializer
 
+    def perform_create(self, serializer):
+        """Произведение и его жанры записываются одной транзакцией
+        с одной записью журнала."""
+        with transaction.atomic(), changes.batched_changes():
+            super().perform_create(serializer)
+
+    def perform_update(self, serializer):
+        with transaction.atomic(), changes.batched_changes():
+            super().perform_update(serializer)
+
+    @action(detail=False, methods=['post', 'patch', 'delete'],
+            url_path='bulk')
+    def bulk(self, request):
+        """Массовое создание, изменение и удаление произведений.
+
+        Тело запроса — массив элементов. Пачка записывается целиком
+        или не записывается вовсе: при ошибках в ответе 400 перечислены
+        номера элементов и их ошибки.
+        """
+        serializer_class = {
+            'POST': TitleBulkCreateSerializer,
+            'PATCH': TitleBulkUpdateSerializer,
+            'DELETE': TitleBulkDeleteSerializer,
+        }[request.method]
+        serializer = serializer_class(
+            data=request.data, many=True, allow_empty=False,
+            max_length=settings.TITLE_BULK_MAX_ITEMS,
+            partial=request.method == 'PATCH',
+            context=self.get_serializer_context()
+        )
+        if not serializer.is_valid():
+            return Response(
+                self.get_bulk_errors(serializer.errors),
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if request.method == 'DELETE':
+            deleted = self.bulk_delete(serializer.validated_data)
+            return Response({'deleted': deleted})
+        titles = serializer.save()
+        return Response(
+            TitleReadSerializer(self.get_bulk_titles(titles), many=True).data,
+            status=(
+                status.HTTP_201_CREATED if request.method == 'POST'
+                else status.HTTP_200_OK
+            )
+        )
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    @staticmethod
+    def get_bulk_errors(errors):
+        """Ошибки элементов пачки с их номерами."""
+        if not isinstance(errors, list):
+            return errors
+        return {'errors': [
+            {'index': index, 'errors': item_errors}
+            for index, item_errors in enumerate(errors) if item_errors
+        ]}
+
+    def get_bulk_titles(self, titles):
+        """Заново читает записанные произведения в порядке пачки."""
+        loaded = self.get_queryset().in_bulk([title.pk for title in titles])
+        return [loaded[title.pk] for title in titles]
+
+    @staticmethod
+    def bulk_delete(validated_data):
+        ids = {item['id'].pk for item in validated_data}
+        with transaction.atomic(), changes.batched_changes():
+            Title.objects.filter(pk__in=ids).delete()
+        return len(ids)
+
+
+class ReviewViewSet(NestedResourceMixin, viewsets.ModelViewSet):
     """Предсталение отзыва на произведение."""
 
+    queryset = Review.objects.select_related('author')
     serializer_class = ReviewSerializer
-    pagination_class = PageNumberPagination
+    pagination_class = PageNumberOrKeysetPagination
     permission_classes = (IsAuthorOrModerOrAdminOrReadOnly,)
     http_method_names = ['get', 'post', 'patch', 'delete']
-
-    @property
-    def reviewed_title(self):
-        """Метод получения объекта класса произведение по id."""
-        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-
-    def get_queryset(self):
-        """Метод получения всех отзывов к произведению."""
-        return self.reviewed_title.reviews.all()
+    parent_model = Title
+    parent_field = 'title'
+    parent_lookups = {'pk': 'title_id'}
+    child_lookups = {'title_id': 'title_id'}
 
     def perform_create(self, serializer):
-        """Метод переопределения автора и произведения у отзыва."""
-        serializer.save(author=self.request.user, title=self.reviewed_title)
-
+        """Создание отзыва без предварительной проверки уникальности.
 
-class CommentViewSet(viewsets.ModelViewSet):
+        Повторный отзыв отсекает ограничение unique_together модели,
+        ошибка БД превращается в ответ 400, если отзыв автора на это
+        произведение действительно есть; иначе ошибка не скрывается.
+        Произведение загружается до начала транзакции, чтобы она
+        начиналась сразу с записи.
+        """
+        title = self.get_parent()
+        try:
+            with transaction.atomic():
+                super().perform_create(serializer)
+        except IntegrityError:
+            if not Review.objects.filter(
+                author=self.request.user, title=title
+            ).exists():
+                raise
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Нельзя оставлять более одного отзыва.'
+                ]
+            })
+
+
+class CommentViewSet(NestedResourceMixin, viewsets.ModelViewSet):
     """Предсталение комментария к отзыву."""
 
+    queryset = Comment.objects.select_related('author')
     serializer_class = CommentSerializer
-    pagination_class = PageNumberPagination
+    pagination_class = PageNumberOrKeysetPagination
     permission_classes = (IsAuthorOrModerOrAdminOrReadOnly,)
     http_method_names = ['get', 'post', 'patch', 'delete']
+    parent_model = Review
+    parent_field = 'review'
+    parent_lookups = {'pk': 'review_id', 'title_id': 'title_id'}
+    child_lookups = {'review_id': 'review_id', 'review__title_id': 'title_id'}
 
-    @property
-    def commented_review(self):
-        """Метод получения объекта класса отзыва по id."""
-        review = get_object_or_404(
-            Review,
-            pk=self.kwargs.get('review_id'),
-            title_id=self.kwargs.get('title_id')
-        )
-        return review
 
-    def get_queryset(self):
-        """Метод получения всех комметариев к отзыву."""
-        return self.commented_review.comments.all()
+class ModerationViewSet(viewsets.ViewSet):
+    """Массовое удаление отзывов и комментариев модератором.
 
-    def perform_create(self, serializer):
-        """Метод переопределения автора и отзыва у коментария."""
-        serializer.save(
-            author=self.request.user,
-            review=self.commented_review
-        )
+    Записи удаляются пачками по MODERATION_CHUNK_SIZE, каждая пачка
+    в своей транзакции; рейтинги произведений пересчитываются один раз
+    на пачку, а не после каждого отзыва.
+    """
+
+    permission_classes = (IsModerOrAdmin,)
+
+    @action(detail=False, methods=['post'], url_path='reviews')
+    def reviews(self, request):
+        """Удаление отзывов вместе с их комментариями."""
+        serializer = ReviewModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        reviews = serializer.filter_queryset(Review.objects.all())
+        if serializer.validated_data['dry_run']:
+            return Response({
+                'reviews': reviews.count(),
+                'comments': Comment.objects.filter(review__in=reviews).count(),
+            })
+        deleted = delete_in_chunks(reviews, settings.MODERATION_CHUNK_SIZE)
+        return Response({
+            'reviews': deleted[Review._meta.label],
+            'comments': deleted[Comment._meta.label],
+        })
+
+    @action(detail=False, methods=['post'], url_path='comments')
+    def comments(self, request):
+        """Удаление комментариев."""
+        serializer = CommentModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        comments = serializer.filter_queryset(Comment.objects.all())
+        if serializer.validated_data['dry_run']:
+            return Response({'comments': comments.count()})
+        deleted = delete_in_chunks(comments, settings.MODERATION_CHUNK_SIZE)
+        return Response({'comments': deleted[Comment._meta.label]})
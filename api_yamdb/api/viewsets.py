@@ -1,8 +1,103 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from rest_framework import mixins, viewsets
 from rest_framework.filters import SearchFilter
 from rest_framework.pagination import PageNumberPagination
 
+from .caching import cache_response, get_cached_response
+from .database import reads_from_replicas
 from .permissions import IsAdminOrReadOnly
+from reviews.versions import get_versions
+
+
+class ConditionalListMixin:
+    """Миксин условных GET-запросов к списку по версиям данных.
+
+    ETag и Last-Modified строятся по версиям из reviews.versions, без
+    запросов к таблицам. Если клиент прислал актуальные If-None-Match или
+    If-Modified-Since, ответ 304 возвращается до выборки и сериализации.
+    Ответы анонимным пользователям берутся из кеша api.caching.
+    Ответ, прочитанный с реплики вскоре после изменения данных, может
+    быть устаревшим, поэтому он не получает ETag и не кешируется.
+    list_versions — версии, от которых зависит список.
+    """
+
+    list_versions = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            self.list_versions, super().list, request, *args, **kwargs
+        )
+
+    def conditional_response(self, names, handler, request, *args,
+                             **kwargs):
+        versions = get_versions(names)
+        etag = quote_etag(self.get_etag(request, versions))
+        last_modified = max(versions.values()) // 10 ** 9
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        use_cache = not request.user.is_authenticated
+        if response is None and use_cache:
+            response = get_cached_response(etag)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if (response.status_code != 200
+                    or self.may_be_stale(max(versions.values()))):
+                return response
+            if use_cache:
+                cache_response(etag, response)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    @staticmethod
+    def may_be_stale(version):
+        """Данные изменились позже, чем реплики гарантированно догонят."""
+        lag = time.time_ns() - version
+        return (
+            reads_from_replicas()
+            and lag < settings.DB_REPLICA_STICKINESS * 10 ** 9
+        )
+
+    @staticmethod
+    def get_etag(request, versions):
+        """Хеш адреса, формата ответа и версий данных.
+
+        Параметры запроса сортируются, пустые значения отбрасываются.
+        """
+        params = sorted(
+            (key, sorted(value for value in values if value))
+            for key, values in request.query_params.lists()
+            if any(values)
+        )
+        renderer = getattr(request, 'accepted_renderer', None)
+        source = repr((
+            request.path, params, getattr(renderer, 'format', None),
+            sorted(versions.items()),
+        ))
+        return hashlib.md5(source.encode()).hexdigest()
+
+
+class ConditionalGetMixin(ConditionalListMixin):
+    """Условные GET-запросы к списку и к отдельному объекту.
+
+    get_retrieve_versions() возвращает версии одного объекта.
+    """
+
+    def get_retrieve_versions(self):
+        return self.list_versions
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            self.get_retrieve_versions(), super().retrieve,
+            request, *args, **kwargs
+        )
 
 
 class CreateListDeleteViewSet(mixins.CreateModelMixin, mixins.ListModelMixin,
@@ -15,3 +110,49 @@ class CreateListDeleteViewSet(mixins.CreateModelMixin, mixins.ListModelMixin,
     search_fields = ('name', )
     permission_classes = (IsAdminOrReadOnly, )
     lookup_field = 'slug'
+
+
+class NestedResourceMixin:
+    """Миксин для ресурсов, вложенных в родительский объект.
+
+    parent_lookups связывает поля родительской модели с параметрами URL,
+    child_lookups — поля дочерней модели с параметрами URL. Список
+    фильтруется по id из URL без загрузки родителя; родитель загружается
+    один раз за запрос — при создании объекта или если страница пуста,
+    чтобы вернуть 404 для несуществующего родителя.
+    """
+
+    parent_model = None
+    parent_field = None
+    parent_lookups = {}
+    child_lookups = {}
+
+    def get_url_filter(self, lookups):
+        return {
+            field: self.kwargs.get(kwarg) for field, kwarg in lookups.items()
+        }
+
+    def get_parent(self):
+        """Родительский объект, загруженный не больше одного раза."""
+        if not hasattr(self, '_parent'):
+            self._parent = get_object_or_404(
+                self.parent_model, **self.get_url_filter(self.parent_lookups)
+            )
+        return self._parent
+
+    def get_queryset(self):
+        return super().get_queryset().filter(
+            **self.get_url_filter(self.child_lookups)
+        )
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page:
+            self.get_parent()
+        return page
+
+    def perform_create(self, serializer):
+        serializer.save(
+            author=self.request.user,
+            **{self.parent_field: self.get_parent()}
+        )
@@ -1,3 +1,4 @@
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -31,7 +32,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'api.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -64,13 +67,141 @@ WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
 # Database
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Движок выбирается переменной окружения DB_ENGINE: sqlite или postgresql.
+# Соединения постоянные: живут DB_CONN_MAX_AGE секунд и перед каждым
+# запросом проверяются (DB_CONN_HEALTH_CHECKS). Для пула соединений
+# PostgreSQL используйте PgBouncer в режиме transaction и
+# DB_DISABLE_SERVER_SIDE_CURSORS=1.
+
+DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite')
+
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', 60))
+
+DB_CONN_HEALTH_CHECKS = os.getenv('DB_CONN_HEALTH_CHECKS', '1') == '1'
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('POSTGRES_DB', 'api_yamdb'),
+            'USER': os.getenv('POSTGRES_USER', 'postgres'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', 'localhost'),
+            'PORT': os.getenv('DB_PORT', '5432'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'DISABLE_SERVER_SIDE_CURSORS': (
+                os.getenv('DB_DISABLE_SERVER_SIDE_CURSORS', '0') == '1'
+            ),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            # Тестовая база в файле, а не в памяти: тестам с параллельными
+            # запросами нужны блокировки SQLite с ожиданием, а не shared cache.
+            'TEST': {
+                'NAME': BASE_DIR / 'test_db.sqlite3',
+            },
+        }
     }
+
+# Реплики только для чтения: DB_REPLICAS — через запятую пути к файлам
+# SQLite или хосты PostgreSQL. Безопасные запросы читают с реплик, а после
+# записи клиент DB_REPLICA_STICKINESS секунд читает из основной базы.
+REPLICA_DATABASES = []
+
+for number, location in enumerate(
+    filter(None, os.getenv('DB_REPLICAS', '').split(','))
+):
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST' if DB_ENGINE == 'postgresql' else 'NAME': location.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['api.database.ReplicaRouter']
+
+DB_REPLICA_STICKINESS = int(os.getenv('DB_REPLICA_STICKINESS', 5))
+
+# Кеш отметок о записи клиентов для чтения из основной базы. При нескольких
+# процессах должен быть общим (Redis, Memcached): иначе следующий запрос
+# попадёт в процесс без отметки и прочитает отстающую реплику.
+DB_REPLICA_PIN_CACHE_ALIAS = 'default'
+
+# PRAGMA для каждого нового соединения с SQLite. WAL позволяет читать
+# во время записи, busy_timeout — ждать блокировку вместо ошибки
+# database is locked. SQLITE_PRAGMAS=0 отключает настройку.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000)),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+} if os.getenv('SQLITE_PRAGMAS', '1') == '1' else {}
+
+
+# Cache
+
+CACHES = {
+    # В default хранятся пользователи JWT, версии каталога, отметки записи
+    # для реплик и счётчики кеша ответов: без MAX_ENTRIES LocMemCache
+    # держит лишь 300 записей и вытесняет версии вместе с пользователями.
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+    # LocMemCache вытесняет давно не читанные записи при MAX_ENTRIES.
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'responses',
+        'TIMEOUT': 600,
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000,
+            'CULL_FREQUENCY': 10,
+        },
+    },
 }
 
+# Кеш пользователей JWT-аутентификации: алиас из CACHES и время жизни, с.
+# В нём же хранятся версии токенов. При нескольких процессах кеш должен
+# быть общим (Redis, Memcached), иначе смена роли, блокировка или удаление
+# пользователя не дойдут до других процессов.
+JWT_USER_CACHE_ALIAS = 'default'
+
+JWT_USER_CACHE_TIMEOUT = 60
+
+# Кеш версий каталога для ETag и Last-Modified. При нескольких процессах
+# должен быть общим (Redis, Memcached), иначе версии разойдутся.
+CATALOGUE_VERSION_CACHE_ALIAS = 'default'
+
+# Метрики запросов: заголовок Server-Timing, лог api.metrics и
+# гистограммы по адресу /api/v1/metrics/. Выключенные не создают нагрузки.
+REQUEST_METRICS_ENABLED = os.getenv('REQUEST_METRICS', '0') == '1'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.metrics': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+# Кеш ответов на анонимные GET-запросы к каталогу.
+RESPONSE_CACHE_ALIAS = 'responses'
+
 
 # Password validation
 
@@ -118,7 +249,7 @@ REST_FRAMEWORK = {
     'max_page_size': 100,
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.RoleClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -139,3 +270,44 @@ SIMPLE_JWT = {
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+# Очередь писем: при EMAIL_QUEUE_ASYNC письма отправляет фоновый поток,
+# иначе очередь разбирается сразу после постановки письма.
+EMAIL_QUEUE_ASYNC = True
+
+EMAIL_QUEUE_BATCH_SIZE = 50
+
+EMAIL_QUEUE_MAX_ATTEMPTS = 5
+
+# Задержка перед первым повтором, с; каждый следующий повтор вдвое дольше.
+EMAIL_QUEUE_RETRY_DELAY = 30
+
+# Сколько секунд пачка писем считается захваченной отправителем.
+EMAIL_QUEUE_CLAIM_TIMEOUT = 300
+
+# Сколько секунд хранятся отправленные письма; старые удаляет send_emails.
+EMAIL_QUEUE_SENT_RETENTION = 7 * 24 * 60 * 60
+
+# Наибольшее число произведений в одном запросе к /api/v1/titles/bulk/.
+TITLE_BULK_MAX_ITEMS = 5000
+
+# Массовое удаление отзывов и комментариев модератором: сколько записей
+# удаляется в одной транзакции и сколько id можно передать в запросе.
+MODERATION_CHUNK_SIZE = 1000
+MODERATION_MAX_IDS = 5000
+
+# Сколько строк выгрузки читается из базы за один раз.
+EXPORT_CHUNK_SIZE = 2000
+
+# Журнал изменений: размер страницы /api/v1/changes/ по умолчанию
+# и наибольший, а также срок хранения записей для compact_changes.
+CHANGE_FEED_PAGE_SIZE = 500
+CHANGE_FEED_MAX_PAGE_SIZE = 5000
+CHANGE_LOG_RETENTION_DAYS = 7
+
+# Сколько секунд запись журнала не отдаётся потребителям. В PostgreSQL id
+# выдаются до фиксации транзакций, и без задержки курсор может обогнать
+# запись из ещё не зафиксированной транзакции. В SQLite писатель один.
+CHANGE_FEED_LAG = int(
+    os.getenv('CHANGE_FEED_LAG', 0 if DB_ENGINE == 'sqlite' else 5)
+)
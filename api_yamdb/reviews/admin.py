@@ -1,10 +1,14 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Genre, Review, Title
+from .models import (SCORES, Category, Comment, Genre, Review, Title,
+                     score_count_field)
 
 
 class TitleAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'name', 'year', 'description')
+    list_display = ('pk', 'name', 'year', 'rating', 'description')
+    readonly_fields = ('rating', 'review_count', 'score_sum') + tuple(
+        score_count_field(score) for score in SCORES
+    )
     search_fields = ('name',)
     list_filter = ('year',)
     empty_value_display = '-пусто-'
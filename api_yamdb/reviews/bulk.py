@@ -0,0 +1,100 @@
+"""Вспомогательные функции массовой записи и удаления."""
+from collections import Counter
+from contextlib import contextmanager
+
+from django.core.management.color import no_style
+from django.db import connection, connections, router, transaction
+
+from .changes import batched_changes, record_changes
+from .models import Change
+from .search import fts_enabled, index_titles
+from .signals import deferred_rating_updates
+from .versions import GENRE_TITLES, TITLES, bump_versions, title_version
+
+
+@contextmanager
+def preserve_auto_now_add(model, attnames):
+    """Сохраняет переданные даты вместо подстановки текущего времени."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+        and field.attname in attnames
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def reset_sequences(models):
+    """Сдвигает счётчики первичных ключей после вставки с явными id."""
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+
+def bulk_create_with_ids(model, objs, batch_size=None):
+    """bulk_create, после которого у всех объектов заполнен pk.
+
+    Django 3.2 не возвращает pk из bulk_create в SQLite. Внутри транзакции
+    база заблокирована на запись до её конца, поэтому вставленные строки —
+    последние по pk, и их id дочитываются одним запросом. В остальных
+    случаях объекты сохраняются по одному.
+    """
+    using = router.db_for_write(model)
+    features = connections[using].features
+    manager = model._default_manager.using(using)
+    if features.can_return_rows_from_bulk_insert:
+        return manager.bulk_create(objs, batch_size=batch_size)
+    if not connections[using].in_atomic_block:
+        for obj in objs:
+            obj.save(force_insert=True, using=using)
+        return objs
+    manager.bulk_create(objs, batch_size=batch_size)
+    ids = manager.order_by('-pk').values_list('pk', flat=True)[:len(objs)]
+    for obj, pk in zip(objs, reversed(list(ids))):
+        obj.pk = pk
+        obj._state.adding = False
+        obj._state.db = using
+    return objs
+
+
+def titles_written(titles):
+    """Обновляет поиск, версии и журнал после массовой записи произведений.
+
+    bulk_create и bulk_update не вызывают сигналы модели Title.
+    """
+    using = titles[0]._state.db if titles else None
+    if titles and not fts_enabled(using):
+        index_titles(titles)
+    bump_versions(
+        TITLES, GENRE_TITLES, *(title_version(title.pk) for title in titles),
+        using=using
+    )
+    record_changes('titles', [title.pk for title in titles], Change.SAVE)
+
+
+def delete_in_chunks(queryset, chunk_size):
+    """Удаляет записи кверисета пачками, каждую в своей транзакции.
+
+    Пачки выбираются по возрастанию pk. Рейтинги произведений, отзывы
+    которых удалены в пачке, пересчитываются один раз на пачку.
+    Возвращает число удалённых записей по моделям.
+    """
+    deleted = Counter()
+    pks = queryset.order_by('pk').values_list('pk', flat=True)
+    chunk = list(pks[:chunk_size])
+    while chunk:
+        with transaction.atomic(), batched_changes():
+            with deferred_rating_updates():
+                _, per_model = queryset.model._default_manager.filter(
+                    pk__in=chunk
+                ).delete()
+        deleted.update(per_model)
+        chunk = list(pks.filter(pk__gt=chunk[-1])[:chunk_size])
+    return deleted
@@ -0,0 +1,189 @@
+"""Журнал изменений для инкрементальной синхронизации.
+
+Сохранение и удаление произведений, жанров, категорий, отзывов
+и комментариев добавляет запись Change, id которой служит курсором.
+Потребитель запрашивает записи после своего курсора и получает текущее
+состояние изменённых объектов, поэтому синхронизация занимает время,
+пропорциональное числу изменений, а не размеру каталога.
+
+Сжатие удаляет записи, перекрытые более поздней записью о том же объекте.
+Удаление по сроку хранения и массовые загрузки в обход сигналов пишут
+отметку RESET: курсоры меньше её границы недействительны, потребителю
+нужна полная выгрузка.
+
+Записи журнала пишутся в транзакции изменения. В SQLite писатель один,
+поэтому id записей растут в порядке фиксации. В PostgreSQL id выдаются
+последовательностью до фиксации, и запись с меньшим id может появиться
+позже записи с большим. Поэтому записи моложе CHANGE_FEED_LAG секунд
+не отдаются, а транзакции, которые пишут журнал, должны быть короче.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef
+from django.utils import timezone
+
+from .export import DATASETS
+from .models import Category, Change, Comment, Genre, Review, Title
+
+RESOURCES = {
+    Title: 'titles',
+    Genre: 'genres',
+    Category: 'categories',
+    Review: 'reviews',
+    Comment: 'comments',
+}
+BATCH_SIZE = 1000
+
+_batch = ContextVar('change_batch', default=None)
+
+
+def record_changes(resource, object_ids, action):
+    """Записывает изменения объектов одного ресурса.
+
+    Внутри batched_changes записи копятся и пишутся на выходе из блока.
+    """
+    batch = _batch.get()
+    if batch is not None:
+        for object_id in object_ids:
+            batch.pop((resource, object_id), None)
+            batch[resource, object_id] = action
+        return
+    object_ids = list(object_ids)
+    if len(object_ids) == 1:
+        Change.objects.create(
+            resource=resource, object_id=object_ids[0], action=action
+        )
+        return
+    Change.objects.bulk_create(
+        Change(resource=resource, object_id=object_id, action=action)
+        for object_id in object_ids
+    )
+
+
+def record_change(instance, action):
+    record_changes(RESOURCES[type(instance)], [instance.pk], action)
+
+
+@contextmanager
+def batched_changes():
+    """Пишет изменения блока одним bulk_create, по записи на объект."""
+    batch = {}
+    token = _batch.set(batch)
+    try:
+        yield
+    finally:
+        _batch.reset(token)
+    Change.objects.bulk_create(
+        (
+            Change(resource=resource, object_id=object_id, action=action)
+            for (resource, object_id), action in batch.items()
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+
+def get_horizon():
+    """Наименьший действительный курсор."""
+    return Change.objects.filter(
+        resource='', action=Change.RESET
+    ).aggregate(horizon=Max('object_id'))['horizon'] or 0
+
+
+def get_visible():
+    """Записи старше CHANGE_FEED_LAG секунд."""
+    if not settings.CHANGE_FEED_LAG:
+        return Change.objects.all()
+    return Change.objects.filter(created__lte=timezone.now() - timedelta(
+        seconds=settings.CHANGE_FEED_LAG
+    ))
+
+
+def get_head():
+    """Курсор последнего изменения."""
+    head = get_visible().aggregate(head=Max('pk'))['head'] or 0
+    return max(head, get_horizon())
+
+
+def reset_cursors(horizon=None):
+    """Делает недействительными курсоры меньше horizon.
+
+    Без horizon недействительны все выданные курсоры: так отмечаются
+    массовые загрузки, которые не пишут журнал.
+    """
+    with transaction.atomic():
+        marker = Change.objects.create(
+            resource='', object_id=horizon or 0, action=Change.RESET
+        )
+        if horizon is None:
+            marker.object_id = marker.pk
+            marker.save(update_fields=['object_id'])
+        Change.objects.filter(
+            resource='', action=Change.RESET, pk__lt=marker.pk
+        ).delete()
+    return marker.object_id
+
+
+def get_changes(since, limit):
+    """Изменения после курсора since, не больше limit записей."""
+    return list(
+        get_visible().filter(pk__gt=since).exclude(action=Change.RESET)
+        .order_by('pk')[:limit]
+    )
+
+
+def describe_changes(changes):
+    """Изменения с текущим состоянием объектов в формате NDJSON выгрузки.
+
+    Объекты загружаются одним запросом на ресурс. Если сохранённого
+    объекта уже нет, изменение отдаётся как удаление.
+    """
+    ids = {}
+    for change in changes:
+        if change.action == Change.SAVE:
+            ids.setdefault(change.resource, set()).add(change.object_id)
+    rows = {
+        resource: DATASETS[resource].get_rows(resource_ids)
+        for resource, resource_ids in ids.items()
+    }
+    results = []
+    for change in changes:
+        data = rows.get(change.resource, {}).get(change.object_id)
+        results.append({
+            'cursor': change.pk,
+            'resource': change.resource,
+            'id': change.object_id,
+            'action': Change.SAVE if data is not None else Change.DELETE,
+            'data': data,
+        })
+    return results
+
+
+def compact():
+    """Удаляет записи, после которых есть запись о том же объекте."""
+    later = Change.objects.filter(
+        resource=OuterRef('resource'), object_id=OuterRef('object_id'),
+        pk__gt=OuterRef('pk')
+    )
+    deleted, _ = Change.objects.exclude(action=Change.RESET).filter(
+        Exists(later)
+    ).delete()
+    return deleted
+
+
+def expire(before):
+    """Удаляет записи старше before и сдвигает границу курсоров."""
+    horizon = Change.objects.filter(created__lt=before).exclude(
+        action=Change.RESET
+    ).aggregate(horizon=Max('pk'))['horizon']
+    if horizon is None:
+        return 0
+    with transaction.atomic():
+        deleted, _ = Change.objects.filter(pk__lte=horizon).exclude(
+            action=Change.RESET
+        ).delete()
+        reset_cursors(max(horizon, get_horizon()))
+    return deleted
@@ -5,3 +5,8 @@ MAX_REVIEW_LENGTH = 4096
 MAX_COMMENT_LENGTH = 128
 MAX_SCORE_VALUE = 10
 MIN_SCORE_VALUE = 1
+MAX_SEARCH_TOKEN_LENGTH = 64
+NAME_SEARCH_WEIGHT = 10
+DESCRIPTION_SEARCH_WEIGHT = 1
+MAX_RESOURCE_LENGTH = 16
+MAX_ACTION_LENGTH = 8
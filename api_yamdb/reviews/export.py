@@ -0,0 +1,183 @@
+"""Потоковая выгрузка каталога, отзывов и комментариев.
+
+CSV повторяет формат файлов static/data: связи записаны id, поэтому
+выгрузку можно загрузить обратно командой import_csv. В NDJSON связи
+записаны слагами и именами пользователей, а у произведений есть список
+жанров. Записи читаются через iterator(chunk_size) и отдаются кусками,
+так что память не зависит от размера таблиц.
+"""
+import csv
+import io
+import json
+from collections import defaultdict
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import (Category, Comment, Genre, GenreTitle, Review, Title,
+                     User)
+
+CSV = 'csv'
+NDJSON = 'ndjson'
+OUTPUTS = {
+    CSV: 'text/csv; charset=utf-8',
+    NDJSON: 'application/x-ndjson',
+}
+
+
+class Dataset:
+    """Выгружаемая таблица.
+
+    csv_fields и json_fields сопоставляют колонкам выгрузки пути полей
+    для values_list. Если json_fields не заданы, NDJSON содержит те же
+    колонки, что и CSV.
+    """
+
+    def __init__(self, model, file_name, csv_fields, json_fields=None,
+                 with_genres=False):
+        self.model = model
+        self.file_name = file_name
+        self.csv_fields = csv_fields
+        self.json_fields = json_fields or csv_fields
+        self.with_genres = with_genres
+
+    def get_file_name(self, output):
+        if output == CSV:
+            return self.file_name
+        return f'{self.file_name.rsplit(".", 1)[0]}.{output}'
+
+    def iter_chunks(self, fields, chunk_size):
+        """Строки таблицы словарями, кусками по chunk_size."""
+        rows = self.model._default_manager.order_by('pk').values_list(
+            *fields.values()
+        ).iterator(chunk_size=chunk_size)
+        columns = list(fields)
+        while True:
+            chunk = [
+                dict(zip(columns, row))
+                for row in islice(rows, chunk_size)
+            ]
+            if not chunk:
+                return
+            yield chunk
+
+    def get_rows(self, ids):
+        """Текущие строки NDJSON объектов с переданными id."""
+        rows = [
+            dict(zip(self.json_fields, row))
+            for row in self.model._default_manager.filter(
+                pk__in=ids
+            ).order_by().values_list(*self.json_fields.values())
+        ]
+        if self.with_genres:
+            add_genres(rows)
+        return {row['id']: row for row in rows}
+
+    def stream(self, output, chunk_size):
+        """Выгрузка таблицы кусками текста в формате output."""
+        if output == CSV:
+            return self.stream_csv(chunk_size)
+        return self.stream_ndjson(chunk_size)
+
+    def stream_csv(self, chunk_size):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=list(self.csv_fields))
+        writer.writeheader()
+        for chunk in self.iter_chunks(self.csv_fields, chunk_size):
+            writer.writerows(
+                {column: to_csv(value) for column, value in row.items()}
+                for row in chunk
+            )
+            yield pop_buffer(buffer)
+        if buffer.tell():
+            yield pop_buffer(buffer)
+
+    def stream_ndjson(self, chunk_size):
+        for chunk in self.iter_chunks(self.json_fields, chunk_size):
+            if self.with_genres:
+                add_genres(chunk)
+            yield ''.join(
+                json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False)
+                + '\n'
+                for row in chunk
+            )
+
+
+def to_csv(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def pop_buffer(buffer):
+    text = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return text
+
+
+def add_genres(rows):
+    """Дописывает к произведениям слаги жанров одним запросом на кусок."""
+    genres = defaultdict(list)
+    for title_id, slug in GenreTitle.objects.filter(
+        title_id__in=[row['id'] for row in rows], genre__isnull=False
+    ).order_by('pk').values_list('title_id', 'genre__slug'):
+        genres[title_id].append(slug)
+    for row in rows:
+        row['genre'] = genres[row['id']]
+
+
+def field_map(*names, **paths):
+    """Колонки выгрузки: одноимённые поля и поля по другим путям."""
+    return {**{name: name for name in names}, **paths}
+
+
+# Порядок таблиц совпадает с порядком зависимостей import_csv.
+DATASETS = {
+    'categories': Dataset(
+        Category, 'category.csv', field_map('id', 'name', 'slug')
+    ),
+    'genres': Dataset(Genre, 'genre.csv', field_map('id', 'name', 'slug')),
+    'users': Dataset(User, 'users.csv', field_map(
+        'id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'
+    )),
+    'titles': Dataset(
+        Title, 'titles.csv',
+        field_map(
+            'id', 'name', 'year', 'description', 'rating',
+            category='category_id'
+        ),
+        field_map(
+            'id', 'name', 'year', 'description', 'rating',
+            category='category__slug'
+        ),
+        with_genres=True,
+    ),
+    'genre_titles': Dataset(
+        GenreTitle, 'genre_title.csv',
+        field_map('id', 'title_id', 'genre_id')
+    ),
+    'reviews': Dataset(
+        Review, 'review.csv',
+        field_map(
+            'id', 'title_id', 'text', 'score', 'pub_date',
+            author='author_id'
+        ),
+        field_map(
+            'id', 'title_id', 'text', 'score', 'pub_date',
+            author='author__username'
+        ),
+    ),
+    'comments': Dataset(
+        Comment, 'comments.csv',
+        field_map(
+            'id', 'review_id', 'text', 'pub_date', author='author_id'
+        ),
+        field_map(
+            'id', 'review_id', 'text', 'pub_date',
+            title_id='review__title_id', author='author__username'
+        ),
+    ),
+}
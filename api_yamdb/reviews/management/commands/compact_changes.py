@@ -0,0 +1,37 @@
+from datetime import timedelta
+from time import monotonic
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from reviews.changes import compact, expire
+
+
+class Command(BaseCommand):
+    """Класс для сжатия журнала изменений.
+
+    Удаляет записи, перекрытые более поздними записями о тех же объектах,
+    и записи старше срока хранения. Курсоры, выданные до удалённых
+    по сроку записей, становятся недействительными.
+    """
+
+    help = 'Сжимает журнал изменений и удаляет устаревшие записи'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-days', type=float,
+            default=settings.CHANGE_LOG_RETENTION_DAYS,
+            help='Сколько дней хранятся записи журнала.'
+        )
+
+    def handle(self, *args, **options):
+        started = monotonic()
+        compacted = compact()
+        expired = expire(
+            timezone.now() - timedelta(days=options['retention_days'])
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Сжато записей: {compacted}, удалено по сроку: {expired} '
+            f'за {monotonic() - started:.2f} с.'
+        ))
@@ -0,0 +1,62 @@
+from pathlib import Path
+from time import monotonic
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.export import CSV, DATASETS, OUTPUTS
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class Command(BaseCommand):
+    """Класс для выгрузки данных в CSV или NDJSON файлы.
+
+    Файлы CSV называются и устроены так же, как в static/data, поэтому
+    каталог выгрузки можно загрузить командой import_csv --path.
+    """
+
+    help = 'Выгружает данные из базы в CSV или NDJSON файлы'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', required=True,
+            help='Каталог, в который записываются файлы.'
+        )
+        parser.add_argument(
+            '--output', choices=list(OUTPUTS), default=CSV,
+            help='Формат файлов.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help='Сколько строк читается из базы за один раз.'
+        )
+        parser.add_argument(
+            'datasets', nargs='*',
+            help=f'Выгружаемые таблицы, по умолчанию все: '
+                 f'{", ".join(DATASETS)}.'
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        output = options['output']
+        unknown = set(options['datasets']) - set(DATASETS)
+        if unknown:
+            raise CommandError(
+                f'Неизвестные таблицы: {", ".join(sorted(unknown))}.'
+            )
+        try:
+            path.mkdir(parents=True, exist_ok=True)
+        except OSError as error:
+            raise CommandError(f'Не удалось создать каталог {path}: {error}')
+
+        started = monotonic()
+        for name in options['datasets'] or DATASETS:
+            dataset = DATASETS[name]
+            file_path = path / dataset.get_file_name(output)
+            with open(file_path, 'w', newline='', encoding='utf-8') as file:
+                for text in dataset.stream(output, options['chunk_size']):
+                    file.write(text)
+            self.stdout.write(f'{name}: {file_path}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Выгрузка завершена за {monotonic() - started:.2f} с.'
+        ))
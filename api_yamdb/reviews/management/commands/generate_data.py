@@ -0,0 +1,389 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from time import monotonic
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+
+from reviews.bulk import preserve_auto_now_add, reset_sequences
+from reviews.changes import reset_cursors
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title, User)
+from reviews.search import fts_enabled, index_titles
+from reviews.versions import bump_catalogue
+
+DEFAULT_USERS = 100_000
+DEFAULT_TITLES = 100_000
+DEFAULT_REVIEWS = 1_000_000
+DEFAULT_COMMENTS = 1_000_000
+DEFAULT_GENRES = 30
+DEFAULT_CATEGORIES = 8
+DEFAULT_ZIPF_EXPONENT = 1.1
+DEFAULT_CHUNK_SIZE = 10000
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_WORKERS = 4
+
+# Даты отзывов и комментариев — за DATE_SPAN до DATE_END, чтобы данные
+# не зависели от времени запуска.
+DATE_END = datetime(2025, 1, 1, tzinfo=timezone.utc)
+DATE_SPAN = timedelta(days=10 * 365)
+
+WORDS = (
+    'война мир море небо город ночь дорога песня время звезда лес река '
+    'история любовь тайна свет дом герой путь сказка зима лето огонь '
+    'ветер берег остров память сердце тень голос край солнце'
+).split()
+
+
+def zipf_counts(total, size, exponent, cap, rng):
+    """Разбивает total на size частей по закону Ципфа.
+
+    Часть ранга r пропорциональна 1 / r ** exponent и не больше cap;
+    излишек достаётся следующим по рангу частям. Части перемешиваются,
+    чтобы популярность не совпадала с порядком id. Если total больше
+    size * cap, вызывается CommandError.
+    """
+    weights = [1 / rank ** exponent for rank in range(1, size + 1)]
+    scale = total / sum(weights) if weights else 0
+    counts = [min(int(weight * scale), cap) for weight in weights]
+    remainder = total - sum(counts)
+    for index in range(size):
+        if remainder <= 0:
+            break
+        added = min(cap - counts[index], remainder)
+        counts[index] += added
+        remainder -= added
+    if remainder > 0:
+        raise CommandError(
+            f'Нельзя разместить {total} строк: не больше {cap} '
+            f'на каждую из {size} частей.'
+        )
+    rng.shuffle(counts)
+    return counts
+
+
+def split_by_rows(counts, chunk_size):
+    """Режет части на куски примерно по chunk_size строк.
+
+    Возвращает (начало, конец, номер первой строки куска).
+    """
+    chunks = []
+    start = rows = first_row = 0
+    for index, count in enumerate(counts):
+        rows += count
+        if rows >= chunk_size:
+            chunks.append((start, index + 1, first_row))
+            start, first_row, rows = index + 1, first_row + rows, 0
+    if start < len(counts):
+        chunks.append((start, len(counts), first_row))
+    return chunks
+
+
+class Command(BaseCommand):
+    """Класс для генерации синтетических данных большого объёма.
+
+    Число отзывов на произведение и комментариев на отзыв распределено
+    по закону Ципфа. Записи вставляются через bulk_create кусками по
+    chunk_size строк в пуле потоков. id задаются явно, а каждый кусок
+    использует свой генератор случайных чисел, полученный из --seed,
+    поэтому результат не зависит от числа потоков. SQLite допускает
+    одного писателя, поэтому в ней куски готовятся параллельно,
+    а записываются по очереди.
+    """
+
+    help = 'Генерирует пользователей, произведения, отзывы и комментарии'
+
+    def add_arguments(self, parser):
+        for name, default in (
+            ('users', DEFAULT_USERS), ('titles', DEFAULT_TITLES),
+            ('reviews', DEFAULT_REVIEWS), ('comments', DEFAULT_COMMENTS),
+            ('genres', DEFAULT_GENRES), ('categories', DEFAULT_CATEGORIES),
+        ):
+            parser.add_argument(
+                f'--{name}', type=int, default=default,
+                help=f'Сколько создать: {name} (по умолчанию {default}).'
+            )
+        parser.add_argument(
+            '--zipf', type=float, default=DEFAULT_ZIPF_EXPONENT,
+            help='Показатель закона Ципфа для отзывов и комментариев.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help='Количество строк, записываемых в одной транзакции.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Размер пачки для bulk_create.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=DEFAULT_WORKERS,
+            help='Количество потоков записи.'
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.seed = options['seed']
+        self.chunk_size = max(options['chunk_size'], 1)
+        self.batch_size = options['batch_size']
+        self.workers = max(options['workers'], 1)
+        self.verbosity = options['verbosity']
+        self.output_lock = Lock()
+        self.write_lock = (
+            Lock() if connection.vendor == 'sqlite' else nullcontext()
+        )
+        self.validate()
+
+        started = monotonic()
+        self.bases = {
+            model: (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+            for model in (Category, Genre, User, Title, GenreTitle, Review,
+                          Comment)
+        }
+        total = sum((
+            self.run_stage('categories', Category, self.make_categories,
+                           [(0, options['categories'], 0)]),
+            self.run_stage('genres', Genre, self.make_genres,
+                           [(0, options['genres'], 0)]),
+            self.run_stage('users', User, self.make_users,
+                           self.split(options['users'])),
+            self.run_stage('titles', Title, self.make_titles,
+                           self.split(options['titles'])),
+        ))
+        self.genre_picks = self.pick_genres()
+        total += self.run_stage(
+            'genre_titles', GenreTitle, self.make_genre_titles,
+            split_by_rows(
+                [len(genres) for genres in self.genre_picks], self.chunk_size
+            ),
+        )
+
+        self.review_counts = zipf_counts(
+            options['reviews'], options['titles'], options['zipf'],
+            options['users'], self.get_random('review-counts'),
+        )
+        total += self.run_stage(
+            'reviews', Review, self.make_reviews,
+            split_by_rows(self.review_counts, self.chunk_size),
+        )
+        self.comment_counts = zipf_counts(
+            options['comments'], sum(self.review_counts), options['zipf'],
+            options['comments'], self.get_random('comment-counts'),
+        )
+        total += self.run_stage(
+            'comments', Comment, self.make_comments,
+            split_by_rows(self.comment_counts, self.chunk_size),
+        )
+
+        self.finish()
+        elapsed = monotonic() - started
+        self.write(self.style.SUCCESS(
+            f'Создано {total} строк за {elapsed:.2f} с '
+            f'({total / elapsed:.0f} строк/с).'
+        ))
+
+    def validate(self):
+        options = self.options
+        for name in ('users', 'titles', 'reviews', 'comments', 'genres',
+                     'categories'):
+            if options[name] < 0:
+                raise CommandError(f'--{name} не может быть меньше нуля.')
+        if options['zipf'] <= 0:
+            raise CommandError('--zipf должен быть больше нуля.')
+        if options['titles'] and not options['categories']:
+            raise CommandError(
+                'Для произведений нужна хотя бы одна категория.'
+            )
+        if options['titles'] and not options['genres']:
+            raise CommandError('Для произведений нужен хотя бы один жанр.')
+        if options['reviews'] and not (options['users'] and options['titles']):
+            raise CommandError(
+                'Для отзывов нужны пользователи и произведения.'
+            )
+        if options['comments'] and not options['reviews']:
+            raise CommandError('Для комментариев нужны отзывы.')
+
+    def split(self, count):
+        return [
+            (start, min(start + self.chunk_size, count), start)
+            for start in range(0, count, self.chunk_size)
+        ]
+
+    def get_random(self, stage, start=0):
+        """Генератор случайных чисел куска, зависящий только от seed."""
+        return random.Random(f'{self.seed}:{stage}:{start}')
+
+    def run_stage(self, name, model, make, chunks):
+        """Записывает куски одной модели в пуле потоков."""
+        started = monotonic()
+        with preserve_auto_now_add(model, {'pub_date'}):
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                rows = sum(executor.map(
+                    lambda chunk: self.write_chunk(model, make, *chunk),
+                    chunks
+                ))
+        elapsed = monotonic() - started
+        rate = f'{rows / elapsed:.0f}' if elapsed else '—'
+        self.write(f'{name}: {rows} строк за {elapsed:.2f} с ({rate} строк/с)')
+        return rows
+
+    def write_chunk(self, model, make, start, stop, first_row):
+        try:
+            objects = make(start, stop, first_row)
+            with self.write_lock, transaction.atomic():
+                model.objects.bulk_create(objects, batch_size=self.batch_size)
+                if model is Title and not fts_enabled():
+                    index_titles(objects, batch_size=self.batch_size)
+            return len(objects)
+        finally:
+            connection.close()
+
+    def make_categories(self, start, stop, first_row):
+        base = self.bases[Category]
+        return [
+            Category(pk=base + offset, name=f'Категория {base + offset}',
+                     slug=f'gen-category-{base + offset}')
+            for offset in range(start, stop)
+        ]
+
+    def make_genres(self, start, stop, first_row):
+        base = self.bases[Genre]
+        return [
+            Genre(pk=base + offset, name=f'Жанр {base + offset}',
+                  slug=f'gen-genre-{base + offset}')
+            for offset in range(start, stop)
+        ]
+
+    def make_users(self, start, stop, first_row):
+        base = self.bases[User]
+        return [
+            User(pk=base + offset, username=f'gen_user_{base + offset}',
+                 email=f'gen_user_{base + offset}@example.com')
+            for offset in range(start, stop)
+        ]
+
+    def make_titles(self, start, stop, first_row):
+        rng = self.get_random('titles', start)
+        base = self.bases[Title]
+        categories = self.options['categories']
+        return [
+            Title(
+                pk=base + offset,
+                name=self.make_text(rng, rng.randint(1, 4)),
+                year=rng.randint(1900, 2024),
+                description=self.make_text(rng, rng.randint(5, 30)),
+                category_id=self.bases[Category] + self.pick_skewed(
+                    rng, categories
+                ),
+            )
+            for offset in range(start, stop)
+        ]
+
+    def pick_genres(self):
+        """Номера жанров каждого произведения.
+
+        Выбираются заранее, чтобы число связей каждого куска и их id
+        были известны до записи.
+        """
+        genres = self.options['genres']
+        picks = []
+        for start, stop, _ in self.split(self.options['titles']):
+            rng = self.get_random('genre-titles', start)
+            for _ in range(start, stop):
+                picks.append(sorted({
+                    self.pick_skewed(rng, genres)
+                    for _ in range(rng.randint(1, 3))
+                }))
+        return picks
+
+    def make_genre_titles(self, start, stop, first_row):
+        pk = self.bases[GenreTitle] + first_row
+        objects = []
+        for offset in range(start, stop):
+            for genre in self.genre_picks[offset]:
+                objects.append(GenreTitle(
+                    pk=pk,
+                    title_id=self.bases[Title] + offset,
+                    genre_id=self.bases[Genre] + genre,
+                ))
+                pk += 1
+        return objects
+
+    def make_reviews(self, start, stop, first_row):
+        """Отзывы произведений start..stop, авторы у отзывов разные."""
+        rng = self.get_random('reviews', start)
+        pk = self.bases[Review] + first_row
+        objects = []
+        for offset in range(start, stop):
+            quality = rng.uniform(3, 9)
+            authors = rng.sample(
+                range(self.options['users']), self.review_counts[offset]
+            )
+            for author in authors:
+                objects.append(Review(
+                    pk=pk,
+                    title_id=self.bases[Title] + offset,
+                    author_id=self.bases[User] + author,
+                    text=self.make_text(rng, rng.randint(5, 60)),
+                    score=min(max(round(rng.gauss(quality, 1.5)), 1), 10),
+                    pub_date=self.make_date(rng),
+                ))
+                pk += 1
+        return objects
+
+    def make_comments(self, start, stop, first_row):
+        rng = self.get_random('comments', start)
+        users = self.options['users']
+        base = self.bases[Comment] + first_row
+        return [
+            Comment(
+                pk=base + number,
+                review_id=self.bases[Review] + offset,
+                author_id=self.bases[User] + self.pick_skewed(rng, users),
+                text=self.make_text(rng, rng.randint(3, 30)),
+                pub_date=self.make_date(rng),
+            )
+            for number, (offset, _) in enumerate(
+                (offset, index)
+                for offset in range(start, stop)
+                for index in range(self.comment_counts[offset])
+            )
+        ]
+
+    @staticmethod
+    def pick_skewed(rng, size):
+        """Номер от 0 до size - 1, малые номера выпадают чаще."""
+        return int(size * rng.random() ** 2)
+
+    @staticmethod
+    def make_text(rng, words):
+        return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+    @staticmethod
+    def make_date(rng):
+        return DATE_END - DATE_SPAN * rng.random()
+
+    def finish(self):
+        """Пересчитывает рейтинги и сбрасывает курсоры журнала изменений:
+        bulk_create не вызывает сигналы."""
+        started = monotonic()
+        with transaction.atomic():
+            Title.objects.filter(
+                pk__gte=self.bases[Title]
+            ).refresh_ratings()
+        reset_sequences(
+            [Category, Genre, User, Title, GenreTitle, Review, Comment]
+        )
+        bump_catalogue()
+        reset_cursors()
+        self.write(f'Рейтинги пересчитаны за {monotonic() - started:.2f} с.')
+
+    def write(self, message):
+        if self.verbosity < 1:
+            return
+        with self.output_lock:
+            self.stdout.write(message)
@@ -1,14 +1,39 @@
 import csv
-from datetime import datetime
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from itertools import islice
+from pathlib import Path
+from threading import Lock
+from time import monotonic
 
 from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection, transaction
 
+from reviews.bulk import preserve_auto_now_add, reset_sequences
+from reviews.changes import reset_cursors
 from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
                             Title, User)
+from reviews.search import fts_enabled, index_titles
+from reviews.versions import bump_catalogue
+
+DEFAULT_DATA_PATH = 'static/data'
+DEFAULT_CHUNK_SIZE = 10000
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_WORKERS = 4
 
 
 class Command(BaseCommand):
-    """Класс для импорта данных из CSV файлов в базу данных."""
+    """Класс для импорта данных из CSV файлов в базу данных.
+
+    Файлы читаются потоково, кусками по chunk_size строк. Каждый кусок
+    записывается через bulk_create в отдельной транзакции, а внешние ключи
+    проверяются по заранее загруженным множествам id связанных таблиц.
+
+    Файлы импортируются параллельно в пуле потоков: этап запускается,
+    как только загружены файлы моделей, на которые ссылаются его внешние
+    ключи. SQLite допускает одного писателя, поэтому с ним потоки
+    параллельно читают и разбирают файлы, а записывают куски по очереди.
+    """
 
     help = 'Импортирует данные из CSV файлов в базу данных'
 
@@ -18,81 +43,326 @@ class Command(BaseCommand):
         'users.csv': User,
         'titles.csv': Title,
         'genre_title.csv': GenreTitle,
-        'comments.csv': Comment,
         'review.csv': Review,
+        'comments.csv': Comment,
     }
 
-    def handle(self, *args, **kwargs):
-        for file_name, model in self.model_mapping.items():
-            file_path = f'static/data/{file_name}'
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=DEFAULT_DATA_PATH,
+            help='Каталог с CSV файлами.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help='Количество строк, записываемых в одной транзакции.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Размер пачки для bulk_create.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=DEFAULT_WORKERS,
+            help='Количество файлов, импортируемых одновременно.'
+        )
+
+    def handle(self, *args, **options):
+        self.data_path = Path(options['path'])
+        self.chunk_size = options['chunk_size']
+        self.batch_size = options['batch_size']
+        self.verbosity = options['verbosity']
+        self.output_lock = Lock()
+        self.write_lock = (
+            Lock() if connection.vendor == 'sqlite' else nullcontext()
+        )
+        self.started = monotonic()
+        self.timings = {}
+
+        total_rows = self.run_stages(max(options['workers'], 1))
+
+        reset_sequences(list(self.model_mapping.values()))
+        self.refresh_title_ratings()
+        bump_catalogue()
+        reset_cursors()
+        elapsed = monotonic() - self.started
+        self.report_timings()
+        self.stdout.write(self.style.SUCCESS(
+            f'Импорт завершён: {total_rows} строк за {elapsed:.2f} с '
+            f'({self.get_rate(total_rows, elapsed)} строк/с).'
+        ))
+
+    def get_dependencies(self):
+        """Возвращает для каждого файла файлы, от которых он зависит.
+
+        Зависимость — файл модели, на которую ссылается внешний ключ.
+        """
+        files = {model: name for name, model in self.model_mapping.items()}
+        return {
+            name: {
+                files[field.related_model]
+                for field in model._meta.concrete_fields
+                if field.is_relation and field.related_model in files
+                and field.related_model is not model
+            }
+            for name, model in self.model_mapping.items()
+        }
+
+    def run_stages(self, workers):
+        """Импортирует файлы в пуле потоков в порядке зависимостей.
+
+        Если этап завершился ошибкой, зависящие от него этапы пропускаются.
+        """
+        pending = self.get_dependencies()
+        done, failed = set(), set()
+        running = {}
+        total_rows = 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while pending or running:
+                for name, dependencies in list(pending.items()):
+                    if dependencies & failed:
+                        del pending[name]
+                        failed.add(name)
+                        self.write_error(
+                            f'Импорт из {name} пропущен: не загружены '
+                            f'{", ".join(sorted(dependencies & failed))}.'
+                        )
+                    elif dependencies <= done:
+                        del pending[name]
+                        future = executor.submit(self.run_stage, name)
+                        running[future] = name
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        total_rows += future.result()
+                    except Exception as error:
+                        failed.add(name)
+                        self.write_error(
+                            f'Ошибка при импорте из {name}: {error}'
+                        )
+                    else:
+                        done.add(name)
+        return total_rows
 
+    def run_stage(self, file_name):
+        """Импортирует один файл в рабочем потоке и замеряет время."""
+        started = monotonic()
+        try:
+            return self.import_file(file_name, self.model_mapping[file_name])
+        finally:
+            self.timings[file_name] = (
+                started - self.started, monotonic() - started
+            )
+            connection.close()
+
+    def import_file(self, file_name, model):
+        """Импортирует один CSV файл и возвращает число записанных строк.
+
+        Строки, конфликтующие с уже существующими записями, пропускаются
+        базой данных, поэтому повторный импорт безопасен.
+        """
+        file_path = self.data_path / file_name
+        started = monotonic()
+        processed = imported = skipped = 0
+        try:
+            with open(file_path, newline='', encoding='utf-8') as csvfile:
+                reader = csv.DictReader(csvfile)
+                converters = self.get_converters(model, reader.fieldnames)
+                known_ids = self.get_known_ids(model, converters)
+                attnames = {attname for attname, _ in converters.values()}
+                with preserve_auto_now_add(model, attnames):
+                    while True:
+                        rows = list(islice(reader, self.chunk_size))
+                        if not rows:
+                            break
+                        written, rejected = self.import_chunk(
+                            model, rows, converters, known_ids
+                        )
+                        processed += len(rows)
+                        imported += written
+                        skipped += rejected
+                        self.report_progress(
+                            file_name, processed, imported, skipped, started
+                        )
+        except FileNotFoundError:
+            self.write_error(f'Файл {file_path} не найден.')
+            return 0
+
+        elapsed = monotonic() - started
+        self.write(self.style.SUCCESS(
+            f'Импорт из {file_name} завершен: записано {imported} строк, '
+            f'уже были в базе {processed - imported - skipped}, '
+            f'пропущено {skipped}, {elapsed:.2f} с '
+            f'({self.get_rate(processed, elapsed)} строк/с).'
+        ))
+        return imported
+
+    def import_chunk(self, model, rows, converters, known_ids):
+        """Записывает кусок строк одной транзакцией.
+
+        Если база отвергла кусок целиком (NOT NULL или CHECK в PostgreSQL
+        не подпадают под ON CONFLICT DO NOTHING), строки записываются по
+        одной, и отбрасываются только ошибочные. Возвращает количество
+        записанных и отброшенных строк.
+        """
+        instances, sources = [], []
+        rejected = 0
+        for row in rows:
             try:
-                with open(file_path, newline='', encoding='utf-8') as csvfile:
-                    reader = csv.DictReader(csvfile)
-                    for row in reader:
-                        try:
-                            instance = self.create_instance(model, row)
-                            instance.save()
-                            self.stdout.write(
-                                self.style.SUCCESS(f'Добавлена запись: {row}')
-                            )
-                        except Exception as e:
-                            self.stderr.write(
-                                self.style.ERROR(
-                                    f'Ошибка при добавлении записи: '
-                                    f'{row}. Ошибка: {e}'
-                                )
-                            )
-
-                self.stdout.write(
-                    self.style.SUCCESS(f'Импорт из {file_name} завершен!')
-                )
-            except FileNotFoundError:
-                self.stderr.write(
-                    self.style.ERROR(f'Файл {file_path} не найден.')
+                fields = {
+                    attname: convert(row[column])
+                    for column, (attname, convert) in converters.items()
+                }
+            except Exception as error:
+                self.report_rejected(row, error)
+                rejected += 1
+                continue
+            missing = [
+                attname for attname, ids in known_ids.items()
+                if fields.get(attname) is not None
+                and fields[attname] not in ids
+            ]
+            if missing:
+                self.report_rejected(
+                    row, f'нет связанных записей для {", ".join(missing)}'
                 )
+                rejected += 1
+                continue
+            instances.append(model(**fields))
+            sources.append(row)
 
-    def create_instance(self, model, row):
-        """Создает экземпляр модели на основе данных из строки CSV."""
-        fields = {}
-        for key, value in row.items():
-            if value.isdigit():
-                fields[key] = int(value)
-            elif '.' in value and value.replace('.', '', 1).isdigit():
-                fields[key] = float(value)
-            elif key.endswith('_at'):
-                fields[key] = self.parse_date(value)
-            else:
-                fields[key] = value
-
-        if model == Title:
-            fields['category'] = Category.objects.get(
-                id=fields.pop('category_id', None)
-            )
-        elif model == GenreTitle:
-            fields['title'] = Title.objects.get(
-                id=fields.pop('title_id', None)
-            )
-            fields['genre'] = Genre.objects.get(
-                id=fields.pop('genre_id', None)
-            )
-        elif model == Review:
-            fields['author'] = User.objects.get(
-                id=fields.pop('author_id', None)
-            )
-        elif model == Comment:
-            fields['review'] = Review.objects.get(
-                id=fields.pop('review_id', None)
+        try:
+            return self.write_instances(model, instances), rejected
+        except DatabaseError as error:
+            self.write_error(
+                f'Ошибка при записи {len(instances)} строк '
+                f'{model._meta.verbose_name_plural}: {error}. '
+                f'Строки записываются по одной.'
             )
-            fields['author'] = User.objects.get(
-                id=fields.pop('author_id', None)
+        written = 0
+        for instance, row in zip(instances, sources):
+            try:
+                written += self.write_instances(model, [instance])
+            except DatabaseError as error:
+                self.report_rejected(row, error)
+                rejected += 1
+        return written, rejected
+
+    def write_instances(self, model, instances):
+        """Записывает объекты одной транзакцией.
+
+        Возвращает число вставленных строк: конфликтующие строки база
+        пропускает молча, поэтому вставленные считаются по числу записей
+        в диапазоне их id до и после вставки. Строки без id считаются
+        вставленными. Без FTS5 bulk_create не обновляет индекс слов,
+        поэтому произведения из диапазона индексируются по данным базы.
+        """
+        if not instances:
+            return 0
+        ids = [
+            instance.pk for instance in instances if instance.pk is not None
+        ]
+        in_range = model.objects.filter(
+            pk__gte=min(ids), pk__lte=max(ids)
+        ) if ids else model.objects.none()
+        with self.write_lock, transaction.atomic():
+            before = in_range.count()
+            model.objects.bulk_create(
+                instances, batch_size=self.batch_size,
+                ignore_conflicts=True
             )
+            if model is Title and not fts_enabled():
+                index_titles(list(in_range), batch_size=self.batch_size)
+            return in_range.count() - before + len(instances) - len(ids)
 
-        return model(**fields)
+    def get_converters(self, model, columns):
+        """Сопоставляет колонки CSV полям модели.
 
-    def parse_date(self, date_str):
-        """Парсит строку даты в объект datetime."""
-        try:
-            return datetime.strptime(date_str, '%Y-%m-%d').date()
-        except ValueError:
-            return None
+        Колонка внешнего ключа может называться как поле (category)
+        или как его attname (category_id).
+        """
+        fields = {}
+        for field in model._meta.concrete_fields:
+            fields[field.name] = field
+            fields[field.attname] = field
+
+        converters = {}
+        for column in columns or ():
+            field = fields.get(column)
+            if field is None:
+                self.write_error(
+                    f'Колонка {column} не найдена в модели '
+                    f'{model.__name__} и будет пропущена.'
+                )
+                continue
+            converters[column] = (field.attname, self.get_converter(field))
+        return converters
+
+    @staticmethod
+    def get_converter(field):
+        """Возвращает функцию приведения строки CSV к значению поля."""
+        target = field.target_field if field.is_relation else field
+
+        def convert(value):
+            if value == '' and field.null:
+                return None
+            return target.to_python(value)
+
+        return convert
+
+    @staticmethod
+    def get_known_ids(model, converters):
+        """Загружает id связанных записей для проверки внешних ключей."""
+        known_ids = {}
+        attnames = {attname for attname, _ in converters.values()}
+        for field in model._meta.concrete_fields:
+            if field.is_relation and field.attname in attnames:
+                related_model = field.related_model
+                known_ids[field.attname] = set(
+                    related_model.objects.values_list('pk', flat=True)
+                )
+        return known_ids
+
+    def refresh_title_ratings(self):
+        """Пересчитывает рейтинги: bulk_create не вызывает сигналы."""
+        with transaction.atomic():
+            Title.objects.all().refresh_ratings()
+
+    def report_progress(self, file_name, processed, imported, skipped,
+                        started):
+        if self.verbosity < 1:
+            return
+        elapsed = monotonic() - started
+        self.write(
+            f'{file_name}: обработано {processed}, записано {imported}, '
+            f'пропущено {skipped} '
+            f'({self.get_rate(processed, elapsed)} строк/с)'
+        )
+
+    def report_rejected(self, row, error):
+        if self.verbosity < 2:
+            return
+        self.write_error(
+            f'Ошибка при добавлении записи: {row}. Ошибка: {error}'
+        )
+
+    def report_timings(self):
+        """Выводит время начала и длительность каждого этапа."""
+        self.write('Этапы импорта (старт / длительность, с):')
+        for name, (offset, duration) in sorted(
+            self.timings.items(), key=lambda item: item[1]
+        ):
+            self.write(f'  {name}: {offset:.2f} / {duration:.2f}')
+
+    def write(self, message):
+        with self.output_lock:
+            self.stdout.write(message)
+
+    def write_error(self, message):
+        with self.output_lock:
+            self.stderr.write(self.style.ERROR(message))
+
+    @staticmethod
+    def get_rate(rows, elapsed):
+        return f'{rows / elapsed:.0f}' if elapsed else '—'
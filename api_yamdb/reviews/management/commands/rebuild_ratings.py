@@ -0,0 +1,32 @@
+from time import monotonic
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import Title
+from reviews.versions import bump_catalogue
+
+
+class Command(BaseCommand):
+    """Класс для пересчёта сохранённых рейтингов произведений.
+
+    Вместе с рейтингом пересчитываются счётчики отзывов и распределение
+    оценок.
+    """
+
+    help = (
+        'Пересчитывает рейтинг, счётчики отзывов и распределение оценок '
+        'всех произведений'
+    )
+
+    def handle(self, *args, **kwargs):
+        started = monotonic()
+        with transaction.atomic():
+            updated = Title.objects.all().refresh_ratings()
+        bump_catalogue()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Пересчитано произведений: {updated} '
+                f'за {monotonic() - started:.2f} с.'
+            )
+        )
@@ -0,0 +1,99 @@
+# Generated by Django 3.2 on 2026-10-17 18:22
+
+import re
+import sqlite3
+from collections import Counter
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+CREATE_FTS_SQL = (
+    'CREATE VIRTUAL TABLE reviews_title_fts USING fts5('
+    "name, description, content='reviews_title', content_rowid='id', "
+    "prefix='2 3')",
+    'CREATE TRIGGER reviews_title_fts_ai AFTER INSERT ON reviews_title BEGIN '
+    'INSERT INTO reviews_title_fts(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    'CREATE TRIGGER reviews_title_fts_ad AFTER DELETE ON reviews_title BEGIN '
+    'INSERT INTO reviews_title_fts(reviews_title_fts, rowid, name, '
+    "description) VALUES ('delete', old.id, old.name, old.description); END",
+    'CREATE TRIGGER reviews_title_fts_au AFTER UPDATE OF name, description '
+    'ON reviews_title BEGIN '
+    'INSERT INTO reviews_title_fts(reviews_title_fts, rowid, name, '
+    "description) VALUES ('delete', old.id, old.name, old.description); "
+    'INSERT INTO reviews_title_fts(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    "INSERT INTO reviews_title_fts(reviews_title_fts) VALUES ('rebuild')",
+)
+DROP_FTS_SQL = (
+    'DROP TRIGGER IF EXISTS reviews_title_fts_ai',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_ad',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_au',
+    'DROP TABLE IF EXISTS reviews_title_fts',
+)
+
+
+def sqlite_supports_fts5():
+    probe = sqlite3.connect(':memory:')
+    try:
+        probe.execute('CREATE VIRTUAL TABLE probe USING fts5(text)')
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        probe.close()
+    return True
+
+
+def get_title_tokens(title):
+    weights = Counter()
+    for text, weight in ((title.name, 10), (title.description, 1)):
+        for token in {
+            token[:64] for token in re.findall(r'\w+', text.lower())
+        }:
+            weights[token] += weight
+    return weights
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite' and sqlite_supports_fts5():
+        for statement in CREATE_FTS_SQL:
+            schema_editor.execute(statement)
+        return
+    Title = apps.get_model('reviews', 'Title')
+    TitleSearchToken = apps.get_model('reviews', 'TitleSearchToken')
+    for title in Title.objects.iterator():
+        TitleSearchToken.objects.bulk_create(
+            TitleSearchToken(title=title, token=token, weight=weight)
+            for token, weight in get_title_tokens(title).items()
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in DROP_FTS_SQL:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_title_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64, verbose_name='Слово')),
+                ('weight', models.PositiveSmallIntegerField(verbose_name='Вес')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Слово поискового индекса',
+                'verbose_name_plural': 'Поисковый индекс',
+                'unique_together': {('token', 'title')},
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
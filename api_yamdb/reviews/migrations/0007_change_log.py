@@ -0,0 +1,36 @@
+# Generated by Django 3.2 on 2026-10-17 19:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_access_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource', models.CharField(max_length=16, verbose_name='Ресурс')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='id объекта')),
+                ('action', models.CharField(choices=[('save', 'Сохранение'), ('delete', 'Удаление'), ('reset', 'Сброс курсоров')], max_length=8, verbose_name='Действие')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Время изменения')),
+            ],
+            options={
+                'verbose_name': 'Изменение',
+                'verbose_name_plural': 'Журнал изменений',
+                'ordering': ('pk',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='change',
+            index=models.Index(fields=['resource', 'object_id'], name='change_object_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='change',
+            index=models.Index(fields=['created'], name='change_created_idx'),
+        ),
+    ]
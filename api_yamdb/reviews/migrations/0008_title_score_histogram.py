@@ -0,0 +1,122 @@
+# Generated by Django 3.2 on 2026-10-17 19:05
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+CREATE_FTS_SQL = (
+    'CREATE VIRTUAL TABLE reviews_title_fts USING fts5('
+    "name, description, content='reviews_title', content_rowid='id', "
+    "prefix='2 3')",
+    'CREATE TRIGGER reviews_title_fts_ai AFTER INSERT ON reviews_title BEGIN '
+    'INSERT INTO reviews_title_fts(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    'CREATE TRIGGER reviews_title_fts_ad AFTER DELETE ON reviews_title BEGIN '
+    'INSERT INTO reviews_title_fts(reviews_title_fts, rowid, name, '
+    "description) VALUES ('delete', old.id, old.name, old.description); END",
+    'CREATE TRIGGER reviews_title_fts_au AFTER UPDATE OF name, description '
+    'ON reviews_title BEGIN '
+    'INSERT INTO reviews_title_fts(reviews_title_fts, rowid, name, '
+    "description) VALUES ('delete', old.id, old.name, old.description); "
+    'INSERT INTO reviews_title_fts(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    "INSERT INTO reviews_title_fts(reviews_title_fts) VALUES ('rebuild')",
+)
+DROP_FTS_SQL = (
+    'DROP TRIGGER IF EXISTS reviews_title_fts_ai',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_ad',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_au',
+    'DROP TABLE IF EXISTS reviews_title_fts',
+)
+
+
+def fill_score_counts(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    Title.objects.update(**{
+        f'score_count_{score}': Coalesce(
+            Subquery(reviews.filter(score=score).annotate(
+                value=Count('pk')
+            ).values('value')),
+            0
+        )
+        for score in range(1, 11)
+    })
+
+
+def recreate_search_index(apps, schema_editor):
+    """SQLite пересоздаёт таблицу с новыми полями без триггеров FTS."""
+    connection = schema_editor.connection
+    if (
+        connection.vendor != 'sqlite'
+        or 'reviews_title_fts' not in connection.introspection.table_names()
+    ):
+        return
+    for statement in DROP_FTS_SQL + CREATE_FTS_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_change_log'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, recreate_search_index),
+        migrations.AddField(
+            model_name='title',
+            name='score_count_1',
+            field=models.PositiveIntegerField(default=0, verbose_name='Отзывов с оценкой 1'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_count_10',
+            field=models.PositiveIntegerField(default=0, verbose_name='Отзывов с оценкой 10'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_count_2',
+            field=models.PositiveIntegerField(default=0, verbose_name='Отзывов с оценкой 2'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_count_3',
+            field=models.PositiveIntegerField(default=0, verbose_name='Отзывов с оценкой 3'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_count_4',
+            field=models.PositiveIntegerField(default=0, verbose_name='Отзывов с оценкой 4'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_count_5',
+            field=models.PositiveIntegerField(default=0, verbose_name='Отзывов с оценкой 5'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_count_6',
+            field=models.PositiveIntegerField(default=0, verbose_name='Отзывов с оценкой 6'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_count_7',
+            field=models.PositiveIntegerField(default=0, verbose_name='Отзывов с оценкой 7'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_count_8',
+            field=models.PositiveIntegerField(default=0, verbose_name='Отзывов с оценкой 8'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_count_9',
+            field=models.PositiveIntegerField(default=0, verbose_name='Отзывов с оценкой 9'),
+        ),
+        migrations.RunPython(fill_score_counts, migrations.RunPython.noop),
+        migrations.RunPython(recreate_search_index, migrations.RunPython.noop),
+    ]
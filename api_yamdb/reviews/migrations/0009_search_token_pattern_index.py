@@ -0,0 +1,17 @@
+# Generated by Django 3.2 on 2026-10-17 20:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_score_histogram'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='titlesearchtoken',
+            index=models.Index(fields=['token'], name='search_token_like_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
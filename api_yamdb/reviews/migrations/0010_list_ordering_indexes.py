@@ -0,0 +1,29 @@
+# Generated by Django 3.2 on 2026-10-17 19:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_search_token_pattern_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='comment',
+            name='comment_review_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='review',
+            name='review_title_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['review', 'pub_date', 'text'], name='comment_review_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['title', '-pub_date', 'text'], name='review_title_date_idx'),
+        ),
+    ]
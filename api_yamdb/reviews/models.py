@@ -1,16 +1,44 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Avg, Count, F, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf
 
-from .constants import (CHAR_LIMIT, MAX_COMMENT_LENGTH, MAX_LENGTH_NAME,
-                        MAX_LENGTH_SLUG, MAX_REVIEW_LENGTH, MAX_SCORE_VALUE,
-                        MIN_SCORE_VALUE)
+from .constants import (CHAR_LIMIT, MAX_ACTION_LENGTH, MAX_COMMENT_LENGTH,
+                        MAX_LENGTH_NAME, MAX_LENGTH_SLUG, MAX_RESOURCE_LENGTH,
+                        MAX_REVIEW_LENGTH, MAX_SCORE_VALUE,
+                        MAX_SEARCH_TOKEN_LENGTH, MIN_SCORE_VALUE)
 from .validators import validate_year
 
 User = get_user_model()
 
+SCORES = range(MIN_SCORE_VALUE, MAX_SCORE_VALUE + 1)
 
-class NameAndSlugAbstractModel(models.Model):
+
+def score_count_field(score):
+    """Поле произведения с числом отзывов с оценкой score."""
+    return f'score_count_{score}'
+
+
+class AtomicSaveModel(models.Model):
+    """Абстрактная модель, которая сохраняется в транзакции.
+
+    Сигналы post_save выполняются внутри транзакции, поэтому запись
+    журнала изменений и пересчёт рейтинга фиксируются вместе с самим
+    объектом. Внутри чужой транзакции точка сохранения не создаётся:
+    ошибка откатывает всю внешнюю транзакцию, и вызывающий код, который
+    хочет её перехватить, сам открывает atomic().
+    """
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save(*args, **kwargs)
+
+
+class NameAndSlugAbstractModel(AtomicSaveModel):
     """Абстрактный класс для наследования полей названия и слага."""
 
     name = models.CharField(
@@ -46,7 +74,7 @@ class Genre(NameAndSlugAbstractModel):
         verbose_name_plural = 'Жанры'
 
 
-class GenreTitle(models.Model):
+class GenreTitle(AtomicSaveModel):
     title = models.ForeignKey(
         'Title',
         on_delete=models.SET_NULL,
@@ -58,9 +86,80 @@ class GenreTitle(models.Model):
         null=True
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=('genre', 'title'), name='genre_title_genre_idx'
+            ),
+        ]
+
+
+class TitleQuerySet(models.QuerySet):
+    """Кверисет произведений с обслуживанием сохранённого рейтинга."""
+
+    def apply_review_delta(self, added=None, removed=None):
+        """Учитывает добавленную и убранную оценки одним UPDATE.
 
-class Title(models.Model):
-    """Класс модели произведения."""
+        Сдвигает счётчики отзывов и оценок и пересчитывает рейтинг.
+        """
+        review_count = (
+            F('review_count')
+            + int(added is not None) - int(removed is not None)
+        )
+        score_sum = F('score_sum') + (added or 0) - (removed or 0)
+        score_counts = {}
+        if added is not None:
+            score_counts[score_count_field(added)] = (
+                F(score_count_field(added)) + 1
+            )
+        if removed is not None:
+            field = score_count_field(removed)
+            score_counts[field] = score_counts.get(field, F(field)) - 1
+        return self.update(
+            review_count=review_count,
+            score_sum=score_sum,
+            rating=(
+                Cast(score_sum, FloatField())
+                / NullIf(review_count, 0)
+            ),
+            **score_counts,
+        )
+
+    def refresh_ratings(self):
+        """Пересчитывает рейтинг и счётчики заново по таблице отзывов."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        return self.update(
+            review_count=Coalesce(
+                Subquery(reviews.annotate(value=Count('pk')).values('value')),
+                0
+            ),
+            score_sum=Coalesce(
+                Subquery(reviews.annotate(value=Sum('score')).values('value')),
+                0
+            ),
+            rating=Subquery(
+                reviews.annotate(value=Avg('score')).values('value')
+            ),
+            **{
+                score_count_field(score): Coalesce(
+                    Subquery(reviews.filter(score=score).annotate(
+                        value=Count('pk')
+                    ).values('value')),
+                    0
+                )
+                for score in SCORES
+            },
+        )
+
+
+class Title(AtomicSaveModel):
+    """Класс модели произведения.
+
+    Поля rating, review_count, score_sum и score_count_1…score_count_10
+    хранят агрегаты отзывов и обновляются сигналами модели Review.
+    """
 
     name = models.CharField(
         'Название произведения',
@@ -82,17 +181,96 @@ class Title(models.Model):
     year = models.SmallIntegerField('Год произведения',
                                     validators=[validate_year],)
     description = models.TextField('Описание произведения', blank=True)
+    rating = models.FloatField('Рейтинг', null=True, blank=True)
+    review_count = models.PositiveIntegerField(
+        'Количество отзывов', default=0
+    )
+    score_sum = models.PositiveIntegerField('Сумма оценок', default=0)
+    score_count_1 = models.PositiveIntegerField(
+        'Отзывов с оценкой 1', default=0
+    )
+    score_count_2 = models.PositiveIntegerField(
+        'Отзывов с оценкой 2', default=0
+    )
+    score_count_3 = models.PositiveIntegerField(
+        'Отзывов с оценкой 3', default=0
+    )
+    score_count_4 = models.PositiveIntegerField(
+        'Отзывов с оценкой 4', default=0
+    )
+    score_count_5 = models.PositiveIntegerField(
+        'Отзывов с оценкой 5', default=0
+    )
+    score_count_6 = models.PositiveIntegerField(
+        'Отзывов с оценкой 6', default=0
+    )
+    score_count_7 = models.PositiveIntegerField(
+        'Отзывов с оценкой 7', default=0
+    )
+    score_count_8 = models.PositiveIntegerField(
+        'Отзывов с оценкой 8', default=0
+    )
+    score_count_9 = models.PositiveIntegerField(
+        'Отзывов с оценкой 9', default=0
+    )
+    score_count_10 = models.PositiveIntegerField(
+        'Отзывов с оценкой 10', default=0
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('name', 'year',)
+        indexes = [
+            models.Index(fields=('name', 'year'), name='title_name_year_idx'),
+            models.Index(
+                fields=('category', 'year'), name='title_category_year_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def score_histogram(self):
+        """Число отзывов с каждой оценкой."""
+        return {
+            score: getattr(self, score_count_field(score))
+            for score in SCORES
+        }
+
+
+class TitleSearchToken(models.Model):
+    """Класс модели слова поискового индекса произведений.
+
+    Используется, если база данных не поддерживает SQLite FTS5.
+    """
+
+    token = models.CharField('Слово', max_length=MAX_SEARCH_TOKEN_LENGTH)
+    title = models.ForeignKey(
+        Title, verbose_name='Произведение',
+        on_delete=models.CASCADE, related_name='search_tokens'
+    )
+    weight = models.PositiveSmallIntegerField('Вес')
+
+    class Meta:
+        verbose_name = 'Слово поискового индекса'
+        verbose_name_plural = 'Поисковый индекс'
+        unique_together = ['token', 'title']
+        indexes = [
+            models.Index(
+                fields=('token',), name='search_token_like_idx',
+                opclasses=['varchar_pattern_ops']
+            ),
+        ]
+
+    def __str__(self):
+        return self.token
+
 
-class Review(models.Model):
+class Review(AtomicSaveModel):
     """Класс модели отзыв."""
 
     text = models.TextField('Текст', max_length=MAX_REVIEW_LENGTH)
@@ -119,12 +297,25 @@ class Review(models.Model):
         default_related_name = 'reviews'
         ordering = ('-pub_date', 'title', 'text',)
         unique_together = ['author', 'title']
+        indexes = [
+            models.Index(
+                fields=('title', '-pub_date', 'text'),
+                name='review_title_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:CHAR_LIMIT]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает загруженные из БД произведение и оценку."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
 
-class Comment(models.Model):
+class Comment(AtomicSaveModel):
     """Класс модели комментарий."""
 
     text = models.TextField('Текст', max_length=MAX_COMMENT_LENGTH)
@@ -145,6 +336,50 @@ class Comment(models.Model):
         verbose_name_plural = 'Комментарии'
         default_related_name = 'comments'
         ordering = ('pub_date', 'review', 'text',)
+        indexes = [
+            models.Index(
+                fields=('review', 'pub_date', 'text'),
+                name='comment_review_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:CHAR_LIMIT]
+
+
+class Change(models.Model):
+    """Класс модели записи журнала изменений.
+
+    id записи служит курсором синхронизации. Запись с действием RESET —
+    служебная отметка: курсоры меньше object_id недействительны.
+    """
+
+    SAVE = 'save'
+    DELETE = 'delete'
+    RESET = 'reset'
+    ACTIONS = (
+        (SAVE, 'Сохранение'),
+        (DELETE, 'Удаление'),
+        (RESET, 'Сброс курсоров'),
+    )
+
+    resource = models.CharField('Ресурс', max_length=MAX_RESOURCE_LENGTH)
+    object_id = models.PositiveBigIntegerField('id объекта')
+    action = models.CharField(
+        'Действие', max_length=MAX_ACTION_LENGTH, choices=ACTIONS
+    )
+    created = models.DateTimeField('Время изменения', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Изменение'
+        verbose_name_plural = 'Журнал изменений'
+        ordering = ('pk',)
+        indexes = [
+            models.Index(
+                fields=('resource', 'object_id'), name='change_object_idx'
+            ),
+            models.Index(fields=('created',), name='change_created_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.resource} {self.object_id}: {self.action}'
@@ -0,0 +1,122 @@
+"""Полнотекстовый поиск произведений по названию и описанию.
+
+В SQLite с модулем FTS5 используется виртуальная таблица reviews_title_fts,
+которую синхронизируют триггеры на reviews_title. В остальных базах
+используется индекс слов TitleSearchToken, который обновляется сигналами
+при сохранении произведения. Слова ищутся по префиксу через LIKE, поэтому
+в PostgreSQL у колонки token есть индекс с varchar_pattern_ops: обычный
+индекс при сортировке, отличной от C, LIKE не обслуживает. В остальных
+базах классы операторов индекса не учитываются.
+"""
+import re
+from collections import Counter
+
+from django.db import connections
+from django.db.models import OuterRef, Q, Subquery, Sum
+
+from .constants import (DESCRIPTION_SEARCH_WEIGHT, MAX_SEARCH_TOKEN_LENGTH,
+                        NAME_SEARCH_WEIGHT)
+
+FTS_TABLE = 'reviews_title_fts'
+TITLE_TABLE = 'reviews_title'
+TOKEN_PATTERN = re.compile(r'\w+')
+
+_fts_enabled = {}
+
+
+def fts_enabled(using='default'):
+    """Есть ли в базе таблица FTS5 для поиска произведений."""
+    if using not in _fts_enabled:
+        connection = connections[using]
+        _fts_enabled[using] = (
+            connection.vendor == 'sqlite'
+            and FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts_enabled[using]
+
+
+def tokenize(text):
+    """Разбивает текст на слова в нижнем регистре."""
+    return [
+        token[:MAX_SEARCH_TOKEN_LENGTH]
+        for token in TOKEN_PATTERN.findall(text.lower())
+    ]
+
+
+def get_title_tokens(title):
+    """Слова произведения с весами: слово из названия весит больше."""
+    weights = Counter()
+    for token in set(tokenize(title.name)):
+        weights[token] += NAME_SEARCH_WEIGHT
+    for token in set(tokenize(title.description)):
+        weights[token] += DESCRIPTION_SEARCH_WEIGHT
+    return weights
+
+
+def index_title(title):
+    """Перестраивает индекс слов одного произведения."""
+    index_titles([title])
+
+
+def index_titles(titles, batch_size=1000):
+    """Перестраивает индекс слов нескольких произведений."""
+    from .models import TitleSearchToken
+    TitleSearchToken.objects.filter(title__in=titles).delete()
+    TitleSearchToken.objects.bulk_create(
+        (
+            TitleSearchToken(title=title, token=token, weight=weight)
+            for title in titles
+            for token, weight in get_title_tokens(title).items()
+        ),
+        batch_size=batch_size,
+    )
+
+
+def search_titles(queryset, query):
+    """Фильтрует произведения по словам запроса и сортирует по релевантности.
+
+    Каждое слово запроса ищется как префикс, найтись должны все слова.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return queryset.none()
+    if fts_enabled(queryset.db):
+        return search_titles_fts(queryset, tokens)
+    return search_titles_index(queryset, tokens)
+
+
+def search_titles_fts(queryset, tokens):
+    match = ' '.join(f'"{token}"*' for token in tokens)
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[
+            f'{FTS_TABLE}.rowid = {TITLE_TABLE}.id',
+            f'{FTS_TABLE} MATCH %s',
+        ],
+        params=[match],
+        select={
+            'search_rank': (
+                f'bm25({FTS_TABLE}, '
+                f'{NAME_SEARCH_WEIGHT}, {DESCRIPTION_SEARCH_WEIGHT})'
+            ),
+        },
+    ).order_by('search_rank', 'pk')
+
+
+def search_titles_index(queryset, tokens):
+    from .models import TitleSearchToken
+    for token in tokens:
+        queryset = queryset.filter(pk__in=TitleSearchToken.objects.filter(
+            token__startswith=token
+        ).values('title_id'))
+    matched = Q()
+    for token in tokens:
+        matched |= Q(token__startswith=token)
+    rank = TitleSearchToken.objects.filter(
+        matched, title=OuterRef('pk')
+    ).order_by().values('title').annotate(
+        rank=Sum('weight')
+    ).values('rank')
+    return queryset.annotate(
+        search_rank=Subquery(rank)
+    ).order_by('-search_rank', 'pk')
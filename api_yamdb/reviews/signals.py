@@ -0,0 +1,180 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .changes import record_change, record_changes
+from .models import Category, Change, Comment, Genre, GenreTitle, Review, Title
+from .search import fts_enabled, index_title
+from .versions import (CATEGORIES, GENRE_TITLES, GENRES, REVIEWS, TITLES,
+                       bump_versions, title_version)
+
+TRACKED_FIELDS = ('title_id', 'score')
+
+_deferred_titles = ContextVar('deferred_titles', default=None)
+
+
+@contextmanager
+def deferred_rating_updates():
+    """Откладывает пересчёт рейтингов до конца блока.
+
+    Сигналы отзывов внутри блока только запоминают произведения. На выходе
+    их рейтинги пересчитываются одним UPDATE, а версии сбрасываются один
+    раз. При исключении пересчёт не выполняется: транзакция откатится.
+    """
+    title_ids = set()
+    token = _deferred_titles.set(title_ids)
+    try:
+        yield title_ids
+    finally:
+        _deferred_titles.reset(token)
+    title_ids.discard(None)
+    if title_ids:
+        Title.objects.filter(pk__in=title_ids).refresh_ratings()
+        bump_versions(
+            REVIEWS, *(title_version(title_id) for title_id in title_ids)
+        )
+
+
+def defer_rating_update(*title_ids):
+    """Запоминает произведения, если пересчёт отложен."""
+    deferred = _deferred_titles.get()
+    if deferred is None:
+        return False
+    deferred.update(title_ids)
+    return True
+
+
+def get_loaded_state(review):
+    """Возвращает произведение и оценку отзыва на момент загрузки из БД."""
+    loaded = getattr(review, '_loaded_values', {})
+    if all(field in loaded for field in TRACKED_FIELDS):
+        return loaded['title_id'], loaded['score']
+    return None
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_review_save(sender, instance, created, **kwargs):
+    """Обновляет рейтинг произведения при создании и изменении отзыва."""
+    loaded = get_loaded_state(instance)
+    instance._loaded_values = {
+        'title_id': instance.title_id, 'score': instance.score
+    }
+    if defer_rating_update(instance.title_id, loaded and loaded[0]):
+        return
+    if created:
+        Title.objects.filter(pk=instance.title_id).apply_review_delta(
+            added=instance.score
+        )
+    elif loaded is None:
+        Title.objects.filter(pk=instance.title_id).refresh_ratings()
+    elif loaded[0] != instance.title_id:
+        Title.objects.filter(pk=loaded[0]).apply_review_delta(
+            removed=loaded[1]
+        )
+        Title.objects.filter(pk=instance.title_id).apply_review_delta(
+            added=instance.score
+        )
+    elif loaded[1] != instance.score:
+        Title.objects.filter(pk=instance.title_id).apply_review_delta(
+            added=instance.score, removed=loaded[1]
+        )
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_review_delete(sender, instance, **kwargs):
+    """Обновляет рейтинг произведения при удалении отзыва."""
+    title_id, score = (
+        get_loaded_state(instance) or (instance.title_id, instance.score)
+    )
+    if defer_rating_update(title_id):
+        return
+    Title.objects.filter(pk=title_id).apply_review_delta(removed=score)
+
+
+@receiver(post_save, sender=Title)
+def update_search_index(sender, instance, using, **kwargs):
+    """Обновляет индекс слов произведения, если в базе нет FTS5."""
+    if not fts_enabled(using):
+        index_title(instance)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def bump_title_version(sender, instance, using, **kwargs):
+    bump_versions(TITLES, title_version(instance.pk), using=using)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def bump_genre_version(sender, instance, using, **kwargs):
+    bump_versions(GENRES, using=using)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_category_version(sender, instance, using, **kwargs):
+    bump_versions(CATEGORIES, using=using)
+
+
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def bump_genre_title_version(sender, instance, using, **kwargs):
+    bump_versions(
+        GENRE_TITLES, title_version(instance.title_id), using=using
+    )
+    if instance.title_id is not None:
+        record_changes('titles', [instance.title_id], Change.SAVE)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_title_genres_version(sender, instance, action, reverse, pk_set,
+                              using, **kwargs):
+    """Жанры произведения меняются через Title.genre без post_save."""
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        title_ids = [instance.pk]
+    elif pk_set:
+        title_ids = pk_set
+    else:
+        title_ids = []
+    bump_versions(
+        GENRE_TITLES, *(title_version(title_id) for title_id in title_ids),
+        using=using
+    )
+    record_changes('titles', title_ids, Change.SAVE)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def bump_review_version(sender, instance, using, **kwargs):
+    if defer_rating_update(instance.title_id):
+        return
+    bump_versions(REVIEWS, title_version(instance.title_id), using=using)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Comment)
+def record_save(sender, instance, **kwargs):
+    record_change(instance, Change.SAVE)
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+def record_delete(sender, instance, **kwargs):
+    record_change(instance, Change.DELETE)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def record_review_title_change(sender, instance, **kwargs):
+    """Отзыв меняет рейтинг, поэтому произведение тоже считается изменённым."""
+    record_changes('titles', [instance.title_id], Change.SAVE)
@@ -0,0 +1,81 @@
+"""Счётчики версий данных каталога.
+
+Версия — время последнего изменения в наносекундах, хранится в кеше
+CATALOGUE_VERSION_CACHE_ALIAS и увеличивается сигналами моделей.
+По версиям строятся ETag и Last-Modified ответов API и ключи кеша
+ответов. При нескольких процессах кеш должен быть общим для них.
+
+Внутри транзакции версии увеличиваются только после её фиксации: иначе
+запрос между увеличением версии и фиксацией прочитал бы старые данные,
+и они получили бы новый ETag и попали бы в кеш ответов под новым ключом.
+"""
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+VERSION_KEY = 'catalogue-version:{}'
+
+TITLES = 'titles'
+GENRES = 'genres'
+CATEGORIES = 'categories'
+GENRE_TITLES = 'genre_titles'
+REVIEWS = 'reviews'
+EPOCH = 'epoch'
+CATALOGUE = (TITLES, GENRES, CATEGORIES, GENRE_TITLES, REVIEWS, EPOCH)
+
+
+def get_version_cache():
+    return caches[settings.CATALOGUE_VERSION_CACHE_ALIAS]
+
+
+def title_version(title_id):
+    """Имя версии одного произведения."""
+    return f'{TITLES}:{title_id}'
+
+
+def get_versions(names):
+    """Возвращает версии по именам.
+
+    Отсутствующая в кеше версия создаётся с текущим временем.
+    """
+    cache = get_version_cache()
+    keys = {name: VERSION_KEY.format(name) for name in names}
+    stored = cache.get_many(keys.values())
+    versions = {}
+    for name, key in keys.items():
+        if key not in stored:
+            cache.add(key, time.time_ns(), None)
+            stored[key] = cache.get(key)
+        versions[name] = stored[key]
+    return versions
+
+
+def bump_versions(*names, using=None):
+    """Увеличивает версии: данные с этими именами изменились.
+
+    В транзакции базы using версии увеличиваются после её фиксации,
+    а при откате не меняются.
+    """
+    transaction.on_commit(partial(increment_versions, names), using=using)
+
+
+def increment_versions(names):
+    cache = get_version_cache()
+    keys = [VERSION_KEY.format(name) for name in names]
+    stored = cache.get_many(keys)
+    now = time.time_ns()
+    cache.set_many(
+        {key: max(now, stored.get(key, 0) + 1) for key in keys}, None
+    )
+
+
+def bump_catalogue():
+    """Увеличивает все версии каталога.
+
+    Нужна после массовых операций, которые не вызывают сигналы моделей:
+    версия EPOCH входит и в версии отдельных произведений.
+    """
+    bump_versions(*CATALOGUE)
@@ -2,6 +2,8 @@ from django.contrib import admin
 from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin
 
+from .models import OutboxEmail
+
 User = get_user_model()
 
 UserAdmin.fieldsets += (
@@ -15,3 +17,14 @@ UserAdmin.fieldsets += (
 )
 
 admin.site.register(User, UserAdmin)
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    """Админка для очереди писем."""
+
+    list_display = (
+        'recipient', 'subject', 'created', 'attempts', 'sent_at'
+    )
+    list_filter = ('sent_at',)
+    search_fields = ('recipient',)
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from users.outbox import purge_sent_emails, send_pending_emails
+
+
+class Command(BaseCommand):
+    """Класс для отправки писем из очереди.
+
+    Заодно удаляет письма, отправленные раньше
+    EMAIL_QUEUE_SENT_RETENTION.
+    """
+
+    help = 'Отправляет письма из очереди, срок отправки которых наступил'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.EMAIL_QUEUE_BATCH_SIZE,
+            help='Количество писем, отправляемых через одно соединение.'
+        )
+
+    def handle(self, *args, **options):
+        sent = send_pending_emails(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Отправлено писем: {sent}'))
+        deleted = purge_sent_emails()
+        self.stdout.write(f'Удалено отправленных писем: {deleted}')
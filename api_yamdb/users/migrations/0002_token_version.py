@@ -0,0 +1,28 @@
+# Generated by Django 3.2 on 2026-10-17 18:17
+
+from django.db import migrations, models
+import users.validators
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='api_user',
+            options={'ordering': ['username'], 'verbose_name': 'Пользователь', 'verbose_name_plural': 'Пользователи'},
+        ),
+        migrations.AddField(
+            model_name='api_user',
+            name='token_version',
+            field=models.PositiveIntegerField(default=0, help_text='Увеличивается при смене прав и отзывает выданные токены.', verbose_name='Версия токенов'),
+        ),
+        migrations.AlterField(
+            model_name='api_user',
+            name='username',
+            field=models.CharField(error_messages={'unique': 'Пользователь с таким именем уже существует.'}, help_text='Только буквы, цифры и @/./+/-/_', max_length=150, unique=True, validators=[users.validators.username_validator], verbose_name='Имя пользователя'),
+        ),
+    ]
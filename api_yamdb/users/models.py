@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 from .constants import ADMIN, MAX_USERNAME_LEN, MODERATOR, USER
 from .validators import username_validator
@@ -34,6 +35,13 @@ class API_User(AbstractUser):
         default=Role.USER
     )
     bio = models.TextField('Биография', blank=True)
+    token_version = models.PositiveIntegerField(
+        'Версия токенов',
+        default=0,
+        help_text='Увеличивается при смене прав и отзывает выданные токены.'
+    )
+
+    ROLE_FIELDS = ('role', 'is_staff', 'is_superuser')
 
     @property
     def is_admin(self):
@@ -46,7 +54,69 @@ class API_User(AbstractUser):
     def __str__(self):
         return f"{self.username} ({self.role})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает загруженные из БД поля, определяющие права."""
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        if all(field in loaded for field in cls.ROLE_FIELDS):
+            instance._loaded_role_state = tuple(
+                loaded[field] for field in cls.ROLE_FIELDS
+            )
+        return instance
+
+    def get_role_state(self):
+        return tuple(getattr(self, field) for field in self.ROLE_FIELDS)
+
+    def save(self, *args, **kwargs):
+        """Увеличивает версию токенов, если изменились права."""
+        loaded = getattr(self, '_loaded_role_state', None)
+        if loaded is not None and loaded != self.get_role_state():
+            self.token_version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
+        super().save(*args, **kwargs)
+        self._loaded_role_state = self.get_role_state()
+
     class Meta:
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
         ordering = ['username']
+
+
+class OutboxEmail(models.Model):
+    """Письмо в очереди на отправку.
+
+    Письма отправляет users.outbox: фоновый поток после регистрации
+    или команда send_emails.
+    """
+
+    subject = models.CharField('Тема', max_length=255)
+    message = models.TextField('Текст')
+    from_email = models.EmailField('Отправитель')
+    recipient = models.EmailField('Получатель')
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка', default=timezone.now
+    )
+    claimed_until = models.DateTimeField(
+        'Захвачено до', null=True, blank=True
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        ordering = ('next_attempt_at', 'pk')
+        indexes = [
+            models.Index(
+                fields=('sent_at', 'next_attempt_at'),
+                name='outbox_due_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
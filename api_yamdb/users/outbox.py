@@ -0,0 +1,198 @@
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+_worker_running = False
+_worker_lock = threading.Lock()
+_wakeup = threading.Event()
+
+
+def enqueue_email(subject, message, recipient, from_email=None):
+    """Ставит письмо в очередь и планирует доставку после коммита."""
+    email = OutboxEmail.objects.create(
+        subject=subject,
+        message=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipient=recipient,
+    )
+    transaction.on_commit(schedule_delivery)
+    return email
+
+
+def schedule_delivery():
+    """Запускает доставку в фоне или сразу, если очередь синхронная."""
+    if settings.EMAIL_QUEUE_ASYNC:
+        wake_worker()
+    else:
+        send_pending_emails()
+
+
+def get_due_emails(now):
+    return OutboxEmail.objects.filter(
+        Q(claimed_until__isnull=True) | Q(claimed_until__lt=now),
+        sent_at__isnull=True,
+        attempts__lt=settings.EMAIL_QUEUE_MAX_ATTEMPTS,
+        next_attempt_at__lte=now,
+    )
+
+
+def claim_batch(batch_size):
+    """Захватывает пачку писем, готовых к отправке.
+
+    Без SELECT ... FOR UPDATE SKIP LOCKED (SQLite) письма захватываются
+    одним UPDATE: транзакция, начатая с чтения, не может затем получить
+    блокировку на запись, если другое соединение уже пишет в базу.
+    """
+    now = timezone.now()
+    claimed_until = now + timedelta(seconds=settings.EMAIL_QUEUE_CLAIM_TIMEOUT)
+    with transaction.atomic():
+        emails = get_due_emails(now)
+        if not connection.features.has_select_for_update_skip_locked:
+            OutboxEmail.objects.filter(
+                pk__in=emails.values('pk')[:batch_size]
+            ).update(claimed_until=claimed_until)
+            return list(OutboxEmail.objects.filter(
+                claimed_until=claimed_until, sent_at__isnull=True
+            ))
+        batch = list(emails.select_for_update(skip_locked=True)[:batch_size])
+        OutboxEmail.objects.filter(
+            pk__in=[email.pk for email in batch]
+        ).update(claimed_until=claimed_until)
+    return batch
+
+
+def send_batch(batch):
+    """Отправляет пачку писем через одно соединение с почтовым сервером.
+
+    Неудачные письма планируются на повтор с экспоненциальной задержкой.
+    Если соединение не открылось, неудачными считаются все письма пачки.
+    """
+    mail_connection = get_connection()
+    try:
+        mail_connection.open()
+    except Exception as error:
+        for email in batch:
+            mark_failed(email, error)
+        return 0
+    sent = 0
+    try:
+        for email in batch:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.message,
+                from_email=email.from_email,
+                to=[email.recipient],
+                connection=mail_connection,
+            )
+            try:
+                mail_connection.send_messages([message])
+            except Exception as error:
+                mark_failed(email, error)
+                continue
+            email.sent_at = timezone.now()
+            email.claimed_until = None
+            email.attempts += 1
+            email.save(update_fields=('sent_at', 'claimed_until', 'attempts'))
+            sent += 1
+    finally:
+        mail_connection.close()
+    return sent
+
+
+def mark_failed(email, error):
+    email.attempts += 1
+    email.last_error = str(error)
+    email.claimed_until = None
+    email.next_attempt_at = timezone.now() + timedelta(
+        seconds=settings.EMAIL_QUEUE_RETRY_DELAY * 2 ** (email.attempts - 1)
+    )
+    email.save(update_fields=(
+        'attempts', 'last_error', 'claimed_until', 'next_attempt_at'
+    ))
+
+
+def send_pending_emails(batch_size=None):
+    """Отправляет все письма, срок отправки которых наступил.
+
+    Возвращает количество успешно отправленных писем.
+    """
+    batch_size = batch_size or settings.EMAIL_QUEUE_BATCH_SIZE
+    sent = 0
+    while True:
+        batch = claim_batch(batch_size)
+        if not batch:
+            return sent
+        sent += send_batch(batch)
+
+
+def purge_sent_emails():
+    """Удаляет письма, отправленные раньше EMAIL_QUEUE_SENT_RETENTION.
+
+    Возвращает количество удалённых писем.
+    """
+    deleted, _ = OutboxEmail.objects.filter(
+        sent_at__lt=timezone.now() - timedelta(
+            seconds=settings.EMAIL_QUEUE_SENT_RETENTION
+        )
+    ).delete()
+    return deleted
+
+
+def get_next_retry_delay():
+    """Секунды до ближайшего повтора или None, если повторять нечего."""
+    now = timezone.now()
+    next_attempt_at = OutboxEmail.objects.filter(
+        Q(claimed_until__isnull=True) | Q(claimed_until__lt=now),
+        sent_at__isnull=True,
+        attempts__lt=settings.EMAIL_QUEUE_MAX_ATTEMPTS,
+    ).order_by('next_attempt_at').values_list(
+        'next_attempt_at', flat=True
+    ).first()
+    if next_attempt_at is None:
+        return None
+    return max((next_attempt_at - now).total_seconds(), 0)
+
+
+def wake_worker():
+    """Будит фоновый поток отправки, запуская его при необходимости."""
+    global _worker_running
+    with _worker_lock:
+        _wakeup.set()
+        if not _worker_running:
+            _worker_running = True
+            threading.Thread(
+                target=run_worker, name='email-outbox', daemon=True
+            ).start()
+
+
+def run_worker():
+    """Цикл фонового потока: отправляет письма и ждёт повторов.
+
+    Поток завершается, когда в очереди не осталось писем к отправке.
+    """
+    global _worker_running
+    try:
+        while True:
+            _wakeup.clear()
+            send_pending_emails()
+            delay = get_next_retry_delay()
+            if delay is None:
+                with _worker_lock:
+                    if not _wakeup.is_set():
+                        _worker_running = False
+                        return
+                continue
+            _wakeup.wait(timeout=delay)
+    except Exception:
+        with _worker_lock:
+            _worker_running = False
+        raise
+    finally:
+        connection.close()
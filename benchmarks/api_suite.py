@@ -0,0 +1,358 @@
+"""Нагрузочный тест всех эндпоинтов /api/v1/.
+
+Заполняет временную базу SQLite синтетическими данными (seed.py),
+выполняет запросы к каждому эндпоинту через тестовый клиент Django
+и выводит p50/p95/p99 задержки, запросы в секунду и число запросов
+к БД на запрос. Результат сравнивается с baseline.json: если число
+запросов к БД выросло или p95 превысил базовый больше чем на
+--tolerance и --slack-ms, команда завершается с кодом 1. С базовыми
+значениями, снятыми при других --scale, --iterations или --seed,
+результат не сравнивается: команда сразу завершается с кодом 1.
+
+Запуск из корня репозитория:
+    python benchmarks/api_suite.py --scale 1 --iterations 50
+    python benchmarks/api_suite.py --save-baseline
+"""
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+from common import percentile, setup_django
+
+BASELINE_PATH = Path(__file__).resolve().parent / 'baseline.json'
+WARMUP_REQUESTS = 5
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=float, default=1)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--tolerance', type=float, default=1.0,
+        help='Допустимый относительный рост p95 (1.0 — вдвое).'
+    )
+    parser.add_argument(
+        '--slack-ms', type=float, default=10.0,
+        help='Допустимый абсолютный рост p95, мс: гасит шум малых значений.'
+    )
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument(
+        '--only', default='', help='Выполнить сценарии с этой подстрокой.'
+    )
+    return parser.parse_args()
+
+
+class Dataset:
+    """Идентификаторы засеянных данных и клиенты с токенами."""
+
+    def __init__(self):
+        from django.test import Client
+
+        from api.tokens import RoleAccessToken
+        from reviews.models import (Category, Comment, Genre, Review, Title,
+                                    User)
+        from users.constants import ADMIN
+
+        self.title_ids = list(Title.objects.values_list('pk', flat=True))
+        self.reviews = list(Review.objects.values_list('pk', 'title_id'))
+        self.comments = list(Comment.objects.values_list(
+            'pk', 'review_id', 'review__title_id'
+        ))
+        self.genre_slugs = list(Genre.objects.values_list('slug', flat=True))
+        self.category_slug = Category.objects.values_list(
+            'slug', flat=True
+        ).first()
+        self.usernames = list(User.objects.values_list('username', flat=True))
+
+        admin = User.objects.create(
+            username='bench-admin', email='admin@example.com', role=ADMIN
+        )
+        author = User.objects.create(
+            username='bench-author', email='author@example.com'
+        )
+        self.clients = {
+            'anonymous': Client(),
+            'admin': Client(
+                HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(admin)}'
+            ),
+            'author': Client(
+                HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(author)}'
+            ),
+        }
+        self.created = {}
+
+    def pick(self, items, index):
+        return items[index * 7919 % len(items)]
+
+
+def get_scenarios(data):
+    """Сценарии: имя, клиент, метод, функция (номер -> адрес, тело)."""
+    from django.contrib.auth.tokens import default_token_generator
+
+    from reviews.models import User
+
+    def title(index):
+        return data.pick(data.title_ids, index)
+
+    def review(index):
+        review_id, title_id = data.pick(data.reviews, index)
+        return f'/api/v1/titles/{title_id}/reviews/{review_id}/'
+
+    def comment(index):
+        comment_id, review_id, title_id = data.pick(data.comments, index)
+        return (
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/'
+            f'comments/{comment_id}/'
+        )
+
+    def own(kind, index):
+        return data.created[kind][index]
+
+    def token_request(index):
+        username = f'bench-signup-{index}'
+        user = User.objects.get(username=username)
+        return '/api/v1/auth/token/', {
+            'username': username,
+            'confirmation_code': default_token_generator.make_token(user),
+        }
+
+    return [
+        ('titles-list', 'author', 'get',
+         lambda i: ('/api/v1/titles/', None)),
+        ('titles-list-cached', 'anonymous', 'get',
+         lambda i: ('/api/v1/titles/', None)),
+        ('titles-filter-genre', 'author', 'get', lambda i: (
+            f'/api/v1/titles/?genre={data.pick(data.genre_slugs, i)}', None
+        )),
+        ('titles-search', 'author', 'get', lambda i: (
+            '/api/v1/titles/?search=город', None
+        )),
+        ('title-detail', 'author', 'get',
+         lambda i: (f'/api/v1/titles/{title(i)}/', None)),
+        ('genres-list', 'author', 'get', lambda i: ('/api/v1/genres/', None)),
+        ('categories-list', 'author', 'get',
+         lambda i: ('/api/v1/categories/', None)),
+        ('reviews-list', 'author', 'get',
+         lambda i: (f'/api/v1/titles/{title(i)}/reviews/', None)),
+        ('reviews-list-cursor', 'author', 'get',
+         lambda i: (f'/api/v1/titles/{title(i)}/reviews/?cursor=', None)),
+        ('review-detail', 'author', 'get', lambda i: (review(i), None)),
+        ('comments-list', 'author', 'get',
+         lambda i: (f'{review(i)}comments/', None)),
+        ('comment-detail', 'author', 'get', lambda i: (comment(i), None)),
+        ('review-create', 'author', 'post', lambda i: (
+            f'/api/v1/titles/{title(i)}/reviews/',
+            {'text': 'Отзыв', 'score': 7}
+        )),
+        ('review-update', 'author', 'patch',
+         lambda i: (own('review-create', i), {'score': 8})),
+        ('comment-create', 'author', 'post', lambda i: (
+            f'{own("review-create", i)}comments/', {'text': 'Комментарий'}
+        )),
+        ('comment-update', 'author', 'patch',
+         lambda i: (own('comment-create', i), {'text': 'Исправлено'})),
+        ('comment-delete', 'author', 'delete',
+         lambda i: (own('comment-create', i), None)),
+        ('review-delete', 'author', 'delete',
+         lambda i: (own('review-create', i), None)),
+        ('title-create', 'admin', 'post', lambda i: ('/api/v1/titles/', {
+            'name': f'Новое произведение {i}', 'year': 2000,
+            'genre': data.genre_slugs[:2], 'category': data.category_slug,
+        })),
+        ('title-update', 'admin', 'patch',
+         lambda i: (own('title-create', i), {'year': 2001})),
+        ('title-delete', 'admin', 'delete',
+         lambda i: (own('title-create', i), None)),
+        ('genre-create', 'admin', 'post', lambda i: (
+            '/api/v1/genres/', {'name': f'Жанр {i}', 'slug': f'bench-{i}'}
+        )),
+        ('genre-delete', 'admin', 'delete',
+         lambda i: (f'/api/v1/genres/bench-{i}/', None)),
+        ('category-create', 'admin', 'post', lambda i: (
+            '/api/v1/categories/',
+            {'name': f'Категория {i}', 'slug': f'bench-{i}'}
+        )),
+        ('category-delete', 'admin', 'delete',
+         lambda i: (f'/api/v1/categories/bench-{i}/', None)),
+        ('users-list', 'admin', 'get', lambda i: ('/api/v1/users/', None)),
+        ('user-detail', 'admin', 'get', lambda i: (
+            f'/api/v1/users/{data.pick(data.usernames, i)}/', None
+        )),
+        ('user-create', 'admin', 'post', lambda i: ('/api/v1/users/', {
+            'username': f'bench-user-{i}', 'email': f'bench{i}@example.com'
+        })),
+        ('user-update', 'admin', 'patch', lambda i: (
+            f'/api/v1/users/bench-user-{i}/', {'bio': 'Био'}
+        )),
+        ('user-delete', 'admin', 'delete',
+         lambda i: (f'/api/v1/users/bench-user-{i}/', None)),
+        ('me', 'author', 'get', lambda i: ('/api/v1/users/me/', None)),
+        ('me-update', 'author', 'patch',
+         lambda i: ('/api/v1/users/me/', {'bio': f'Био {i}'})),
+        ('auth-signup', 'anonymous', 'post', lambda i: (
+            '/api/v1/auth/signup/', {
+                'username': f'bench-signup-{i}',
+                'email': f'signup{i}@example.com',
+            }
+        )),
+        ('auth-token', 'anonymous', 'post', token_request),
+        ('cache-stats', 'admin', 'get',
+         lambda i: ('/api/v1/cache-stats/', None)),
+    ]
+
+
+def request(client, method, url, body):
+    if body is None:
+        return client.generic(method.upper(), url)
+    return client.generic(
+        method.upper(), url, json.dumps(body),
+        content_type='application/json'
+    )
+
+
+def run_scenario(data, scenario, iterations):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    name, role, method, build = scenario
+    client = data.clients[role]
+    if method == 'get':
+        for index in range(WARMUP_REQUESTS):
+            request(client, method, *build(index))
+
+    latencies, queries, errors = [], [], 0
+    for index in range(iterations):
+        url, body = build(index)
+        with CaptureQueriesContext(connection) as context:
+            started = perf_counter()
+            response = request(client, method, url, body)
+            latencies.append(perf_counter() - started)
+        queries.append(len(context.captured_queries))
+        if response.status_code >= 400:
+            errors += 1
+        elif method == 'post' and response.status_code == 201:
+            data.created.setdefault(name, []).append(
+                get_created_url(url, response.json())
+            )
+    return {
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'rps': round(len(latencies) / sum(latencies), 1),
+        'queries': round(sum(queries) / len(queries), 1),
+        'errors': errors,
+    }
+
+
+def get_created_url(url, body):
+    key = body.get('id', body.get('username'))
+    return f'{url}{key}/'
+
+
+def check_baseline(baseline, args):
+    """Возвращает параметры, с которыми базовые значения несравнимы."""
+    return [
+        f'--{name} {getattr(args, name)}, в базовых значениях '
+        f'{baseline.get(name)}'
+        for name in ('scale', 'iterations', 'seed')
+        if baseline.get(name) != getattr(args, name)
+    ]
+
+
+def compare(results, baseline, tolerance, slack_ms):
+    """Возвращает описания регрессий относительно базовых значений."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result['queries'] > base['queries']:
+            regressions.append(
+                f'{name}: запросов к БД {result["queries"]} '
+                f'вместо {base["queries"]}'
+            )
+        if result['p95_ms'] > base['p95_ms'] * (1 + tolerance) + slack_ms:
+            regressions.append(
+                f'{name}: p95 {result["p95_ms"]} мс, '
+                f'базовое {base["p95_ms"]} мс'
+            )
+        if result['errors']:
+            regressions.append(f'{name}: ошибок {result["errors"]}')
+    return regressions
+
+
+def report(results):
+    print(
+        f'{"сценарий":<22}{"p50":>8}{"p95":>8}{"p99":>8}'
+        f'{"rps":>9}{"запросов":>10}{"ошибок":>8}'
+    )
+    for name, result in results.items():
+        print(
+            f'{name:<22}{result["p50_ms"]:>8.2f}{result["p95_ms"]:>8.2f}'
+            f'{result["p99_ms"]:>8.2f}{result["rps"]:>9.1f}'
+            f'{result["queries"]:>10.1f}{result["errors"]:>8}'
+        )
+
+
+def main():
+    args = parse_args()
+    baseline = None
+    if not args.save_baseline and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        mismatches = check_baseline(baseline, args)
+        for mismatch in mismatches:
+            print(f'Базовые значения несравнимы: {mismatch}', file=sys.stderr)
+        if mismatches:
+            print(
+                'Запустите с теми же параметрами или обновите базовые '
+                'значения через --save-baseline.', file=sys.stderr
+            )
+            return 1
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(SQLITE_PATH=str(Path(directory) / 'bench.sqlite3'))
+        from django.conf import settings
+        from django.core.management import call_command
+
+        from seed import seed_dataset
+
+        settings.EMAIL_BACKEND = (
+            'django.core.mail.backends.locmem.EmailBackend'
+        )
+        call_command('migrate', verbosity=0)
+        started = perf_counter()
+        rows = seed_dataset(args.scale, args.seed)
+        print(f'Создано {rows} записей за {perf_counter() - started:.1f} с.')
+
+        data = Dataset()
+        results = {
+            scenario[0]: run_scenario(data, scenario, args.iterations)
+            for scenario in get_scenarios(data)
+            if args.only in scenario[0]
+        }
+    report(results)
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps({
+            'scale': args.scale, 'iterations': args.iterations,
+            'seed': args.seed, 'scenarios': results,
+        }, ensure_ascii=False, indent=2) + '\n')
+        print(f'Базовые значения сохранены в {args.baseline}.')
+        return 0
+    if baseline is None:
+        print('Базовые значения не найдены, сравнение пропущено.')
+        return 0
+    regressions = compare(
+        results, baseline['scenarios'], args.tolerance, args.slack_ms
+    )
+    for regression in regressions:
+        print(f'Регрессия: {regression}', file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
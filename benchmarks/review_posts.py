@@ -0,0 +1,141 @@
+"""Нагрузочный тест: параллельное создание отзывов.
+
+Сравнивает пропускную способность POST /api/v1/titles/{id}/reviews/
+без настройки соединений (baseline: журнал DELETE, synchronous=FULL,
+соединение на каждый запрос) и с настройками из settings.py (tuned:
+WAL, synchronous=NORMAL, busy_timeout, mmap, постоянные соединения).
+Каждый профиль запускается в отдельном процессе со своей базой SQLite.
+
+Запуск из корня репозитория:
+    python benchmarks/review_posts.py --requests 400 --threads 8
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from time import perf_counter
+
+from common import percentile, setup_django
+
+PROFILES = {
+    'baseline': {'SQLITE_PRAGMAS': '0', 'DB_CONN_MAX_AGE': '0'},
+    'tuned': {'SQLITE_PRAGMAS': '1', 'DB_CONN_MAX_AGE': '60'},
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--profile', choices=PROFILES, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def prepare_data(requests):
+    """Создаёт произведения и авторов: по одному отзыву на пару."""
+    from django.core.management import call_command
+
+    from api.tokens import RoleAccessToken
+    from reviews.models import Category, Title, User
+
+    call_command('migrate', verbosity=0)
+    category = Category.objects.create(name='Фильмы', slug='films')
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {number}', year=2000, category=category)
+        for number in range(requests)
+    )
+    User.objects.bulk_create(
+        User(username=f'user{number}', email=f'user{number}@example.com')
+        for number in range(requests)
+    )
+    # SQLite в Django 3.2 не возвращает id из bulk_create.
+    titles = Title.objects.order_by('pk')
+    users = User.objects.order_by('pk')
+    return [
+        (f'/api/v1/titles/{title.pk}/reviews/',
+         f'Bearer {RoleAccessToken.for_user(user)}')
+        for title, user in zip(titles, users)
+    ]
+
+
+def run_profile(args):
+    """Выполняет запросы в текущем процессе и печатает результат JSON."""
+    setup_django()
+    from django.db import connection
+    from django.test import Client
+
+    jobs = prepare_data(args.requests)
+    connection.close()
+
+    def post(job):
+        url, authorization = job
+        client = Client(raise_request_exception=False)
+        started = perf_counter()
+        response = client.post(
+            url, json.dumps({'text': 'Отзыв', 'score': 7}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=authorization,
+        )
+        return response.status_code, perf_counter() - started
+
+    def worker(chunk):
+        try:
+            return [post(job) for job in chunk]
+        finally:
+            connection.close()
+
+    chunks = [jobs[index::args.threads] for index in range(args.threads)]
+    started = perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        results = [
+            result for chunk in executor.map(worker, chunks)
+            for result in chunk
+        ]
+    elapsed = perf_counter() - started
+    latencies = [latency for _, latency in results]
+    print(json.dumps({
+        'requests': len(results),
+        'created': sum(status == 201 for status, _ in results),
+        'errors': sum(status != 201 for status, _ in results),
+        'elapsed': elapsed,
+        'rps': len(results) / elapsed,
+        'p95_ms': percentile(latencies, 95) * 1000,
+    }))
+
+
+def main():
+    args = parse_args()
+    if args.profile:
+        return run_profile(args)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, env in PROFILES.items():
+            process = subprocess.run(
+                [sys.executable, __file__, '--profile', name,
+                 '--requests', str(args.requests),
+                 '--threads', str(args.threads)],
+                env={
+                    **os.environ, **env,
+                    'SQLITE_PATH': str(Path(directory) / f'{name}.sqlite3'),
+                },
+                capture_output=True, text=True, check=True,
+            )
+            results[name] = json.loads(process.stdout.splitlines()[-1])
+
+    print(f'{"профиль":<10}{"rps":>10}{"p95, мс":>10}{"ошибок":>10}')
+    for name, result in results.items():
+        print(
+            f'{name:<10}{result["rps"]:>10.1f}{result["p95_ms"]:>10.1f}'
+            f'{result["errors"]:>10}'
+        )
+    speedup = results['tuned']['rps'] / results['baseline']['rps']
+    print(f'Ускорение: x{speedup:.2f}')
+
+
+if __name__ == '__main__':
+    main()
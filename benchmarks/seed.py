@@ -0,0 +1,29 @@
+"""Синтетические данные для нагрузочных тестов.
+
+Данные создаёт команда generate_data. Размер задаётся масштабом: при
+scale=1 создаётся 200 пользователей, 500 произведений, 2500 отзывов
+и 5000 комментариев. Данные детерминированы параметром seed.
+"""
+USERS = 200
+TITLES = 500
+REVIEWS = 2500
+COMMENTS = 5000
+GENRES = 20
+CATEGORIES = 5
+
+
+def seed_dataset(scale=1, seed=0):
+    """Заполняет пустую базу и возвращает число созданных записей."""
+    from django.core.management import call_command
+
+    counts = {
+        'users': max(int(USERS * scale), 1),
+        'titles': max(int(TITLES * scale), 1),
+        'reviews': int(REVIEWS * scale),
+        'comments': int(COMMENTS * scale),
+    }
+    call_command(
+        'generate_data', genres=GENRES, categories=CATEGORIES, seed=seed,
+        workers=1, verbosity=0, **counts
+    )
+    return sum(counts.values())
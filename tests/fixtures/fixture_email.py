@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def sync_email_queue(settings):
+    """Разбирает очередь писем сразу, чтобы проверять mail.outbox."""
+    settings.EMAIL_QUEUE_ASYNC = False
@@ -0,0 +1,74 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/{review_id}/'
+
+    def get_title(self, title_id):
+        from reviews.models import Title
+        return Title.objects.get(pk=title_id)
+
+    def test_01_rating_follows_reviews(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+
+        review = create_single_review(
+            admin_client, title_id, 'Отлично', 9
+        ).json()
+        create_single_review(user_client, title_id, 'Так себе', 4)
+        title = self.get_title(title_id)
+        assert (title.review_count, title.score_sum) == (2, 13), (
+            'Проверьте, что при создании отзыва обновляются сохранённые '
+            'счётчики отзывов произведения.'
+        )
+        assert title.rating == 6.5
+
+        url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review['id']
+        )
+        response = admin_client.patch(url, data={'score': 5})
+        assert response.status_code == HTTPStatus.OK
+        title = self.get_title(title_id)
+        assert (title.review_count, title.score_sum) == (2, 9), (
+            'Проверьте, что при изменении оценки отзыва обновляется '
+            'сохранённый рейтинг произведения.'
+        )
+
+        response = admin_client.delete(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        title = self.get_title(title_id)
+        assert (title.review_count, title.rating) == (1, 4), (
+            'Проверьте, что при удалении отзыва обновляется сохранённый '
+            'рейтинг произведения.'
+        )
+
+        response = admin_client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.json().get('rating') == 4
+
+    def test_02_rebuild_ratings_command(self, admin_client, user_client):
+        from reviews.models import Title
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Отлично', 10)
+        create_single_review(user_client, title_id, 'Хорошо', 7)
+        Title.objects.update(rating=None, review_count=0, score_sum=0)
+
+        call_command('rebuild_ratings')
+
+        title = self.get_title(title_id)
+        assert (title.review_count, title.score_sum) == (2, 17), (
+            'Проверьте, что команда `rebuild_ratings` пересчитывает '
+            'счётчики отзывов по таблице отзывов.'
+        )
+        assert title.rating == 8.5
+        assert self.get_title(titles[1]['id']).rating is None
@@ -0,0 +1,55 @@
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    TITLES_URL = '/api/v1/titles/'
+    PAGE_SIZE = 100
+
+    def create_titles_in_bulk(self, count):
+        from reviews.models import Category, Genre, Title
+        categories = [
+            Category.objects.create(name=f'Категория {i}', slug=f'cat-{i}')
+            for i in range(3)
+        ]
+        genres = [
+            Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+            for i in range(3)
+        ]
+        for i in range(count):
+            title = Title.objects.create(
+                name=f'Произведение {i}',
+                year=2000,
+                category=categories[i % len(categories)]
+            )
+            title.genre.set(genres[:i % len(genres) + 1])
+
+    def test_01_title_list_query_count(self, client,
+                                       django_assert_num_queries):
+        self.create_titles_in_bulk(self.PAGE_SIZE)
+        # Пагинация произведений - LimitOffsetPagination: размер
+        # страницы задаётся параметром `limit`.
+        url = f'{self.TITLES_URL}?limit={self.PAGE_SIZE}'
+
+        # COUNT(*), страница произведений с категориями, жанры страницы.
+        with django_assert_num_queries(3):
+            response = client.get(url)
+
+        results = response.json()['results']
+        assert len(results) == self.PAGE_SIZE
+        assert all(title['genre'] and title['category'] for title in results), (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` возвращает '
+            'жанры и категорию каждого произведения.'
+        )
+
+    def test_02_title_detail_query_count(self, client,
+                                         django_assert_num_queries):
+        from reviews.models import Title
+        self.create_titles_in_bulk(3)
+        title = Title.objects.first()
+
+        with django_assert_num_queries(2):
+            response = client.get(f'{self.TITLES_URL}{title.id}/')
+
+        assert len(response.json()['genre']) == title.genre.count()
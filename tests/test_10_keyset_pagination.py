@@ -0,0 +1,100 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10KeysetPagination:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    REVIEWS_COUNT = 25
+
+    @pytest.fixture
+    def title_with_reviews(self, django_user_model):
+        from django.utils import timezone
+        from reviews.models import Category, Review, Title
+        title = Title.objects.create(
+            name='Произведение', year=2000,
+            category=Category.objects.create(name='Фильм', slug='movie')
+        )
+        for i in range(self.REVIEWS_COUNT):
+            author = django_user_model.objects.create_user(
+                username=f'author{i}', email=f'author{i}@yamdb.fake'
+            )
+            Review.objects.create(
+                author=author, title=title, text=f'Отзыв {i}', score=5
+            )
+        # Одинаковая дата у части отзывов: порядок решает id.
+        Review.objects.filter(pk__in=Review.objects.order_by('pk').values(
+            'pk')[:10]).update(pub_date=timezone.now())
+        return title
+
+    def collect_pages(self, client, url, direction='next'):
+        ids = []
+        pages = 0
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что в курсорном режиме пагинации не выполняется '
+                'подсчёт количества объектов.'
+            )
+            page_ids = [review['id'] for review in data['results']]
+            ids = page_ids + ids if direction == 'previous' else ids + page_ids
+            url = data[direction]
+            pages += 1
+        return ids, pages
+
+    def test_01_cursor_walks_all_reviews(self, client, title_with_reviews):
+        from reviews.models import Review
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_with_reviews.id)
+        expected = list(
+            Review.objects.order_by('-pub_date', '-pk').values_list(
+                'pk', flat=True
+            )
+        )
+
+        ids, pages = self.collect_pages(client, f'{url}?cursor=&page_size=7')
+        assert ids == expected, (
+            'Проверьте, что курсорная пагинация отзывов возвращает все '
+            'отзывы по одному разу в порядке (-pub_date, -id).'
+        )
+        assert pages == 4
+
+        last_page = client.get(f'{url}?cursor=&page_size=7')
+        for _ in range(3):
+            last_page = client.get(last_page.json()['next'])
+        ids, _ = self.collect_pages(
+            client, last_page.json()['previous'], direction='previous'
+        )
+        assert ids == expected[:21], (
+            'Проверьте, что ссылка `previous` курсорной пагинации ведёт на '
+            'предыдущие страницы.'
+        )
+
+    def test_02_cursor_skips_count_and_offset(self, client,
+                                              title_with_reviews):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_with_reviews.id)
+        first = client.get(f'{url}?cursor=').json()
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(first['next'])
+        assert response.status_code == HTTPStatus.OK
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        assert 'COUNT(' not in sql and 'OFFSET' not in sql, (
+            'Проверьте, что курсорная пагинация не выполняет COUNT(*) и '
+            'не использует OFFSET.'
+        )
+
+    def test_03_invalid_cursor(self, client, title_with_reviews):
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_with_reviews.id)
+        response = client.get(f'{url}?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_04_page_number_mode_is_default(self, client, title_with_reviews):
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_with_reviews.id)
+        data = client.get(url).json()
+        assert data['count'] == self.REVIEWS_COUNT
@@ -0,0 +1,53 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11AuthCache:
+
+    ME_URL = '/api/v1/users/me/'
+    USER_DETAIL_URL_TEMPLATE = '/api/v1/users/{username}/'
+
+    def test_01_user_is_served_from_cache(self, user_client,
+                                          django_assert_num_queries):
+        response = user_client.get(self.ME_URL)
+        assert response.status_code == HTTPStatus.OK
+
+        with django_assert_num_queries(0):
+            response = user_client.get(self.ME_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что повторный запрос с тем же токеном берёт '
+            'пользователя из кеша, не обращаясь к базе данных.'
+        )
+
+    def test_02_cache_invalidated_on_role_change(self, admin_client,
+                                                 user_client, user):
+        assert user_client.get(self.ME_URL).json()['role'] == 'user'
+
+        response = admin_client.patch(
+            self.USER_DETAIL_URL_TEMPLATE.format(username=user.username),
+            data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+
+        response = user_client.get('/api/v1/users/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения роли пользователя кеш '
+            'аутентификации сбрасывается и новая роль действует сразу.'
+        )
+
+    def test_03_cache_invalidated_on_delete(self, admin_client, user_client,
+                                            user):
+        assert user_client.get(self.ME_URL).status_code == HTTPStatus.OK
+
+        response = admin_client.delete(
+            self.USER_DETAIL_URL_TEMPLATE.format(username=user.username)
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+
+        response = user_client.get(self.ME_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что удалённый пользователь не остаётся в кеше '
+            'аутентификации.'
+        )
@@ -0,0 +1,84 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from rest_framework.test import APIClient
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12RoleClaims:
+
+    TOKEN_URL = '/api/v1/auth/token/'
+    USERS_URL = '/api/v1/users/'
+    ME_URL = '/api/v1/users/me/'
+
+    def get_client(self, client, user):
+        response = client.post(self.TOKEN_URL, data={
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        })
+        assert response.status_code == HTTPStatus.OK
+        api_client = APIClient()
+        api_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {response.json()["token"]}'
+        )
+        return api_client
+
+    def test_01_token_contains_role_claims(self, client, moderator):
+        from rest_framework_simplejwt.tokens import AccessToken
+        response = client.post(self.TOKEN_URL, data={
+            'username': moderator.username,
+            'confirmation_code': default_token_generator.make_token(
+                moderator
+            ),
+        })
+        token = AccessToken(response.json()['token'])
+        assert token['role'] == 'moderator'
+        assert token['is_staff'] is False
+        assert token['is_superuser'] is False
+        assert token['token_version'] == moderator.token_version
+
+    def test_02_permission_checked_without_queries(
+            self, client, user, django_assert_num_queries):
+        user_client = self.get_client(client, user)
+        assert user_client.get(self.USERS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+
+        with django_assert_num_queries(0):
+            response = user_client.get(self.USERS_URL)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что права пользователя проверяются по claims '
+            'токена без запросов к базе данных.'
+        )
+
+    def test_03_user_loaded_when_view_needs_it(self, client, user):
+        user_client = self.get_client(client, user)
+        response = user_client.get(self.ME_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['username'] == user.username
+
+    def test_04_role_change_revokes_token(self, client, admin_client, user):
+        user_client = self.get_client(client, user)
+        assert user_client.get(self.ME_URL).status_code == HTTPStatus.OK
+
+        response = admin_client.patch(
+            f'{self.USERS_URL}{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+
+        response = user_client.get(self.ME_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что после изменения роли пользователя выданный '
+            'ранее токен с claims прав перестаёт действовать.'
+        )
+        user.refresh_from_db()
+        assert self.get_client(client, user).get(
+            self.USERS_URL
+        ).status_code == HTTPStatus.OK
+
+    def test_05_profile_change_keeps_token(self, client, user):
+        user_client = self.get_client(client, user)
+        response = user_client.patch(self.ME_URL, data={'bio': 'новое'})
+        assert response.status_code == HTTPStatus.OK
+        assert user_client.get(self.ME_URL).status_code == HTTPStatus.OK
@@ -0,0 +1,142 @@
+import io
+import time
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.core.mail.backends.locmem import EmailBackend
+
+
+class FailingBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+class ClosedBackend(EmailBackend):
+    def open(self):
+        raise ConnectionError('SMTP недоступен')
+
+
+class CountingBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13EmailOutbox:
+
+    SIGNUP_URL = '/api/v1/auth/signup/'
+
+    def enqueue(self, count=1):
+        from users.outbox import enqueue_email
+        for i in range(count):
+            enqueue_email('Тема', 'Текст', f'user{i}@yamdb.fake')
+
+    def test_01_failed_email_is_retried(self, settings):
+        from django.utils import timezone
+        from users.models import OutboxEmail
+        from users.outbox import send_pending_emails
+        settings.EMAIL_BACKEND = 'tests.test_13_email_outbox.FailingBackend'
+        self.enqueue()
+
+        email = OutboxEmail.objects.get()
+        assert email.sent_at is None
+        assert email.attempts == 1, (
+            'Проверьте, что неудачная отправка письма учитывается в '
+            'количестве попыток.'
+        )
+        assert email.next_attempt_at > timezone.now()
+        assert send_pending_emails() == 0, (
+            'Проверьте, что повтор отправки выполняется только после '
+            'задержки.'
+        )
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        OutboxEmail.objects.update(
+            next_attempt_at=timezone.now() - timedelta(seconds=1)
+        )
+        assert send_pending_emails() == 1
+        assert len(mail.outbox) == 1
+        assert OutboxEmail.objects.get().sent_at is not None
+
+    def test_02_batch_uses_single_connection(self, settings):
+        from users.models import OutboxEmail
+        from users.outbox import send_pending_emails
+        settings.EMAIL_BACKEND = 'tests.test_13_email_outbox.CountingBackend'
+        settings.EMAIL_QUEUE_BATCH_SIZE = 10
+        CountingBackend.opened = 0
+        for i in range(10):
+            OutboxEmail.objects.create(
+                subject='Тема', message='Текст', from_email='a@yamdb.fake',
+                recipient=f'user{i}@yamdb.fake'
+            )
+
+        assert send_pending_emails() == 10
+        assert CountingBackend.opened == 1, (
+            'Проверьте, что пачка писем отправляется через одно соединение '
+            'с почтовым сервером.'
+        )
+
+    def test_03_signup_sends_email_in_background(self, client, settings):
+        settings.EMAIL_QUEUE_ASYNC = True
+        response = client.post(self.SIGNUP_URL, data={
+            'email': 'async@yamdb.fake', 'username': 'async_user'
+        })
+        assert response.status_code == HTTPStatus.OK
+
+        deadline = time.monotonic() + 5
+        while not mail.outbox and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert [message.to for message in mail.outbox] == [
+            ['async@yamdb.fake']
+        ], (
+            'Проверьте, что письмо с кодом подтверждения отправляется '
+            'фоновым потоком после регистрации.'
+        )
+
+    def test_04_failed_connection_marks_batch_once(self, settings):
+        from users.models import OutboxEmail
+        from users.outbox import send_pending_emails
+        settings.EMAIL_BACKEND = 'tests.test_13_email_outbox.ClosedBackend'
+        for i in range(3):
+            OutboxEmail.objects.create(
+                subject='Тема', message='Текст', from_email='a@yamdb.fake',
+                recipient=f'user{i}@yamdb.fake'
+            )
+
+        assert send_pending_emails() == 0
+        attempts = OutboxEmail.objects.values_list('attempts', flat=True)
+        assert list(attempts) == [1, 1, 1], (
+            'Проверьте, что при ошибке соединения каждая попытка письма '
+            'учитывается один раз.'
+        )
+        assert not OutboxEmail.objects.filter(sent_at__isnull=False).exists()
+
+    def test_05_send_emails_purges_old_sent(self, settings):
+        from django.utils import timezone
+        from users.models import OutboxEmail
+        settings.EMAIL_QUEUE_SENT_RETENTION = 60
+        now = timezone.now()
+        for recipient, sent_at in (
+            ('old@yamdb.fake', now - timedelta(seconds=120)),
+            ('new@yamdb.fake', now),
+            ('queued@yamdb.fake', None),
+        ):
+            OutboxEmail.objects.create(
+                subject='Тема', message='Текст', from_email='a@yamdb.fake',
+                recipient=recipient, sent_at=sent_at,
+                next_attempt_at=now + timedelta(hours=1)
+            )
+
+        call_command('send_emails', stdout=io.StringIO())
+        assert sorted(
+            OutboxEmail.objects.values_list('recipient', flat=True)
+        ) == ['new@yamdb.fake', 'queued@yamdb.fake'], (
+            'Проверьте, что send_emails удаляет только письма, '
+            'отправленные раньше `EMAIL_QUEUE_SENT_RETENTION`.'
+        )
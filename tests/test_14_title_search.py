@@ -0,0 +1,84 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture(params=['fts', 'index'])
+    def search_backend(self, request, monkeypatch):
+        from reviews import search
+        if request.param == 'index':
+            monkeypatch.setitem(search._fts_enabled, 'default', False)
+        return request.param
+
+    def create_titles(self):
+        from reviews.models import Title
+        Title.objects.create(
+            name='Крестный отец', year=1972,
+            description='Сага о семье Корлеоне.'
+        )
+        Title.objects.create(
+            name='Отец солдата', year=1964,
+            description='Военная драма.'
+        )
+        Title.objects.create(
+            name='Побег из Шоушенка', year=1994,
+            description='Отец Андрея не упоминается.'
+        )
+        Title.objects.create(name='Звёздные войны', year=1977)
+
+    def search(self, client, query):
+        response = client.get(self.TITLES_URL, {'search': query})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_ranked_search(self, client, search_backend):
+        self.create_titles()
+        names = self.search(client, 'отец')
+        assert set(names) == {
+            'Крестный отец', 'Отец солдата', 'Побег из Шоушенка'
+        }, (
+            'Проверьте, что параметр `search` ищет произведения по названию '
+            'и описанию.'
+        )
+        assert names[-1] == 'Побег из Шоушенка', (
+            'Проверьте, что совпадения в названии ранжируются выше '
+            'совпадений в описании.'
+        )
+
+    def test_02_prefix_and_all_words(self, client, search_backend):
+        self.create_titles()
+        assert self.search(client, 'звёзд') == ['Звёздные войны'], (
+            'Проверьте, что поиск находит произведения по началу слова.'
+        )
+        assert self.search(client, 'отец корлеоне') == ['Крестный отец']
+        assert self.search(client, '!!!') == []
+
+    def test_03_search_follows_updates(self, client, search_backend):
+        from reviews.models import Title
+        self.create_titles()
+        title = Title.objects.get(name='Звёздные войны')
+        title.name = 'Империя наносит ответный удар'
+        title.save()
+        assert self.search(client, 'звёзд') == []
+        assert self.search(client, 'империя') == [title.name]
+        title.delete()
+        assert self.search(client, 'империя') == []
+
+    def test_04_imported_titles(self, client, search_backend, tmp_path):
+        from django.core.management import call_command
+        (tmp_path / 'titles.csv').write_text(
+            'id,name,year,description\n'
+            '1,Крестный отец,1972,Сага о семье Корлеоне.\n'
+            '2,Звёздные войны,1977,\n',
+            encoding='utf-8'
+        )
+        call_command('import_csv', path=str(tmp_path), verbosity=0)
+        assert self.search(client, 'корлеоне') == ['Крестный отец'], (
+            'Проверьте, что произведения, загруженные командой import_csv, '
+            'находит поиск.'
+        )
@@ -0,0 +1,69 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15SlugFilters:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def catalogue(self):
+        from reviews.models import Category, Genre, Title
+        movie = Category.objects.create(name='Фильм', slug='movie')
+        book = Category.objects.create(name='Книга', slug='book')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        melodrama = Genre.objects.create(name='Мелодрама', slug='melodrama')
+        titles = {
+            'Драма-фильм': (movie, [drama]),
+            'Комедия-фильм': (movie, [comedy]),
+            'Драмеди-книга': (book, [drama, comedy]),
+            'Мелодрама-фильм': (movie, [melodrama]),
+        }
+        for name, (category, genres) in titles.items():
+            title = Title.objects.create(
+                name=name, year=2000, category=category
+            )
+            title.genre.set(genres)
+
+    def get_names(self, client, query):
+        response = client.get(f'{self.TITLES_URL}?{query}')
+        assert response.status_code == HTTPStatus.OK
+        return {title['name'] for title in response.json()['results']}
+
+    def test_01_exact_slug(self, client, catalogue):
+        assert self.get_names(client, 'genre=drama') == {
+            'Драма-фильм', 'Драмеди-книга'
+        }, (
+            'Проверьте, что фильтр `genre` сравнивает слаг жанра точно, а не '
+            'по вхождению подстроки.'
+        )
+        assert self.get_names(client, 'genre=dram') == set()
+
+    def test_02_multiple_slugs(self, client, catalogue):
+        assert self.get_names(client, 'genre=drama,comedy&category=movie') == {
+            'Драма-фильм', 'Комедия-фильм'
+        }, (
+            'Проверьте, что фильтры `genre` и `category` принимают несколько '
+            'слагов через запятую.'
+        )
+        assert self.get_names(client, 'category=movie,book') == {
+            'Драма-фильм', 'Комедия-фильм', 'Драмеди-книга',
+            'Мелодрама-фильм'
+        }
+
+    def test_03_substring_opt_in(self, client, catalogue):
+        assert self.get_names(client, 'genre__icontains=drama') == {
+            'Драма-фильм', 'Драмеди-книга', 'Мелодрама-фильм'
+        }
+        assert self.get_names(client, 'category__icontains=mov') == {
+            'Драма-фильм', 'Комедия-фильм', 'Мелодрама-фильм'
+        }
+
+    def test_04_slugs_resolved_once(self, client, catalogue,
+                                    django_assert_num_queries):
+        # Жанры по слагам, COUNT(*), страница, жанры страницы.
+        with django_assert_num_queries(4):
+            client.get(f'{self.TITLES_URL}?genre=drama,comedy,melodrama')
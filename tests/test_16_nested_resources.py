@@ -0,0 +1,82 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_review, create_titles
+
+
+def count_selects(context, table):
+    return sum(
+        query['sql'].startswith('SELECT')
+        and f'FROM "{table}"' in query['sql']
+        for query in context.captured_queries
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16NestedResources:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def test_01_list_does_not_load_parent(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            admin_client, titles[0]['id'], 'Отзыв', 5
+        ).json()
+
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert count_selects(context, 'reviews_title') == 0, (
+            'Проверьте, что непустой список отзывов фильтруется по '
+            '`title_id` без загрузки произведения.'
+        )
+
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=review['id']
+        )
+        admin_client.post(url, data={'text': 'Комментарий'})
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()['results']) == 1
+        assert count_selects(context, 'reviews_review') == 0
+
+    def test_02_empty_page_checks_parent(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        assert client.get(url).status_code == HTTPStatus.OK
+
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=999)
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что список отзывов несуществующего произведения '
+            'возвращает ответ со статусом 404.'
+        )
+
+        review = create_single_review(
+            admin_client, titles[0]['id'], 'Отзыв', 5
+        ).json()
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[1]['id'], review_id=review['id']
+        )
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что список комментариев отзыва, запрошенный через '
+            'чужое произведение, возвращает ответ со статусом 404.'
+        )
+
+    def test_03_create_loads_parent_once(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(url, data={'text': 'Да', 'score': 7})
+        assert response.status_code == HTTPStatus.CREATED
+        assert count_selects(context, 'reviews_title') == 1, (
+            'Проверьте, что при создании отзыва произведение загружается '
+            'из базы данных один раз.'
+        )
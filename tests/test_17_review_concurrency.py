@@ -0,0 +1,71 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from threading import Barrier
+
+import pytest
+from django.db import IntegrityError, connection
+from rest_framework.test import APIClient
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17ReviewConcurrency:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    PARALLEL_REQUESTS = 8
+
+    def test_01_parallel_duplicate_reviews(self, admin_client, token_user):
+        from reviews.models import Review, Title
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        barrier = Barrier(self.PARALLEL_REQUESTS)
+
+        def post_review(number):
+            client = APIClient()
+            client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {token_user["access"]}'
+            )
+            try:
+                barrier.wait()
+                return client.post(
+                    url, data={'text': f'Отзыв {number}', 'score': 5}
+                ).status_code
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(self.PARALLEL_REQUESTS) as executor:
+            statuses = Counter(executor.map(
+                post_review, range(self.PARALLEL_REQUESTS)
+            ))
+
+        assert statuses == {
+            HTTPStatus.CREATED: 1,
+            HTTPStatus.BAD_REQUEST: self.PARALLEL_REQUESTS - 1,
+        }, (
+            'Проверьте, что из одновременных попыток пользователя оставить '
+            'отзыв на одно произведение успешна ровно одна, а остальные '
+            f'получают ответ 400. Получено: {dict(statuses)}'
+        )
+        assert Review.objects.filter(title_id=titles[0]['id']).count() == 1
+        assert Title.objects.get(pk=titles[0]['id']).review_count == 1
+
+    def test_02_other_integrity_errors_not_masked(self, admin_client,
+                                                  user_client, monkeypatch):
+        from reviews.models import Review
+        titles, _, _ = create_titles(admin_client)
+
+        def failing(self, *args, **kwargs):
+            raise IntegrityError('NOT NULL constraint failed')
+
+        monkeypatch.setattr(Review, 'save', failing)
+        with pytest.raises(IntegrityError):
+            user_client.post(
+                self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id']),
+                data={'text': 'Отзыв', 'score': 5}
+            )
+        assert not Review.objects.exists(), (
+            'Проверьте, что ошибка БД, не связанная с повторным отзывом, '
+            'не превращается в ответ 400.'
+        )
@@ -0,0 +1,133 @@
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18ConditionalGet:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    GENRES_URL = '/api/v1/genres/'
+    CATEGORIES_URL = '/api/v1/categories/'
+
+    def test_01_not_modified_without_queries(self, client, admin_client):
+        create_titles(admin_client)
+        for url in (self.TITLES_URL, self.GENRES_URL, self.CATEGORIES_URL):
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert response.has_header('ETag'), (
+                f'Проверьте, что ответ на GET-запрос к `{url}` '
+                'содержит заголовок `ETag`.'
+            )
+            assert response.has_header('Last-Modified')
+
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag']
+                )
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{url}` с актуальным '
+                '`If-None-Match` возвращает ответ со статусом 304.'
+            )
+            assert not context.captured_queries, (
+                'Проверьте, что ответ 304 возвращается без запросов к БД.'
+            )
+
+    def test_02_if_modified_since(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get(self.GENRES_URL)
+        response = client.get(
+            self.GENRES_URL,
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_03_etag_depends_on_query(self, client, admin_client):
+        create_titles(admin_client)
+        etag = client.get(self.TITLES_URL)['ETag']
+        response = client.get(
+            self.TITLES_URL, {'year': 1990}, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что ETag списка зависит от параметров запроса.'
+        )
+
+    def test_04_changes_update_etag(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        detail_url = self.TITLE_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        list_etag = client.get(self.TITLES_URL)['ETag']
+        detail_etag = client.get(detail_url)['ETag']
+
+        create_single_review(admin_client, titles[0]['id'], 'Отзыв', 5)
+        response = client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый отзыв меняет ETag произведения.'
+        )
+        assert response.json()['rating'] == 5
+        response = client.get(self.TITLES_URL, HTTP_IF_NONE_MATCH=list_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый отзыв меняет ETag списка произведений.'
+        )
+
+        detail_etag = client.get(detail_url)['ETag']
+        admin_client.patch(detail_url, data={'genre': [genres[1]['slug']]})
+        response = client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение жанров меняет ETag произведения.'
+        )
+
+        etag = client.get(self.CATEGORIES_URL)['ETag']
+        admin_client.delete(f'{self.CATEGORIES_URL}{categories[1]["slug"]}/')
+        response = client.get(self.CATEGORIES_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что удаление категории меняет ETag списка категорий.'
+        )
+
+    def test_05_other_title_etag_unchanged(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        detail_url = self.TITLE_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[1]['id']
+        )
+        etag = client.get(detail_url)['ETag']
+        create_single_review(admin_client, titles[0]['id'], 'Отзыв', 5)
+        response = client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что отзыв на одно произведение не меняет ETag '
+            'другого.'
+        )
+
+    def test_06_uncommitted_changes(self, client, admin_client):
+        from reviews.models import Genre
+        create_titles(admin_client)
+
+        def get_genres(**headers):
+            try:
+                return client.get(self.GENRES_URL, **headers)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(1) as executor:
+            with transaction.atomic():
+                Genre.objects.create(name='Новый жанр', slug='new')
+                stale = executor.submit(get_genres).result()
+            response = executor.submit(
+                get_genres, HTTP_IF_NONE_MATCH=stale['ETag']
+            ).result()
+        assert 'new' not in {
+            genre['slug'] for genre in stale.json()['results']
+        }
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что версии данных увеличиваются после фиксации '
+            'транзакции, а не до неё.'
+        )
+        assert 'new' in {
+            genre['slug'] for genre in response.json()['results']
+        }
@@ -0,0 +1,101 @@
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19ResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    GENRES_URL = '/api/v1/genres/'
+    STATS_URL = '/api/v1/cache-stats/'
+
+    def test_01_anonymous_hit(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get(self.TITLES_URL, {'year': 1984, 'limit': 10})
+        assert response.status_code == HTTPStatus.OK
+        assert response['X-Cache'] == 'MISS'
+
+        with CaptureQueriesContext(connection) as context:
+            cached = client.get(
+                self.TITLES_URL, {'limit': 10, 'year': 1984, 'search': ''}
+            )
+        assert cached.status_code == HTTPStatus.OK
+        assert cached['X-Cache'] == 'HIT', (
+            'Проверьте, что повторный анонимный запрос с теми же '
+            'параметрами в другом порядке берётся из кеша.'
+        )
+        assert not context.captured_queries, (
+            'Проверьте, что ответ из кеша отдаётся без запросов к БД.'
+        )
+        assert cached.json() == response.json()
+        assert cached['ETag'] == response['ETag']
+
+    def test_02_authenticated_not_cached(self, client, user_client):
+        client.get(self.GENRES_URL)
+        response = user_client.get(self.GENRES_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert not response.has_header('X-Cache'), (
+            'Проверьте, что ответы авторизованным пользователям '
+            'не кешируются.'
+        )
+
+    def test_03_invalidated_by_changes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        assert client.get(url).json()['rating'] is None
+        assert client.get(url)['X-Cache'] == 'HIT'
+
+        create_single_review(admin_client, titles[0]['id'], 'Отзыв', 7)
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что изменение данных сбрасывает кеш ответа.'
+        )
+        assert response.json()['rating'] == 7
+
+    def test_04_uncommitted_changes_not_cached(self, client, admin_client,
+                                               user):
+        from reviews.models import Review
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+
+        def get_title():
+            try:
+                return client.get(url)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(1) as executor:
+            with transaction.atomic():
+                Review.objects.create(
+                    title_id=titles[0]['id'], author=user,
+                    text='Отзыв', score=7
+                )
+                assert executor.submit(get_title).result().json()[
+                    'rating'
+                ] is None
+            response = executor.submit(get_title).result()
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что ответ, прочитанный до фиксации транзакции, '
+            'не попадает в кеш под новой версией данных.'
+        )
+        assert response.json()['rating'] == 7
+
+    def test_05_stats(self, client, admin_client, user_client):
+        client.get(self.GENRES_URL)
+        client.get(self.GENRES_URL)
+        client.get(self.GENRES_URL)
+        assert user_client.get(self.STATS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        response = admin_client.get(self.STATS_URL)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['hits'] == 2
+        assert data['misses'] == 1
+        assert data['hit_rate'] == pytest.approx(2 / 3, abs=1e-3)
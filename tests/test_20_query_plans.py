@@ -0,0 +1,78 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+
+def get_main_query(context, table):
+    """Первый SELECT к основной таблице списка с сортировкой."""
+    for query in context.captured_queries:
+        sql = query['sql']
+        if (sql.startswith('SELECT') and f'FROM "{table}"' in sql
+                and 'ORDER BY' in sql):
+            return sql
+    raise AssertionError(f'Не найден запрос к таблице `{table}`.')
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20QueryPlans:
+
+    @pytest.fixture
+    def urls(self, admin_client):
+        titles, categories, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(
+            admin_client, title_id, 'Отзыв', 5
+        ).json()
+        create_single_comment(admin_client, title_id, review['id'], 'Ответ')
+        return [
+            (
+                '/api/v1/titles/', 'reviews_title',
+                'title_name_year_idx', True
+            ),
+            (
+                f'/api/v1/titles/?category={categories[0]["slug"]}'
+                '&year=1984',
+                'reviews_title', 'title_category_year_idx', False
+            ),
+            (
+                f'/api/v1/titles/{title_id}/reviews/',
+                'reviews_review', 'review_title_date_idx', True
+            ),
+            (
+                f'/api/v1/titles/{title_id}/reviews/{review["id"]}/comments/',
+                'reviews_comment', 'comment_review_date_idx', True
+            ),
+        ]
+
+    def test_01_list_queries_use_indexes(self, client, urls):
+        for url, table, index, sorted_by_index in urls:
+            with CaptureQueriesContext(connection) as context:
+                client.get(url)
+            plan = explain(get_main_query(context, table))
+            table_steps = [step for step in plan if f' {table} ' in step + ' ']
+            assert table_steps, plan
+            assert all(
+                step.startswith('SEARCH') or 'USING' in step
+                for step in table_steps
+            ), (
+                f'Проверьте, что основной запрос `{url}` не сканирует '
+                f'таблицу `{table}` целиком: {plan}'
+            )
+            assert any(index in step for step in table_steps), (
+                f'Проверьте, что основной запрос `{url}` использует '
+                f'индекс `{index}`: {plan}'
+            )
+            assert not sorted_by_index or not any(
+                'TEMP B-TREE' in step for step in plan
+            ), (
+                f'Проверьте, что сортировка `{url}` идёт по индексу: {plan}'
+            )
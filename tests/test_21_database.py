@@ -0,0 +1,35 @@
+import pytest
+from django.db import connection
+
+from api.database import close_unusable_connections
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Database:
+
+    def test_01_sqlite_pragmas(self):
+        connection.close()
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            assert cursor.fetchone()[0] == 'wal', (
+                'Проверьте, что соединение с SQLite работает в режиме WAL.'
+            )
+            cursor.execute('PRAGMA synchronous')
+            assert cursor.fetchone()[0] == 1, (
+                'Проверьте, что для SQLite задано `synchronous=NORMAL`.'
+            )
+            cursor.execute('PRAGMA busy_timeout')
+            assert cursor.fetchone()[0] > 0
+
+    def test_02_health_check_closes_broken_connection(self, monkeypatch):
+        connection.ensure_connection()
+        monkeypatch.setattr(connection, 'is_usable', lambda: False)
+        close_unusable_connections()
+        assert connection.connection is None, (
+            'Проверьте, что перед запросом неработающее соединение '
+            'закрывается.'
+        )
+        monkeypatch.undo()
+        connection.ensure_connection()
+        close_unusable_connections()
+        assert connection.connection is not None
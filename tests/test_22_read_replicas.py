@@ -0,0 +1,111 @@
+import sqlite3
+from http import HTTPStatus
+
+import pytest
+from django.db import connection, connections
+
+from tests.utils import create_single_review, create_titles
+
+REPLICA = 'replica_0'
+
+
+@pytest.fixture
+def replica(tmp_path, settings):
+    """Вторая база SQLite — копия основной без дальнейшей репликации."""
+    path = tmp_path / 'replica.sqlite3'
+    connections.databases[REPLICA] = {
+        **connections.databases['default'], 'NAME': str(path)
+    }
+    settings.REPLICA_DATABASES = [REPLICA]
+
+    def sync():
+        source = sqlite3.connect(connection.settings_dict['NAME'])
+        target = sqlite3.connect(path)
+        source.backup(target)
+        source.close()
+        target.close()
+
+    yield sync
+    connections[REPLICA].close()
+    del connections[REPLICA]
+    del connections.databases[REPLICA]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22ReadReplicas:
+
+    TITLE_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_reads_go_to_replica(self, client, admin_client, replica):
+        titles, _, _ = create_titles(admin_client)
+        replica()
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Отзыв', 5)
+
+        url = self.TITLE_URL_TEMPLATE.format(title_id=title_id)
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['rating'] is None, (
+            'Проверьте, что GET-запросы читают данные с реплики.'
+        )
+        assert not response.has_header('ETag'), (
+            'Проверьте, что ответ с реплики вскоре после изменения данных '
+            'не получает ETag.'
+        )
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.json()['results'] == []
+
+        replica()
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert len(response.json()['results']) == 1
+
+    def test_02_read_after_write_sticks_to_primary(self, admin_client,
+                                                   user_client, replica):
+        titles, _, _ = create_titles(admin_client)
+        replica()
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Отзыв', 7)
+
+        url = self.TITLE_URL_TEMPLATE.format(title_id=title_id)
+        assert user_client.get(url).json()['rating'] == 7, (
+            'Проверьте, что после записи клиент читает из основной базы.'
+        )
+        reviews = user_client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        ).json()['results']
+        assert len(reviews) == 1
+
+    def test_03_stickiness_window(self, admin_client, user_client, replica,
+                                  settings):
+        settings.DB_REPLICA_STICKINESS = 0
+        titles, _, _ = create_titles(admin_client)
+        replica()
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Отзыв', 7)
+
+        url = self.TITLE_URL_TEMPLATE.format(title_id=title_id)
+        assert user_client.get(url).json()['rating'] is None, (
+            'Проверьте, что по истечении окна `DB_REPLICA_STICKINESS` '
+            'клиент снова читает с реплики.'
+        )
+
+    def test_04_pin_cache_alias(self, admin_client, user_client, replica,
+                                settings):
+        from django.core.cache import caches
+        settings.DB_REPLICA_PIN_CACHE_ALIAS = 'responses'
+        titles, _, _ = create_titles(admin_client)
+        replica()
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Отзыв', 7)
+        caches['default'].clear()
+
+        url = self.TITLE_URL_TEMPLATE.format(title_id=title_id)
+        assert user_client.get(url).json()['rating'] == 7, (
+            'Проверьте, что отметка о записи хранится в кеше '
+            '`DB_REPLICA_PIN_CACHE_ALIAS`.'
+        )
@@ -0,0 +1,96 @@
+import json
+import logging
+from http import HTTPStatus
+
+import pytest
+
+from api import metrics
+from api.metrics import histogram
+from tests.utils import create_titles
+
+
+@pytest.fixture
+def metrics_enabled(settings):
+    settings.REQUEST_METRICS_ENABLED = True
+    histogram.reset()
+    yield
+    histogram.reset()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23RequestMetrics:
+
+    TITLES_URL = '/api/v1/titles/'
+    METRICS_URL = '/api/v1/metrics/'
+
+    def test_01_disabled_by_default(self, user_client):
+        response = user_client.get(self.TITLES_URL)
+        assert not response.has_header('Server-Timing'), (
+            'Проверьте, что без `REQUEST_METRICS_ENABLED` метрики '
+            'не собираются.'
+        )
+
+    def test_02_server_timing_and_log(self, admin_client, metrics_enabled,
+                                      caplog):
+        create_titles(admin_client)
+        logger = logging.getLogger('api.metrics')
+        logger.addHandler(caplog.handler)
+        try:
+            response = admin_client.get(self.TITLES_URL)
+        finally:
+            logger.removeHandler(caplog.handler)
+        assert response.status_code == HTTPStatus.OK
+        timing = response['Server-Timing']
+        assert 'db;desc="3 queries"' in timing, (
+            'Проверьте, что `Server-Timing` содержит число SQL-запросов.'
+        )
+        assert 'serialize;dur=' in timing
+        assert 'total;dur=' in timing
+
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record['endpoint'] == 'TitleViewSet.list', (
+            'Проверьте, что в лог пишется вьюсет и действие запроса.'
+        )
+        assert record['queries'] == 3
+        assert record['status'] == HTTPStatus.OK
+        assert record['total_ms'] >= record['sql_ms']
+
+    def test_03_histogram_endpoint(self, admin_client, user_client,
+                                   metrics_enabled):
+        create_titles(admin_client)
+        user_client.get(self.TITLES_URL)
+        user_client.get(self.TITLES_URL)
+        assert user_client.get(self.METRICS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        data = admin_client.get(self.METRICS_URL).json()
+        assert data['enabled'] is True
+        stats = data['endpoints']['TitleViewSet.list']
+        assert stats['count'] == 2, (
+            'Проверьте, что гистограмма учитывает каждый запрос.'
+        )
+        assert sum(stats['buckets_ms'].values()) == 2
+        assert stats['mean_queries'] >= 3
+        assert 'TitleViewSet.create' in data['endpoints']
+
+    @pytest.mark.parametrize('enabled, expected', ((False, 0), (True, 1)))
+    def test_04_serialization_measured_once(self, admin_client, settings,
+                                            monkeypatch, enabled, expected):
+        settings.REQUEST_METRICS_ENABLED = enabled
+        create_titles(admin_client)
+        calls = []
+        measure = metrics.measure
+
+        def counting(name):
+            calls.append(name)
+            return measure(name)
+
+        monkeypatch.setattr(metrics, 'measure', counting)
+        response = admin_client.get(self.TITLES_URL)
+        histogram.reset()
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()['results']) > 1
+        assert calls == ['serialize'] * expected, (
+            'Проверьте, что сериализация ответа замеряется один раз '
+            'и не замеряется без `REQUEST_METRICS_ENABLED`.'
+        )
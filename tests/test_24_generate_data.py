@@ -0,0 +1,69 @@
+import pytest
+from django.core.management import CommandError, call_command
+from django.db.models import Count
+
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title, User)
+
+OPTIONS = {
+    'users': 30, 'titles': 40, 'reviews': 300, 'comments': 200,
+    'genres': 5, 'categories': 3, 'chunk_size': 25, 'seed': 7,
+}
+
+
+def get_snapshot():
+    return (
+        sorted(Review.objects.values_list('title_id', 'author_id', 'score')),
+        sorted(Comment.objects.values_list('pk', 'review_id', 'author_id')),
+        sorted(GenreTitle.objects.values_list('pk', 'title_id', 'genre_id')),
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24GenerateData:
+
+    def test_01_counts_and_skew(self):
+        call_command('generate_data', workers=3, verbosity=0, **OPTIONS)
+        assert User.objects.count() == OPTIONS['users']
+        assert Title.objects.count() == OPTIONS['titles']
+        assert Review.objects.count() == OPTIONS['reviews']
+        assert Comment.objects.count() == OPTIONS['comments']
+
+        counts = sorted(
+            Title.objects.annotate(total=Count('reviews'))
+            .values_list('total', flat=True),
+            reverse=True
+        )
+        assert counts[0] > 5 * counts[len(counts) // 2], (
+            'Проверьте, что число отзывов на произведение распределено '
+            'неравномерно (по закону Ципфа).'
+        )
+        assert counts[0] <= OPTIONS['users']
+        title = Title.objects.order_by('-review_count').first()
+        assert title.review_count == counts[0], (
+            'Проверьте, что после генерации пересчитываются рейтинги.'
+        )
+        assert title.rating is not None
+
+    def test_02_deterministic_across_workers(self):
+        call_command('generate_data', workers=1, verbosity=0, **OPTIONS)
+        snapshot = get_snapshot()
+        for model in (Comment, Review, GenreTitle, Title, User, Genre,
+                      Category):
+            model.objects.all().delete()
+        call_command('generate_data', workers=4, verbosity=0, **OPTIONS)
+        assert get_snapshot() == snapshot, (
+            'Проверьте, что при одинаковом `--seed` данные не зависят '
+            'от числа потоков.'
+        )
+
+    def test_03_unreachable_review_count_rejected(self):
+        options = {
+            **OPTIONS, 'reviews': OPTIONS['titles'] * OPTIONS['users'] + 1
+        }
+        with pytest.raises(CommandError):
+            call_command('generate_data', workers=1, verbosity=0, **options)
+        assert not Review.objects.exists(), (
+            'Проверьте, что отзывов не больше, чем пар '
+            'произведение-пользователь, и лишние не отбрасываются молча.'
+        )
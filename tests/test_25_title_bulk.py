@@ -0,0 +1,194 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_categories, create_genre, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25TitleBulk:
+
+    BULK_URL = '/api/v1/titles/bulk/'
+    TITLES_URL = '/api/v1/titles/'
+
+    def send(self, client, method, items):
+        return getattr(client, method)(
+            self.BULK_URL, data=json.dumps(items),
+            content_type='application/json'
+        )
+
+    def make_items(self, count, genres=('horror', 'drama')):
+        return [
+            {
+                'name': f'Произведение {number}',
+                'year': 1900 + number,
+                'genre': list(genres),
+                'category': 'films',
+                'description': f'Описание {number}',
+            }
+            for number in range(count)
+        ]
+
+    @pytest.fixture
+    def catalogue(self, admin_client):
+        create_genre(admin_client)
+        create_categories(admin_client)
+
+    def test_01_create(self, admin_client, catalogue):
+        from reviews.models import GenreTitle, Title
+        response = self.send(admin_client, 'post', self.make_items(50))
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что POST-запрос администратора к '
+            '`/api/v1/titles/bulk/` возвращает статус 201.'
+        )
+        data = response.json()
+        assert len(data) == 50
+        assert [title['name'] for title in data] == [
+            f'Произведение {number}' for number in range(50)
+        ], 'Проверьте, что произведения возвращаются в порядке запроса.'
+        assert {genre['slug'] for genre in data[0]['genre']} == {
+            'horror', 'drama'
+        }
+        assert data[0]['category']['slug'] == 'films'
+        assert Title.objects.count() == 50
+        assert GenreTitle.objects.count() == 100
+        ids = {title['id'] for title in data}
+        assert set(Title.objects.values_list('id', flat=True)) == ids
+
+    def test_02_queries_do_not_grow(self, admin_client, catalogue):
+        self.send(admin_client, 'post', self.make_items(1))
+        with CaptureQueriesContext(connection) as small:
+            self.send(admin_client, 'post', self.make_items(5))
+        with CaptureQueriesContext(connection) as large:
+            self.send(admin_client, 'post', self.make_items(100))
+
+        def count(context, inserts):
+            return sum(
+                query['sql'].startswith('INSERT') == inserts
+                for query in context.captured_queries
+            )
+
+        assert count(large, False) == count(small, False), (
+            'Проверьте, что число запросов к БД не зависит от размера '
+            'пачки: слаги разрешаются одним запросом на пачку.'
+        )
+        assert count(large, True) <= 4, (
+            'Проверьте, что произведения и жанры создаются через '
+            'bulk_create.'
+        )
+
+    def test_03_item_errors(self, admin_client, catalogue):
+        from reviews.models import Title
+        items = self.make_items(4)
+        items[1]['genre'] = ['horror', 'unknown']
+        items[3]['year'] = 'не год'
+        items[3]['category'] = 'unknown'
+        response = self.send(admin_client, 'post', items)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()['errors']
+        assert [error['index'] for error in errors] == [1, 3], (
+            'Проверьте, что ошибки возвращаются с номерами элементов.'
+        )
+        assert 'genre' in errors[0]['errors']
+        assert {'year', 'category'} <= set(errors[1]['errors'])
+        assert not Title.objects.exists(), (
+            'Проверьте, что при ошибке в любом элементе пачка '
+            'не записывается.'
+        )
+
+    def test_04_limits(self, admin_client, catalogue, settings):
+        settings.TITLE_BULK_MAX_ITEMS = 3
+        response = self.send(admin_client, 'post', self.make_items(4))
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = self.send(admin_client, 'post', [])
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = self.send(admin_client, 'post', {'name': 'Не массив'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_05_update(self, admin_client):
+        from reviews.models import Title
+        titles, _, _ = create_titles(admin_client)
+        response = self.send(admin_client, 'patch', [
+            {'id': titles[0]['id'], 'year': 1991},
+            {'id': titles[1]['id'], 'genre': ['comedy'], 'name': 'Орешек'},
+        ])
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что PATCH-запрос администратора к '
+            '`/api/v1/titles/bulk/` возвращает статус 200.'
+        )
+        first = Title.objects.get(pk=titles[0]['id'])
+        second = Title.objects.get(pk=titles[1]['id'])
+        assert first.year == 1991
+        assert first.name == titles[0]['name']
+        assert set(first.genre.values_list('slug', flat=True)) == set(
+            titles[0]['genre']
+        ), 'Проверьте, что жанры не меняются, если их нет в элементе.'
+        assert second.name == 'Орешек'
+        assert list(second.genre.values_list('slug', flat=True)) == [
+            'comedy'
+        ], 'Проверьте, что переданные жанры заменяют прежние.'
+
+        detail = admin_client.get(f'{self.TITLES_URL}{titles[0]["id"]}/')
+        assert detail.json()['year'] == 1991, (
+            'Проверьте, что массовое изменение сбрасывает кеш ответов.'
+        )
+
+    def test_06_update_errors(self, admin_client):
+        from reviews.models import Title
+        titles, _, _ = create_titles(admin_client)
+        response = self.send(admin_client, 'patch', [
+            {'id': titles[0]['id'], 'year': 1991},
+            {'year': 1992},
+            {'id': 100500, 'year': 1993},
+        ])
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()['errors']
+        assert [error['index'] for error in errors] == [1, 2]
+        assert all('id' in error['errors'] for error in errors)
+        assert Title.objects.get(pk=titles[0]['id']).year == 1984
+
+    def test_07_delete(self, admin_client):
+        from reviews.models import Title
+        titles, _, _ = create_titles(admin_client)
+        response = self.send(admin_client, 'delete', [
+            {'id': titles[0]['id']}, {'id': 100500}
+        ])
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json()['errors'][0]['index'] == 1
+        assert Title.objects.count() == 2
+
+        response = self.send(admin_client, 'delete', [
+            {'id': title['id']} for title in titles
+        ])
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {'deleted': 2}
+        assert not Title.objects.exists()
+
+    def test_08_permissions(self, client, user_client, moderator_client):
+        items = self.make_items(1)
+        assert (
+            self.send(client, 'post', items).status_code
+            == HTTPStatus.UNAUTHORIZED
+        )
+        for role_client in (user_client, moderator_client):
+            for method in ('post', 'patch', 'delete'):
+                response = self.send(role_client, method, items)
+                assert response.status_code == HTTPStatus.FORBIDDEN, (
+                    'Проверьте, что массовые операции доступны только '
+                    'администратору.'
+                )
+
+    @pytest.mark.parametrize('backend', ['fts', 'index'])
+    def test_09_search(self, backend, client, admin_client, catalogue,
+                       monkeypatch):
+        from reviews import search
+        if backend == 'index':
+            monkeypatch.setitem(search._fts_enabled, 'default', False)
+        self.send(admin_client, 'post', self.make_items(3))
+        response = client.get(self.TITLES_URL, {'search': 'описание 2'})
+        assert [title['name'] for title in response.json()['results']] == [
+            'Произведение 2'
+        ], 'Проверьте, что созданные пачкой произведения находит поиск.'
@@ -0,0 +1,126 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26Moderation:
+
+    REVIEWS_URL = '/api/v1/moderation/reviews/'
+    COMMENTS_URL = '/api/v1/moderation/comments/'
+
+    @pytest.fixture
+    def spam(self, user, moderator):
+        from reviews.models import Comment, Review, Title
+        titles = [
+            Title.objects.create(name=f'Произведение {number}', year=2000)
+            for number in range(30)
+        ]
+        for title in titles:
+            good = Review.objects.create(
+                title=title, author=moderator, text='Хороший отзыв', score=8
+            )
+            spam = Review.objects.create(
+                title=title, author=user, text='Buy casino chips', score=1
+            )
+            Comment.objects.create(review=spam, author=user, text='Casino')
+            Comment.objects.create(
+                review=good, author=user, text='Visit our casino'
+            )
+            Comment.objects.create(
+                review=good, author=moderator, text='Согласен'
+            )
+        return titles
+
+    def test_01_delete_reviews_by_author(self, moderator_client, user, spam,
+                                         settings):
+        from reviews.models import Comment, Review, Title
+        settings.MODERATION_CHUNK_SIZE = 7
+        with CaptureQueriesContext(connection) as context:
+            response = moderator_client.post(
+                self.REVIEWS_URL, data={'author': user.username}
+            )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что POST-запрос модератора к '
+            '`/api/v1/moderation/reviews/` возвращает статус 200.'
+        )
+        assert response.json() == {'reviews': 30, 'comments': 30}
+        assert not Review.objects.filter(author=user).exists()
+        assert Comment.objects.count() == 60
+        assert set(Title.objects.values_list('rating', flat=True)) == {8}
+        assert set(
+            Title.objects.values_list('review_count', flat=True)
+        ) == {1}, 'Проверьте, что счётчики отзывов пересчитаны.'
+
+        rating_updates = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "reviews_title"')
+        ]
+        assert len(rating_updates) == 5, (
+            'Проверьте, что рейтинги пересчитываются одним запросом '
+            'на пачку удаления, а не после каждого отзыва.'
+        )
+
+    def test_02_delete_comments_by_text(self, moderator_client, spam):
+        from reviews.models import Comment
+        response = moderator_client.post(
+            self.COMMENTS_URL, data={'text': 'casino', 'title': spam[0].pk}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {'comments': 2}
+        assert Comment.objects.count() == 88
+
+        response = moderator_client.post(
+            self.COMMENTS_URL, data={'text': 'casino'}
+        )
+        assert response.json() == {'comments': 58}
+        assert set(Comment.objects.values_list('text', flat=True)) == {
+            'Согласен'
+        }
+
+    def test_03_delete_by_ids(self, admin_client, spam):
+        from reviews.models import Review
+        ids = list(Review.objects.filter(
+            title__in=spam[:3], score=1
+        ).values_list('pk', flat=True))
+        response = admin_client.post(
+            self.REVIEWS_URL, data={'ids': ids}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['reviews'] == 3
+        assert spam[0].reviews.count() == 1
+        spam[0].refresh_from_db()
+        assert spam[0].rating == 8
+
+    def test_04_dry_run(self, moderator_client, user, spam):
+        from reviews.models import Review
+        response = moderator_client.post(
+            self.REVIEWS_URL, data={'author': user.username, 'dry_run': True}
+        )
+        assert response.json() == {'reviews': 30, 'comments': 30}
+        assert Review.objects.count() == 60, (
+            'Проверьте, что при dry_run записи не удаляются.'
+        )
+
+    def test_05_criteria_required(self, moderator_client, spam):
+        from reviews.models import Review
+        for url in (self.REVIEWS_URL, self.COMMENTS_URL):
+            response = moderator_client.post(url, data={'dry_run': False})
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что без условий отбора ничего не удаляется.'
+            )
+        assert Review.objects.count() == 60
+
+    def test_06_permissions(self, client, user_client, user, spam):
+        data = {'author': user.username}
+        assert (
+            client.post(self.REVIEWS_URL, data=data).status_code
+            == HTTPStatus.UNAUTHORIZED
+        )
+        for url in (self.REVIEWS_URL, self.COMMENTS_URL):
+            assert (
+                user_client.post(url, data=data).status_code
+                == HTTPStatus.FORBIDDEN
+            ), 'Проверьте, что массовое удаление недоступно пользователю.'
@@ -0,0 +1,99 @@
+import csv
+import io
+import json
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title, User)
+
+MODELS = (Category, Genre, User, Title, GenreTitle, Review, Comment)
+
+
+def get_snapshot():
+    return {
+        model.__name__: sorted(
+            tuple(str(value) for value in row)
+            for row in model.objects.values_list(*(
+                field.attname for field in model._meta.concrete_fields
+                if field.attname not in ('password', 'last_login',
+                                         'date_joined')
+            ))
+        )
+        for model in MODELS
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27Export:
+
+    EXPORT_URL = '/api/v1/export/{}/'
+
+    @pytest.fixture
+    def dataset(self):
+        call_command(
+            'generate_data', users=10, titles=12, reviews=40, comments=30,
+            genres=4, categories=2, seed=3, workers=1, verbosity=0
+        )
+
+    def read(self, response):
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдаётся потоковым ответом.'
+        )
+        return b''.join(response.streaming_content).decode()
+
+    def test_01_titles_ndjson(self, admin_client, dataset, settings):
+        settings.EXPORT_CHUNK_SIZE = 5
+        response = admin_client.get(self.EXPORT_URL.format('titles'))
+        assert response['Content-Type'] == 'application/x-ndjson'
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        assert [row['id'] for row in rows] == list(
+            Title.objects.order_by('pk').values_list('pk', flat=True)
+        )
+        title = Title.objects.get(pk=rows[0]['id'])
+        assert rows[0]['category'] == title.category.slug
+        assert rows[0]['rating'] == title.rating
+        assert sorted(rows[0]['genre']) == sorted(
+            title.genre.values_list('slug', flat=True)
+        ), 'Проверьте, что у произведений выгружаются слаги жанров.'
+
+    def test_02_reviews_csv(self, admin_client, dataset):
+        response = admin_client.get(
+            self.EXPORT_URL.format('reviews'), {'output': 'csv'}
+        )
+        assert response['Content-Type'].startswith('text/csv')
+        assert 'review.csv' in response['Content-Disposition']
+        rows = list(csv.DictReader(io.StringIO(self.read(response))))
+        assert len(rows) == Review.objects.count()
+        assert set(rows[0]) == {
+            'id', 'title_id', 'text', 'author', 'score', 'pub_date'
+        }, 'Проверьте, что колонки CSV совпадают с форматом import_csv.'
+
+    def test_03_errors_and_permissions(self, admin_client, user_client,
+                                       moderator_client):
+        url = self.EXPORT_URL.format('titles')
+        assert admin_client.get(
+            self.EXPORT_URL.format('unknown')
+        ).status_code == HTTPStatus.NOT_FOUND
+        assert admin_client.get(
+            url, {'output': 'xml'}
+        ).status_code == HTTPStatus.BAD_REQUEST
+        for role_client in (user_client, moderator_client):
+            assert role_client.get(url).status_code == HTTPStatus.FORBIDDEN, (
+                'Проверьте, что выгрузка доступна только администратору.'
+            )
+
+    def test_04_csv_round_trip(self, dataset, tmp_path):
+        expected = get_snapshot()
+        call_command('export_data', path=str(tmp_path), chunk_size=7)
+        for model in reversed(MODELS):
+            model.objects.all().delete()
+
+        call_command('import_csv', path=str(tmp_path), verbosity=0)
+        assert get_snapshot() == expected, (
+            'Проверьте, что выгрузка в CSV загружается командой '
+            'import_csv без потерь.'
+        )
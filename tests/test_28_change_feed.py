@@ -0,0 +1,145 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.utils import timezone
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28ChangeFeed:
+
+    CHANGES_URL = '/api/v1/changes/'
+
+    def get_changes(self, client, since, **params):
+        response = client.get(self.CHANGES_URL, {'since': since, **params})
+        assert response.status_code == HTTPStatus.OK
+        return response.json()
+
+    def test_01_feed(self, admin_client):
+        head = admin_client.get(self.CHANGES_URL).json()
+        assert head['results'] == []
+        cursor = head['next']
+
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(admin_client, titles[0]['id'], 'Отзыв', 9)
+        feed = self.get_changes(admin_client, cursor)
+        changed = {(row['resource'], row['id']) for row in feed['results']}
+        assert ('titles', titles[0]['id']) in changed
+        assert any(row['resource'] == 'reviews' for row in feed['results'])
+        assert any(row['resource'] == 'genres' for row in feed['results'])
+        title = next(
+            row['data'] for row in reversed(feed['results'])
+            if row['resource'] == 'titles' and row['id'] == titles[0]['id']
+        )
+        assert title['rating'] == 9
+        assert sorted(title['genre']) == sorted(titles[0]['genre']), (
+            'Проверьте, что изменение содержит текущее состояние объекта.'
+        )
+
+        cursor = feed['next']
+        assert self.get_changes(admin_client, cursor)['results'] == [], (
+            'Проверьте, что после курсора возвращаются только новые '
+            'изменения.'
+        )
+        admin_client.delete(f'/api/v1/titles/{titles[1]["id"]}/')
+        results = self.get_changes(admin_client, cursor)['results']
+        assert results[-1] == {
+            'cursor': results[-1]['cursor'], 'resource': 'titles',
+            'id': titles[1]['id'], 'action': 'delete', 'data': None,
+        }
+
+    def test_02_batches(self, admin_client):
+        from reviews.models import Genre
+        cursor = admin_client.get(self.CHANGES_URL).json()['next']
+        for number in range(5):
+            Genre.objects.create(name=f'Жанр {number}', slug=f'g{number}')
+        seen = []
+        while True:
+            feed = self.get_changes(admin_client, cursor, limit=2)
+            seen += [row['data']['slug'] for row in feed['results']]
+            cursor = feed['next']
+            if not feed['has_more']:
+                break
+        assert seen == [f'g{number}' for number in range(5)]
+
+    def test_03_compaction_and_retention(self, admin_client):
+        from reviews.models import Change, Genre
+        cursor = admin_client.get(self.CHANGES_URL).json()['next']
+        genre = Genre.objects.create(name='Жанр', slug='genre')
+        for number in range(3):
+            genre.name = f'Жанр {number}'
+            genre.save()
+        call_command('compact_changes')
+        assert Change.objects.filter(
+            resource='genres', object_id=genre.pk
+        ).count() == 1, (
+            'Проверьте, что сжатие оставляет одну запись на объект.'
+        )
+        assert len(self.get_changes(admin_client, cursor)['results']) == 1
+
+        Change.objects.update(created=timezone.now() - timedelta(days=30))
+        call_command('compact_changes', retention_days=7)
+        response = admin_client.get(self.CHANGES_URL, {'since': cursor})
+        assert response.status_code == HTTPStatus.GONE, (
+            'Проверьте, что курсор старше срока хранения получает 410.'
+        )
+        head = admin_client.get(self.CHANGES_URL).json()['next']
+        assert self.get_changes(admin_client, head)['results'] == []
+
+    def test_04_bulk_load_resets_cursors(self, admin_client):
+        cursor = admin_client.get(self.CHANGES_URL).json()['next']
+        call_command(
+            'generate_data', users=3, titles=3, reviews=3, comments=0,
+            genres=1, categories=1, workers=1, verbosity=0
+        )
+        response = admin_client.get(self.CHANGES_URL, {'since': cursor})
+        assert response.status_code == HTTPStatus.GONE, (
+            'Проверьте, что массовая загрузка без журнала делает курсоры '
+            'недействительными.'
+        )
+
+    def test_05_permissions(self, client, user_client, moderator_client):
+        assert client.get(self.CHANGES_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+        for role_client in (user_client, moderator_client):
+            assert role_client.get(self.CHANGES_URL).status_code == (
+                HTTPStatus.FORBIDDEN
+            )
+
+    def test_06_change_written_with_object(self, admin_client, monkeypatch):
+        from reviews.models import Change, Genre
+
+        def failing(**kwargs):
+            raise DatabaseError('disk I/O error')
+
+        genre = Genre.objects.create(name='Жанр', slug='genre')
+        monkeypatch.setattr(Change.objects, 'create', failing)
+        with pytest.raises(DatabaseError):
+            Genre.objects.create(name='Другой жанр', slug='other')
+        genre.name = 'Новое название'
+        with pytest.raises(DatabaseError):
+            genre.save()
+        assert list(Genre.objects.values_list('slug', 'name')) == [
+            ('genre', 'Жанр')
+        ], (
+            'Проверьте, что изменение и запись журнала фиксируются '
+            'в одной транзакции.'
+        )
+
+    def test_07_lag(self, admin_client, settings):
+        from reviews.models import Genre
+        cursor = admin_client.get(self.CHANGES_URL).json()['next']
+        settings.CHANGE_FEED_LAG = 60
+        Genre.objects.create(name='Жанр', slug='genre')
+        assert admin_client.get(self.CHANGES_URL).json()['next'] == cursor
+        assert self.get_changes(admin_client, cursor)['results'] == [], (
+            'Проверьте, что записи моложе `CHANGE_FEED_LAG` не отдаются.'
+        )
+        settings.CHANGE_FEED_LAG = 0
+        results = self.get_changes(admin_client, cursor)['results']
+        assert [row['data']['slug'] for row in results] == ['genre']
@@ -0,0 +1,81 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_review, create_titles
+
+
+def get_histogram(**counts):
+    return {str(score): counts.get(f's{score}', 0) for score in range(1, 11)}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29ScoreStats:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def get_stats(self, client, title_id):
+        response = client.get(
+            f'{self.TITLES_URL}{title_id}/', {'expand': 'stats'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['stats']
+
+    def test_01_incremental_updates(self, admin_client, user_client,
+                                    moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(
+            user_client, title_id, 'Отзыв', 7
+        ).json()
+        create_single_review(moderator_client, title_id, 'Отзыв', 7)
+        create_single_review(admin_client, title_id, 'Отзыв', 3)
+        assert self.get_stats(admin_client, title_id) == {
+            'review_count': 3, 'histogram': get_histogram(s7=2, s3=1),
+        }, 'Проверьте, что гистограмма оценок обновляется при создании.'
+
+        url = f'{self.TITLES_URL}{title_id}/reviews/{review["id"]}/'
+        response = user_client.patch(url, data={'score': 10})
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_stats(admin_client, title_id) == {
+            'review_count': 3, 'histogram': get_histogram(s7=1, s3=1, s10=1),
+        }, 'Проверьте, что гистограмма обновляется при смене оценки.'
+
+        assert user_client.delete(url).status_code == HTTPStatus.NO_CONTENT
+        assert self.get_stats(admin_client, title_id) == {
+            'review_count': 2, 'histogram': get_histogram(s7=1, s3=1),
+        }, 'Проверьте, что гистограмма обновляется при удалении отзыва.'
+
+    def test_02_expand_on_list(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 5)
+        plain = admin_client.get(self.TITLES_URL)
+        assert 'stats' not in plain.json()['results'][0], (
+            'Проверьте, что блок stats выводится только по ?expand=stats.'
+        )
+        with CaptureQueriesContext(connection) as plain_queries:
+            admin_client.get(self.TITLES_URL, {'year': 1984})
+        with CaptureQueriesContext(connection) as expanded_queries:
+            response = admin_client.get(
+                self.TITLES_URL, {'year': 1984, 'expand': 'stats'}
+            )
+        results = response.json()['results']
+        assert results[0]['stats'] == {
+            'review_count': 1, 'histogram': get_histogram(s5=1),
+        }
+        assert len(expanded_queries) == len(plain_queries), (
+            'Проверьте, что блок stats не требует дополнительных запросов.'
+        )
+
+    def test_03_rebuild(self, admin_client, user_client):
+        from reviews.models import Title
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 9)
+        Title.objects.update(score_count_9=0, score_count_1=4)
+        call_command('rebuild_ratings')
+        assert self.get_stats(admin_client, titles[0]['id']) == {
+            'review_count': 1, 'histogram': get_histogram(s9=1),
+        }, 'Проверьте, что rebuild_ratings пересчитывает гистограмму.'
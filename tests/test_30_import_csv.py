@@ -0,0 +1,149 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.db import DatabaseError
+
+from reviews.management.commands.import_csv import Command
+from reviews.models import Category, Genre, Title
+
+CATEGORIES = 'id,name,slug\n1,Фильм,films\n2,Книга,books\n'
+GENRES = (
+    'id,name,slug\n1,Драма,drama\n2,Комедия,comedy\n3,Вестерн,western\n'
+)
+TITLES = (
+    'id,name,year,category\n1,Побег,1994,1\n2,Отец,1972,2\n3,Мост,1957,9\n'
+)
+GENRE_TITLES = 'id,title_id,genre_id\n1,1,1\n2,2,2\n3,2,7\n4,5,1\n'
+
+
+def write_files(path, **files):
+    for name, content in files.items():
+        (path / f'{name}.csv').write_text(content, encoding='utf-8')
+
+
+def import_csv(path, command='import_csv', **options):
+    stdout, stderr = io.StringIO(), io.StringIO()
+    call_command(
+        command, path=str(path), stdout=stdout, stderr=stderr, **options
+    )
+    return stdout.getvalue(), stderr.getvalue()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30ImportCsv:
+
+    @pytest.fixture
+    def catalogue(self, tmp_path):
+        write_files(
+            tmp_path, category=CATEGORIES, genre=GENRES, titles=TITLES,
+            genre_title=GENRE_TITLES
+        )
+        return tmp_path
+
+    def test_01_dependency_order(self, catalogue):
+        command = Command()
+        assert command.get_dependencies() == {
+            'category.csv': set(),
+            'genre.csv': set(),
+            'users.csv': set(),
+            'titles.csv': {'category.csv'},
+            'genre_title.csv': {'titles.csv', 'genre.csv'},
+            'review.csv': {'titles.csv', 'users.csv'},
+            'comments.csv': {'review.csv', 'users.csv'},
+        }
+        import_csv(catalogue, command=command, workers=4)
+        for name, dependencies in command.get_dependencies().items():
+            started = command.timings[name][0]
+            for dependency in dependencies:
+                offset, duration = command.timings[dependency]
+                assert started >= offset + duration, (
+                    f'Проверьте, что {name} импортируется после '
+                    f'{dependency}.'
+                )
+        assert Title.objects.count() == 2
+
+    def test_02_failed_stage_skips_dependents(self, catalogue, monkeypatch):
+        import_file = Command.import_file
+
+        def failing(self, file_name, model):
+            if file_name == 'category.csv':
+                raise ValueError('повреждённый файл')
+            return import_file(self, file_name, model)
+
+        monkeypatch.setattr(Command, 'import_file', failing)
+        _, stderr = import_csv(catalogue, workers=2)
+        assert 'Ошибка при импорте из category.csv' in stderr
+        for name in ('titles.csv', 'genre_title.csv', 'review.csv',
+                     'comments.csv'):
+            assert f'Импорт из {name} пропущен' in stderr, (
+                'Проверьте, что этапы, зависящие от неудачного, '
+                'пропускаются.'
+            )
+        assert not Category.objects.exists()
+        assert not Title.objects.exists()
+        assert Genre.objects.count() == 3, (
+            'Проверьте, что независимые этапы импортируются.'
+        )
+
+    def test_03_unknown_foreign_keys_rejected(self, catalogue):
+        stdout, _ = import_csv(catalogue, verbosity=2)
+        assert set(Title.objects.values_list('pk', flat=True)) == {1, 2}
+        assert sorted(
+            Title.objects.get(pk=2).genre.values_list('slug', flat=True)
+        ) == ['comedy'], (
+            'Проверьте, что строки со ссылками на несуществующие записи '
+            'отбрасываются.'
+        )
+        assert (
+            'titles.csv завершен: записано 2 строк, уже были в базе 0, '
+            'пропущено 1'
+        ) in stdout
+        assert (
+            'genre_title.csv завершен: записано 2 строк, уже были в базе 0, '
+            'пропущено 2'
+        ) in stdout
+
+    def test_04_repeat_import_counts_inserts(self, catalogue):
+        stdout, _ = import_csv(catalogue)
+        assert 'genre.csv завершен: записано 3 строк' in stdout
+        stdout, _ = import_csv(catalogue)
+        assert 'genre.csv завершен: записано 0 строк, уже были в базе 3' in (
+            stdout
+        ), (
+            'Проверьте, что повторный импорт не считает пропущенные базой '
+            'строки записанными.'
+        )
+        assert Genre.objects.count() == 3
+
+    def test_05_failed_chunk_written_by_row(self, catalogue, monkeypatch):
+        write_instances = Command.write_instances
+
+        def failing(self, model, instances):
+            if model is Genre and (
+                len(instances) > 1 or instances[0].slug == 'comedy'
+            ):
+                raise DatabaseError('null value violates not-null constraint')
+            return write_instances(self, model, instances)
+
+        monkeypatch.setattr(Command, 'write_instances', failing)
+        stdout, stderr = import_csv(catalogue)
+        assert 'Строки записываются по одной' in stderr
+        assert set(Genre.objects.values_list('slug', flat=True)) == {
+            'drama', 'western'
+        }, (
+            'Проверьте, что ошибка в одной строке не отбрасывает '
+            'весь кусок файла.'
+        )
+        assert (
+            'genre.csv завершен: записано 2 строк, уже были в базе 0, '
+            'пропущено 1'
+        ) in stdout
+
+    def test_06_new_rows_after_import(self, catalogue):
+        import_csv(catalogue)
+        genre = Genre.objects.create(name='Ужасы', slug='horror')
+        assert genre.pk > 3, (
+            'Проверьте, что после импорта с явными id счётчики первичных '
+            'ключей сдвигаются.'
+        )